@@ -6,13 +6,18 @@
 """
 import os,sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../')
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, PlainTextResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from core.scanner import SurgeScanner
 from core.scheduler_state import scheduler_info
+from core.candle_scheduler import build_filter_schedules, next_close_time, DEFAULT_DELAY_SECONDS
+from core.db_pool import close_all_pools
+from core import metrics
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import threading
+import time
 
 app = FastAPI(title="코인 거래량 급증 모니터")
 
@@ -27,6 +32,29 @@ DB_CONFIG = {
 # 스캐너 생성
 scanner = SurgeScanner(DB_CONFIG, result_file="data/surge_results.json", history_file="data/surge_history.json")
 
+# 실행 중인 스캔/필터 잡 수 (데이터 정리 잡은 하나라도 실행 중이면 대기)
+# 캔들 마감 스케줄에서는 필터 잡이 여러 개 동시에 돌 수 있어서 Event 대신 개수로 셈
+running_scans = 0
+running_scans_lock = threading.Lock()
+
+
+@contextmanager
+def scan_running():
+    """with 블록 동안 스캔 실행 중으로 표시"""
+    global running_scans
+    with running_scans_lock:
+        running_scans += 1
+    try:
+        yield
+    finally:
+        with running_scans_lock:
+            running_scans -= 1
+
+
+def is_scan_running():
+    """스캔/필터 잡이 하나라도 실행 중인지"""
+    return running_scans > 0
+
 
 def update_scheduler_status():
     """매 분마다 스케줄러 상태 출력"""
@@ -56,7 +84,23 @@ def scan_with_update():
     print(f"⏰ 다음 스캔: {scheduler_info['global']['next_run'].strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
     
-    scanner.scan()
+    with scan_running():
+        scanner.scan()
+
+
+def filter_job(filter_type, interval):
+    """필터 1개 실행 (캔들 마감 기준 스케줄)"""
+    delay_seconds = scanner.config.get('schedule', {}).get('delay_seconds', DEFAULT_DELAY_SECONDS)
+    scheduler_info.setdefault(filter_type, {'start_time': None, 'elapsed_time': timedelta(0), 'trigger': False})
+    scheduler_info[filter_type]["next_run"] = next_close_time(interval, delay_seconds=delay_seconds)
+    
+    with scan_running():
+        scanner.scan_filter(filter_type)
+
+
+def retention_job():
+    """오래된 데이터 정리 (스캔과 별도, 스캔 중에는 양보)"""
+    scanner.run_retention(should_yield=is_scan_running)
 
 
 
@@ -66,20 +110,46 @@ def start_scheduler():
     서버 시작 시 스케줄러 설정
     """
     scheduler = BackgroundScheduler()
+    schedule_config = scanner.config.get('schedule', {})
     
-    # 매 30분마다 실행
-    scheduler.add_job(scan_with_update, 'interval', minutes=scheduler_info["global"]["interval_minutes"])
+    if schedule_config.get('mode') == 'candle_close':
+        # 필터마다 자기 interval의 캔들 마감 시각 + delay_seconds에 실행
+        schedules = build_filter_schedules(scanner.config.get('filter', []),
+                                           delay_seconds=schedule_config.get('delay_seconds', DEFAULT_DELAY_SECONDS))
+        intervals = {filter_config['types']: filter_config['interval'] for filter_config in scanner.config.get('filter', [])}
+        for schedule in schedules:
+            scheduler.add_job(filter_job, 'interval', seconds=schedule.interval_seconds, start_date=schedule.first_run,
+                              args=[schedule.filter_type, intervals[schedule.filter_type]], max_instances=1, coalesce=True)
+            scheduler_info.setdefault(schedule.filter_type, {'start_time': None, 'elapsed_time': timedelta(0), 'trigger': False})
+            scheduler_info[schedule.filter_type]["next_run"] = schedule.first_run
+            print(f"✅ 필터 '{schedule.filter_type}': 매 {schedule.interval_seconds}초 캔들 마감 후 실행 (첫 실행: {schedule.first_run.strftime('%H:%M:%S')} UTC)")
+    else:
+        # 매 30분마다 실행
+        scheduler.add_job(scan_with_update, 'interval', minutes=scheduler_info["global"]["interval_minutes"])
+        
+        # 서버 시작 시 즉시 1번 실행
+        scheduler_info["global"]["next_run"] = datetime.now() + timedelta(minutes=scheduler_info["global"]["interval_minutes"])
+        scheduler.add_job(scan_with_update, 'date')
+        print(f"✅ 스케줄러 시작: 매 {scheduler_info['global']['interval_minutes']}분마다 거래량 급증 스캔")
     
-    # 서버 시작 시 즉시 1번 실행
-    scheduler_info["global"]["next_run"] = datetime.now() + timedelta(minutes=scheduler_info["global"]["interval_minutes"])
-    scheduler.add_job(scan_with_update, 'date')
+    # 오래된 데이터 정리는 별도 잡 (겹쳐서 실행되지 않게 1개만)
+    retention_minutes = scanner.config.get('retention', {}).get('interval_minutes', 60)
+    scheduler.add_job(retention_job, 'interval', minutes=retention_minutes, max_instances=1, coalesce=True)
     
     scheduler.start()
-    print(f"✅ 스케줄러 시작: 매 {scheduler_info['global']['interval_minutes']}분마다 거래량 급증 스캔")
+    print(f"✅ 데이터 정리 잡: 매 {retention_minutes}분마다 실행")
     
     # 백그라운드 스레드로 상태 모니터링 시작
     status_thread = threading.Thread(target=update_scheduler_status, daemon=True)
     status_thread.start()
+    
+    # 메모리 맵 저장소 열기 + 필터용 캔들 캐시 미리 채우기 (config의 mmap_store/cache.enable이 true일 때만)
+    if scanner.candle_cache is not None or scanner.candle_store is not None:
+        threading.Thread(target=scanner.warm_up, daemon=True).start()
+    
+    # WebSocket 캔들 스트림 시작 (config의 stream.enable이 true일 때만)
+    if scanner.start_stream():
+        print("📡 WebSocket 캔들 스트림 수집 시작")
 
 
 @app.on_event("shutdown")
@@ -87,7 +157,28 @@ def shutdown_event():
     """
     서버 종료 시 정리 작업
     """
-    pass
+    scanner.stop_stream()
+    if scanner.candle_store is not None:
+        scanner.candle_store.flush()
+    if scanner.filter_pool is not None:
+        scanner.filter_pool.close()
+    close_all_pools()
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """API 요청 처리 시간 기록 (/metrics의 coinalarm_api_request_seconds)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # 경로는 라우트 템플릿으로 (없는 경로는 하나로 묶어서 라벨 개수 제한)
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.API_REQUEST_DURATION.labels(request.method, path, status).observe(time.perf_counter() - started)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -105,7 +196,7 @@ def get_status():
     """
     now = datetime.now()
     status_data = {
-        "mode": "rest",
+        "mode": "stream" if scanner.stream is not None else "rest",
         "scan_interval": f"{scheduler_info['global']['interval_minutes']} minutes",
         "current_time": now.strftime('%Y-%m-%d %H:%M:%S'),
     }
@@ -119,9 +210,61 @@ def get_status():
         minutes_left = int(time_left.total_seconds() / 60)
         status_data["minutes_until_next_scan"] = max(0, minutes_left)
     
+    if scanner.config.get('schedule', {}).get('mode') == 'candle_close':
+        status_data["scan_interval"] = "candle_close"
+        status_data["filter_schedule"] = {
+            filter_type: {
+                "last_run": info["last_run"].strftime('%Y-%m-%d %H:%M:%S') if info.get("last_run") else None,
+                "next_run": info["next_run"].strftime('%Y-%m-%d %H:%M:%S UTC') if info.get("next_run") else None,
+            }
+            for filter_type, info in scheduler_info.items() if filter_type != "global" and "next_run" in info
+        }
+    
+    if scanner.candle_cache is not None:
+        status_data["candle_cache"] = scanner.candle_cache.stats()
+    
+    if scanner.candle_store is not None:
+        status_data["candle_store"] = scanner.candle_store.stats()
+    
+    if scanner.indicators is not None:
+        status_data["indicators"] = scanner.indicators.stats()
+    
+    if scanner.filter_pool is not None:
+        status_data["filter_pool"] = scanner.filter_pool.stats()
+    
+    if scanner.prefilter is not None:
+        status_data["prefilter"] = scanner.prefilter.stats()
+    
+    if scanner.eval_markers is not None:
+        status_data["incremental"] = scanner.eval_markers.stats()
+    
+    if scanner.last_pipeline_stats:
+        status_data["last_pipeline"] = scanner.last_pipeline_stats
+    
+    if scanner.last_profile:
+        status_data["last_profile"] = {key: scanner.last_profile[key] for key in ("started_at", "wall_sec", "phases", "counters")}
+    
+    if scanner.last_retention_report:
+        status_data["last_retention"] = scanner.last_retention_report
+    
     return JSONResponse(content=status_data)
 
 
+@app.get("/metrics")
+def get_metrics():
+    """
+    Prometheus 메트릭 (text 형식)
+    스캔 스레드가 쓰는 lock을 잡지 않고 현재 값을 읽음 (캐시 통계만 조회 시점에 옮김)
+    """
+    if scanner.candle_cache is not None:
+        metrics.set_cache_stats("candle_cache", scanner.candle_cache.stats())
+    if scanner.eval_markers is not None:
+        stats = scanner.eval_markers.stats()
+        metrics.set_cache_stats("eval_markers", {"hits": stats["carried"], "misses": stats["evaluated"],
+                                                 "hit_ratio": stats["carried_ratio"]})
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/api/surge")
 def get_surge_data():
     """
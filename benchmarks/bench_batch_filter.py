@@ -0,0 +1,81 @@
+"""
+심볼 수에 따른 필터 시간 (심볼별 실행 vs 배치)
+
+캔들 캐시의 (n, 7) 배열 입력으로 한 시간봉의 심볼 전체를 필터링하는 시간
+- Filter: 기존 심볼별 루프
+- Vectorized: 심볼별 NumPy 버전
+- Batch: 전체 심볼을 3차원 배열로 쌓아서 한 번에 (쌓는 시간 포함 / 계산만)
+
+실행:
+    python benchmarks/bench_batch_filter.py
+    python benchmarks/bench_batch_filter.py --symbols 250 1000 4000
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+from core.candle_cache import CandleCache
+from service.filter import Filter
+from service.vectorized_filter import (VectorizedFilter, batch_high_volume_spike, batch_three_step_surge,
+                                       stack_candles)
+from benchmarks.bench_filter import make_rows
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        # 패턴 발견 시 출력은 측정에서 제외
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='심볼 수에 따른 배치 필터 벤치마크')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[100, 400, 1000, 2000, 4000])
+    parser.add_argument('--period', type=int, default=14)
+    parser.add_argument('--window', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    period, window = args.period, args.window
+    length = window + period + 1
+    surge_args = (1.5, period, window, 1.5)
+    spike_args = (period, window, 3.0, 2)
+
+    print(f"\n캔들 {length}개/심볼 (window {window}, period {period}), 단위 ms")
+    print(f"{'심볼':>6} | {'필터':>17} | {'Filter':>8} | {'Vectorized':>10} | {'Batch':>8} | {'계산만':>8}")
+    print("-" * 74)
+    for symbol_count in args.symbols:
+        candle_sets = {f"SYM{i}USDT": CandleCache.rows_to_array(make_rows(i, length)) for i in range(symbol_count)}
+        symbols = list(candle_sets)
+        legacy = Filter()
+        vectorized = VectorizedFilter()
+        data, counts = stack_candles(candle_sets, symbols, length)
+
+        surge = [
+            best_of(args.repeat, lambda: [legacy._three_step_surge_filter(candle_sets[s], s, *surge_args) for s in symbols]),
+            best_of(args.repeat, lambda: [vectorized._three_step_surge_filter(candle_sets[s], s, *surge_args) for s in symbols]),
+            best_of(args.repeat, lambda: vectorized.batch_three_step_surge_filter(candle_sets, symbols, *surge_args)),
+            best_of(args.repeat, lambda: batch_three_step_surge(data, counts, *surge_args)),
+        ]
+        spike = [
+            best_of(args.repeat, lambda: [legacy._high_volume_spike_filter(candle_sets[s], s, None, '5m', *spike_args) for s in symbols]),
+            None,  # 심볼별 NumPy 버전 없음 (기존 Filter 사용)
+            best_of(args.repeat, lambda: vectorized.batch_high_volume_spike_filter(candle_sets, symbols, None, '5m', *spike_args)),
+            best_of(args.repeat, lambda: batch_high_volume_spike(data, counts, *spike_args)),
+        ]
+        for name, timings in (('3step_surge', surge), ('high_volume_spike', spike)):
+            filter_ms, vectorized_ms, batch_ms, compute_ms = (t * 1000 if t is not None else None for t in timings)
+            vectorized_text = f"{vectorized_ms:>10.1f}" if vectorized_ms is not None else f"{'-':>10}"
+            print(f"{symbol_count:>6} | {name:>17} | {filter_ms:>8.1f} | {vectorized_text} | {batch_ms:>8.1f} | {compute_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
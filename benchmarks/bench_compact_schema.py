@@ -0,0 +1,97 @@
+"""
+candles / candles_compact 스키마 비교 벤치마크 (MySQL 서버 필요)
+
+- 행 크기: information_schema의 평균 행 크기 / 데이터+인덱스 크기
+- 저장: save_candles rows/s
+- 조회: get_candles_bulk (심볼별 최신 window개) 1회 시간 + 필터처럼 시간/가격을 파이썬 값으로 바꾸는 시간
+
+실행:
+    python benchmarks/bench_compact_schema.py --password 1234 --database coin_chart_bench
+    (벤치마크 DB의 candles / candles_compact 데이터가 모두 삭제됨)
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime
+
+from core.database import CandleDatabase
+from core.compact_database import CompactCandleDatabase
+from benchmarks.bench_storage import make_dataset, BENCH_TIMEFRAME
+
+
+TABLE_SIZE_QUERY = """
+SELECT AVG_ROW_LENGTH, DATA_LENGTH, INDEX_LENGTH
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+"""
+
+
+def consume(candle_sets):
+    """필터가 하는 것처럼 시간(UTC datetime)과 거래량을 파이썬 값으로 변환"""
+    total = 0.0
+    for candles in candle_sets.values():
+        for candle in candles:
+            open_time = candle[0]
+            if not isinstance(open_time, datetime):
+                open_time = datetime.utcfromtimestamp(open_time / 1000)
+            total += float(candle[5])
+    return total
+
+
+def table_size(db, table):
+    db._execute(f"ANALYZE TABLE {table}")
+    avg_row, data, index = db._fetchone(TABLE_SIZE_QUERY, (table,))
+    return avg_row, (data + index) / 1024 / 1024
+
+
+def run_schema(name, table, db, dataset, window, repeat):
+    db.truncate()
+
+    started = time.perf_counter()
+    for symbol, klines in dataset.items():
+        db.save_candles(symbol, BENCH_TIMEFRAME, klines)
+    ingest_sec = time.perf_counter() - started
+    rows = sum(len(klines) for klines in dataset.values())
+
+    symbols = list(dataset)
+    read_sec = convert_sec = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        candle_sets = db.get_candles_bulk(symbols, BENCH_TIMEFRAME, limit=window)
+        read_sec += time.perf_counter() - started
+        started = time.perf_counter()
+        consume(candle_sets)
+        convert_sec += time.perf_counter() - started
+
+    avg_row, size_mb = table_size(db, table)
+    db.truncate()
+    print(f"{name:>8} | {avg_row:>10} | {size_mb:>9.1f} | {rows / ingest_sec:>14,.0f} | "
+          f"{read_sec / repeat * 1000:>12.1f} | {convert_sec / repeat * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='압축 스키마 벤치마크')
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--candles', type=int, default=1500)
+    parser.add_argument('--window', type=int, default=31, help='심볼당 조회할 캔들 수 (window + period + 1)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--database', default='coin_chart_bench')
+    args = parser.parse_args()
+
+    db_config = {'host': args.host, 'user': args.user, 'password': args.password, 'database': args.database}
+    dataset = make_dataset(args.symbols, args.candles)
+
+    print(f"\n데이터: {args.symbols}개 심볼 x {args.candles}개 1분봉, 조회: 심볼당 최신 {args.window}개")
+    print(f"{'스키마':>8} | {'행 크기(B)':>10} | {'크기(MB)':>9} | {'저장 (rows/s)':>14} | {'조회 1회 (ms)':>12} | {'변환 (ms)':>10}")
+    print("-" * 80)
+    run_schema('candles', 'candles', CandleDatabase(**db_config), dataset, args.window, args.repeat)
+    run_schema('compact', 'candles_compact', CompactCandleDatabase(**db_config), dataset, args.window, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
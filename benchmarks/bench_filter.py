@@ -0,0 +1,88 @@
+"""
+3step_surge 필터 마이크로 벤치마크 (기존 Filter vs VectorizedFilter)
+
+심볼 N개의 캔들(window + period + 1개)로 필터를 한 번씩 실행하는 시간 비교
+- rows: DB에서 읽은 행 리스트 (open_time datetime)
+- array: 캔들 캐시/메모리 맵 저장소의 (n, 7) 배열 view
+
+실행:
+    python benchmarks/bench_filter.py
+    python benchmarks/bench_filter.py --symbols 1000 --window 60
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from core.candle_cache import CandleCache
+from core.resampler import ms_to_datetime
+from service.filter import Filter
+from service.vectorized_filter import VectorizedFilter
+
+
+MINUTE = 60 * 1000
+
+
+def make_rows(seed, count):
+    """임의 캔들 행 (open_time, o, h, l, c, v, quote_volume)"""
+    rng = np.random.default_rng(seed)
+    change = rng.choice([-1, 1], size=count, p=[0.4, 0.6]) * rng.uniform(0.01, 2.0, size=count)
+    close = 100.0 + np.cumsum(change)
+    open_price = close - change
+    high = np.maximum(open_price, close) + rng.uniform(0, 1.0, size=count)
+    low = np.minimum(open_price, close) - rng.uniform(0, 1.0, size=count)
+    volume = rng.uniform(50, 150, size=count) * rng.choice([1, 5], size=count, p=[0.9, 0.1])
+    return [(ms_to_datetime(i * MINUTE), float(open_price[i]), float(high[i]), float(low[i]), float(close[i]),
+             float(volume[i]), float(volume[i] * close[i])) for i in range(count)]
+
+
+def run(filter_obj, candle_sets, args):
+    found = 0
+    started = time.perf_counter()
+    # 패턴 발견 시 출력은 측정에서 제외
+    with contextlib.redirect_stdout(io.StringIO()):
+        for symbol, candles in candle_sets.items():
+            found += bool(filter_obj._three_step_surge_filter(
+                candles, symbol, args.volume_range_multiplier, args.period, args.window, args.range_multiplier,
+                strong_candle_count=args.strong_candle_count
+            ))
+    return time.perf_counter() - started, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='3step_surge 필터 벤치마크')
+    parser.add_argument('--symbols', type=int, default=400)
+    parser.add_argument('--period', type=int, default=14)
+    parser.add_argument('--window', type=int, default=30)
+    parser.add_argument('--volume-range-multiplier', type=float, default=1.5)
+    parser.add_argument('--range-multiplier', type=float, default=1.5)
+    parser.add_argument('--strong-candle-count', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    count = args.window + args.period + 1
+    row_sets = {f"SYM{i}USDT": make_rows(i, count) for i in range(args.symbols)}
+    array_sets = {symbol: CandleCache.rows_to_array(rows) for symbol, rows in row_sets.items()}
+
+    cases = [
+        ('Filter', 'rows', Filter(), row_sets),
+        ('Filter', 'array', Filter(), array_sets),
+        ('Vectorized', 'rows', VectorizedFilter(), row_sets),
+        ('Vectorized', 'array', VectorizedFilter(), array_sets),
+    ]
+
+    print(f"\n{args.symbols}개 심볼 x 캔들 {count}개 (window {args.window}, period {args.period})")
+    print(f"{'구현':>12} | {'입력':>6} | {'전체 (ms)':>10} | {'심볼당 (us)':>11} | {'발견':>5}")
+    print("-" * 58)
+    for name, input_type, filter_obj, candle_sets in cases:
+        best, found = min(run(filter_obj, candle_sets, args) for _ in range(args.repeat))
+        print(f"{name:>12} | {input_type:>6} | {best * 1000:>10.2f} | {best / args.symbols * 1e6:>11.1f} | {found:>5}")
+
+
+if __name__ == "__main__":
+    main()
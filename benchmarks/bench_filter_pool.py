@@ -0,0 +1,92 @@
+"""
+작업 프로세스 수에 따른 필터 단계 시간 (현재 프로세스 vs 프로세스 풀)
+
+한 시간봉의 심볼 전체에 3step_surge + high_volume_spike를 실행하는 시간
+- 현재 프로세스: plugin.run
+- 프로세스 풀: 공유 메모리에 올리는 시간 + 작업 프로세스 실행 (프로세스 시작 시간은 제외)
+
+실행:
+    python benchmarks/bench_filter_pool.py
+    python benchmarks/bench_filter_pool.py --symbols 4000 --workers 1 2 4 8 --engine vectorized
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import logging
+import time
+
+from core.candle_frame import CandleFrame
+from service.filter import Filter
+from service.filter_registry import FilterContext, get_filter_plugin
+from service.parallel_filter import FilterPool
+from service.vectorized_filter import VectorizedFilter
+from benchmarks.bench_filter import make_rows
+
+
+FILTER_CONFIGS = [
+    {'types': '3step_surge', 'using_timeframe': ['5m'], 'interval': '5m', 'period': 14, 'window': 30,
+     'volume_range_multiplier': 1.5, 'range_multiplier': 1.5},
+    {'types': 'high_volume_spike', 'using_timeframe': ['5m'], 'interval': '5m', 'period': 14, 'window': 30,
+     'volume_range_multiplier': 3.0, 'spike_threshold': 2},
+]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        # 패턴 발견 시 출력은 측정에서 제외 (작업 프로세스 출력은 그대로)
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run_in_process(context, candle_set, symbols):
+    for config in FILTER_CONFIGS:
+        plugin = get_filter_plugin(config['types'])
+        plugin.run(context, candle_set, symbols, '5m', plugin.params(config))
+
+
+def run_in_pool(pool, context, candle_set, symbols):
+    with pool.share({'5m': candle_set}) as shared:
+        for config in FILTER_CONFIGS:
+            plugin = get_filter_plugin(config['types'])
+            pool.run(context, plugin, shared, '5m', symbols, plugin.params(config))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='프로세스 풀 필터 벤치마크')
+    parser.add_argument('--symbols', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--engine', choices=['python', 'vectorized'], default='python')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    length = 30 + 14 + 1
+    candle_set = {f"SYM{i}USDT": CandleFrame.from_rows(make_rows(i, length)) for i in range(args.symbols)}
+    symbols = list(candle_set)
+    filter_obj = VectorizedFilter() if args.engine == 'vectorized' else Filter()
+    context = FilterContext(filter_obj, None, None, logging.getLogger('bench'))
+
+    baseline = best_of(args.repeat, lambda: run_in_process(context, candle_set, symbols))
+    print(f"\n심볼 {args.symbols}개 x 캔들 {length}개, 엔진 {args.engine}, CPU {os.cpu_count()}개, 단위 ms")
+    print(f"{'실행':>12} | {'시간':>9} | {'배율':>6}")
+    print("-" * 34)
+    print(f"{'현재 프로세스':>12} | {baseline * 1000:>9.1f} | {1.0:>5.2f}x")
+    for workers in args.workers:
+        pool = FilterPool(workers=workers, engine=args.engine)
+        try:
+            # 프로세스 시작/모듈 import는 서버 시작 시 한 번이므로 제외
+            run_in_pool(pool, context, candle_set, symbols)
+            elapsed = best_of(args.repeat, lambda: run_in_pool(pool, context, candle_set, symbols))
+        finally:
+            pool.close()
+        print(f"{f'풀 {workers}개':>12} | {elapsed * 1000:>9.1f} | {baseline / elapsed:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
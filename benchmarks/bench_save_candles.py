@@ -0,0 +1,106 @@
+"""
+save_candles 저장 속도 벤치마크
+
+기존 방식(캔들 1개당 execute 1번)과 multi-row upsert 방식의 rows/s 비교
+350개 (신규 다운로드), 1500개 (히스토리 1회 요청), 50000개 (대량 히스토리) 기준
+
+실행:
+    python benchmarks/bench_save_candles.py --password 1234 --database coin_chart
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime
+
+from core.database import CandleDatabase
+
+
+BENCH_SYMBOL = 'BENCHUSDT'
+BENCH_TIMEFRAME = '1m'
+SIZES = [350, 1500, 50000]
+
+LEGACY_INSERT_QUERY = """
+INSERT INTO candles
+(symbol, timeframe, open_time, open_price, high_price, low_price, close_price,
+ volume, close_time, quote_volume)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    close_time = VALUES(close_time),
+    quote_volume = VALUES(quote_volume)
+"""
+
+
+def make_klines(count, start_ms=1700000000000):
+    """바이낸스 형식의 가짜 1분봉 생성 (값은 문자열, 바이낸스와 동일)"""
+    klines = []
+    for i in range(count):
+        open_time = start_ms + i * 60000
+        price = 100 + (i % 50) * 0.1
+        klines.append([open_time, f"{price:.4f}", f"{price + 0.5:.4f}", f"{price - 0.5:.4f}", f"{price + 0.2:.4f}",
+                       f"{1000 + i:.3f}", open_time + 59999, f"{(1000 + i) * price:.4f}"])
+    return klines
+
+
+def legacy_save_candles(db, symbol, timeframe, klines):
+    """변경 전 save_candles (캔들마다 utcfromtimestamp/float 변환 + execute 1번)"""
+    saved_count = 0
+    with db.checkout() as (connection, cursor):
+        for kline in klines:
+            open_time = datetime.utcfromtimestamp(int(kline[0]) / 1000)
+            close_time = datetime.utcfromtimestamp(int(kline[6]) / 1000)
+            values = (symbol, timeframe, open_time, float(kline[1]), float(kline[2]), float(kline[3]),
+                      float(kline[4]), float(kline[5]), close_time, float(kline[7]))
+            cursor.execute(LEGACY_INSERT_QUERY, values)
+            saved_count += 1
+        connection.commit()
+    return saved_count
+
+
+def clear_bench_rows(db):
+    db._execute("DELETE FROM candles WHERE symbol = %s", (BENCH_SYMBOL,))
+
+
+def measure(db, save_func, klines):
+    clear_bench_rows(db)
+    started = time.perf_counter()
+    save_func(db, BENCH_SYMBOL, BENCH_TIMEFRAME, klines)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='save_candles 벤치마크')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--database', default='coin_chart')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    db = CandleDatabase(host=args.host, user=args.user, password=args.password,
+                        database=args.database, batch_size=args.batch_size)
+
+    def batched_save(db, symbol, timeframe, klines):
+        return db.save_candles(symbol, timeframe, klines)
+
+    print(f"\n{'행 수':>8} | {'기존 (rows/s)':>14} | {'batch (rows/s)':>14} | {'배율':>6}")
+    print("-" * 54)
+    try:
+        for size in SIZES:
+            klines = make_klines(size)
+            legacy_sec = measure(db, legacy_save_candles, klines)
+            batched_sec = measure(db, batched_save, klines)
+            print(f"{size:>8} | {size / legacy_sec:>14,.0f} | {size / batched_sec:>14,.0f} | {legacy_sec / batched_sec:>5.1f}x")
+    finally:
+        clear_bench_rows(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+저장소(backend)별 저장/조회 속도 비교 벤치마크
+
+같은 가짜 데이터 (심볼 N개 x 1분봉 M개)로
+- 저장: save_candles rows/s
+- 조회: get_candles_bulk (스캐너 필터와 같은 심볼별 최신 window개 조회) 1회 시간
+을 SQLite와 MySQL(--mysql 옵션, MySQL 서버 필요)에서 측정
+
+실행:
+    python benchmarks/bench_storage.py
+    python benchmarks/bench_storage.py --mysql --password 1234 --database coin_chart
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+
+from core.storage import create_candle_database
+from benchmarks.bench_save_candles import make_klines
+
+
+BENCH_TIMEFRAME = '1m'
+
+
+def make_dataset(symbol_count, candle_count):
+    """현재 시각까지 이어지는 심볼별 1분봉 (get_candles_bulk 조회 범위에 들어가도록)"""
+    now_ms = int(datetime.utcnow().timestamp() * 1000)
+    start_ms = now_ms - now_ms % 60000 - candle_count * 60000
+    klines = make_klines(candle_count, start_ms=start_ms)
+    return {f"BENCH{i:03d}USDT": klines for i in range(symbol_count)}
+
+
+def run_backend(name, db, dataset, window, repeat):
+    db.truncate()
+
+    started = time.perf_counter()
+    for symbol, klines in dataset.items():
+        db.save_candles(symbol, BENCH_TIMEFRAME, klines)
+    ingest_sec = time.perf_counter() - started
+    rows = sum(len(klines) for klines in dataset.values())
+
+    symbols = list(dataset)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        candle_sets = db.get_candles_bulk(symbols, BENCH_TIMEFRAME, limit=window)
+    read_sec = (time.perf_counter() - started) / repeat
+    read_rows = sum(len(candles) for candles in candle_sets.values())
+
+    db.truncate()
+    db.close()
+    print(f"{name:>8} | {rows / ingest_sec:>14,.0f} | {read_sec * 1000:>12.1f} | {read_rows / read_sec:>14,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='저장소별 저장/조회 벤치마크')
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--candles', type=int, default=1500)
+    parser.add_argument('--window', type=int, default=31, help='심볼당 조회할 캔들 수 (window + period + 1)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--mysql', action='store_true', help='MySQL도 측정 (MySQL 서버 필요, 테이블의 데이터가 모두 삭제됨)')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--database', default='coin_chart_bench')
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.symbols, args.candles)
+    print(f"\n데이터: {args.symbols}개 심볼 x {args.candles}개 1분봉, 조회: 심볼당 최신 {args.window}개")
+    print(f"{'저장소':>8} | {'저장 (rows/s)':>14} | {'조회 1회 (ms)':>12} | {'조회 (rows/s)':>14}")
+    print("-" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = create_candle_database(storage_config={'backend': 'sqlite', 'path': os.path.join(directory, 'bench.db')})
+        run_backend('sqlite', db, dataset, args.window, args.repeat)
+
+    if args.mysql:
+        db_config = {'host': args.host, 'user': args.user, 'password': args.password, 'database': args.database}
+        db = create_candle_database(db_config, {'backend': 'mysql'})
+        run_backend('mysql', db, dataset, args.window, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+재시작 후 첫 스캔까지 걸리는 시간 비교 벤치마크
+
+필터가 쓸 캔들 (심볼 N개 x 시간봉 T개, 심볼당 window개)을 준비하는 시간
+- mmap: 메모리 맵 파일 열기 + 심볼별 최신 window개 view (+ 실제로 읽어서 페이지 로드)
+- DB: 워터마크 로드 + 시간봉마다 get_candles_bulk (SQLite 기본, --mysql이면 MySQL)
+- REST: DB가 비어있을 때 바이낸스에서 initial_limit개씩 받는 경우 weight 제한으로 계산한 최소 시간
+
+실행:
+    python benchmarks/bench_warm_start.py
+    python benchmarks/bench_warm_start.py --mysql --password 1234 --database coin_chart_bench
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import tempfile
+import time
+
+from core.mmap_store import MmapCandleStore
+from core.rate_limiter import kline_request_weight
+from core.storage import create_candle_database
+from benchmarks.bench_storage import make_dataset
+
+
+TIMEFRAMES = ['5m', '15m', '30m', '1h']
+
+
+def prepare(db, store, dataset):
+    db.truncate()
+    for symbol, klines in dataset.items():
+        for timeframe in TIMEFRAMES:
+            db.save_candles(symbol, timeframe, klines)
+            store.append(symbol, timeframe, klines)
+    store.flush()
+
+
+def warm_from_store(directory, capacity, symbols, window):
+    started = time.perf_counter()
+    store = MmapCandleStore(directory=directory, capacity=capacity)
+    store.open_all()
+    opened = time.perf_counter() - started
+    total = 0.0
+    for timeframe in TIMEFRAMES:
+        for view in store.get_many(symbols, timeframe, window).values():
+            total += view[:, 5].sum()
+    return opened, time.perf_counter() - started
+
+
+def warm_from_db(db, symbols, window):
+    started = time.perf_counter()
+    db.watermarks.reset()
+    db.load_watermarks()
+    total = 0.0
+    for timeframe in TIMEFRAMES:
+        for candles in db.get_candles_bulk(symbols, timeframe, limit=window).values():
+            total += sum(float(candle[5]) for candle in candles)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='재시작 후 첫 스캔 준비 시간 벤치마크')
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--candles', type=int, default=350)
+    parser.add_argument('--window', type=int, default=45, help='심볼당 필터가 쓰는 캔들 수 (window + period + 1)')
+    parser.add_argument('--weight-per-minute', type=int, default=2400)
+    parser.add_argument('--mysql', action='store_true', help='SQLite 대신 MySQL과 비교 (벤치마크 DB의 데이터가 삭제됨)')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--database', default='coin_chart_bench')
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.symbols, args.candles)
+    symbols = list(dataset)
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.mysql:
+            db_config = {'host': args.host, 'user': args.user, 'password': args.password, 'database': args.database}
+            db = create_candle_database(db_config, {'backend': 'mysql'})
+            db_name = 'MySQL'
+        else:
+            db = create_candle_database(storage_config={'backend': 'sqlite', 'path': os.path.join(directory, 'bench.db')})
+            db_name = 'SQLite'
+
+        store_directory = os.path.join(directory, 'candles')
+        prepare(db, MmapCandleStore(directory=store_directory, capacity=args.candles * 2), dataset)
+
+        opened_sec, store_sec = warm_from_store(store_directory, args.candles * 2, symbols, args.window)
+        db_sec = warm_from_db(db, symbols, args.window)
+        db.truncate()
+        db.close()
+
+    # 바이낸스에서 처음부터 받는 경우: 요청 수 x weight / 분당 weight
+    requests_count = args.symbols * len(TIMEFRAMES)
+    rest_sec = requests_count * kline_request_weight(args.candles) / (args.weight_per_minute * 0.9) * 60
+
+    print(f"\n데이터: {args.symbols}개 심볼 x {len(TIMEFRAMES)}개 시간봉 x {args.candles}개, 필터 window {args.window}개")
+    print(f"{'방식':>10} | {'첫 스캔 준비 (초)':>16}")
+    print("-" * 32)
+    print(f"{'mmap':>10} | {store_sec:>16.3f}  (파일 열기 {opened_sec * 1000:.1f}ms)")
+    print(f"{db_name:>10} | {db_sec:>16.3f}")
+    print(f"{'REST':>10} | {rest_sec:>16.1f}  (weight 제한 기준 최소, {requests_count}번 요청)")
+
+
+if __name__ == "__main__":
+    main()
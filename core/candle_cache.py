@@ -0,0 +1,242 @@
+"""
+NumPy 링 버퍼 캔들 캐시
+
+(심볼, 시간봉)마다 최신 capacity개 캔들을 메모리에 보관하고 필터가 DB 대신 여기서 읽음
+- 컬럼: open_time(ms), open, high, low, close, volume, quote_volume (float64 2차원 배열)
+- 같은 행을 i와 i + capacity 두 곳에 써서 (double-write) 최신 N개가 항상 연속된 구간
+  → 시간순 구간을 슬라이스 1번(연속 메모리 복사 1번)으로 꺼냄
+- DB에 저장될 때마다 (CandleDatabase.save_listeners) 새 캔들이 추가됨
+- 캐시에 없는 (심볼, 시간봉)은 get_candle_frames_bulk로 한 번에 채움 (miss)
+- 조회 결과는 lock 안에서 복사한 CandleFrame
+  (링은 진행 중 캔들 upsert/새 캔들로 계속 덮어쓰므로 view를 그대로 넘기면 필터 실행 중에 값이 바뀜)
+"""
+import threading
+
+import numpy as np
+
+from core.candle_frame import CANDLE_COLUMNS, CandleFrame
+
+
+# 캐시 컬럼 (CandleFrame과 같음)
+CACHE_COLUMNS = CANDLE_COLUMNS
+
+
+class CandleRing:
+    """
+    고정 크기 링 버퍼 (캔들 1개 = 행 1개)
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros((capacity * 2, len(CACHE_COLUMNS)), dtype=np.float64)
+        self.size = 0
+        self.head = 0  # 다음에 쓸 위치 (0 ~ capacity-1)
+
+    @property
+    def latest_open_time(self):
+        if self.size == 0:
+            return None
+        return self.data[self.head - 1 + self.capacity, 0]
+
+    def view(self, count=None):
+        """
+        최신 count개 캔들 (오래된 순, 복사 없는 view)
+
+        Args:
+            count: 개수 (None이면 보관 중인 전체)
+        """
+        end = self.head + self.capacity
+        size = self.size if count is None else min(count, self.size)
+        return self.data[end - size:end]
+
+    def append(self, rows):
+        """
+        시간순 행 추가 (open_time이 최신보다 이전/같은 행은 upsert)
+
+        Args:
+            rows: (n, 7) float64 배열 (오래된 순)
+
+        Returns:
+            False: 보관 중인 구간 중간에 빠진 캔들이 들어와서 링을 다시 채워야 함
+        """
+        for row in rows:
+            latest = self.latest_open_time
+            if latest is None or row[0] > latest:
+                self.data[self.head] = row
+                self.data[self.head + self.capacity] = row
+                self.head = (self.head + 1) % self.capacity
+                self.size = min(self.size + 1, self.capacity)
+                continue
+
+            # 이미 있는 캔들 업데이트 (보통 진행 중이던 마지막 캔들)
+            times = self.view()[:, 0]
+            index = int(np.searchsorted(times, row[0]))
+            if index < len(times) and times[index] == row[0]:
+                position = (self.head - self.size + index) % self.capacity
+                self.data[position] = row
+                self.data[position + self.capacity] = row
+            elif index > 0:
+                return False
+            # 보관 구간보다 오래된 캔들은 무시
+        return True
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+
+class CandleCache:
+    """
+    (심볼, 시간봉) → CandleRing
+
+    여러 스레드(다운로드/스트림/스캔)에서 같이 쓰므로 lock으로 보호
+    """
+
+    def __init__(self, capacity=512):
+        """
+        Args:
+            capacity: (심볼, 시간봉)당 보관할 최대 캔들 개수 (window + period + 1 이상)
+        """
+        self.capacity = capacity
+        self._rings = {}
+        self._pending = {}  # DB에서 읽는 중인 키 → 그 사이 저장된 캔들 (읽은 뒤 반영)
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def klines_to_array(klines):
+        """바이낸스 형식 캔들 → (n, 7) 배열 (문자열 값도 변환)"""
+        return CandleFrame.from_klines(klines).data
+
+    @staticmethod
+    def rows_to_array(rows):
+        """DB 행 (open_time, o, h, l, c, v, quote_volume) 또는 CandleFrame → (n, 7) 배열"""
+        return CandleFrame.of(rows).data
+
+    def update(self, symbol, timeframe, klines):
+        """
+        DB에 저장된 캔들 반영 (CandleDatabase.save_listeners에 등록해서 사용)
+        캐시에 없는 (심볼, 시간봉)은 무시 (다음 조회 때 DB에서 전체를 읽음)
+        """
+        rows = self.klines_to_array(sorted(klines, key=lambda kline: int(kline[0])))
+        with self._lock:
+            key = (symbol, timeframe)
+            if key in self._pending:
+                self._pending[key].append(rows)
+                return
+            ring = self._rings.get(key)
+            if ring is None:
+                return
+            if not ring.append(rows):
+                del self._rings[(symbol, timeframe)]
+                self.invalidations += 1
+            self.updates += 1
+
+    def begin_load(self, symbols, timeframe):
+        """DB에서 읽기 전에 호출 - 읽는 동안 저장되는 캔들을 모아뒀다가 load에서 반영"""
+        with self._lock:
+            for symbol in symbols:
+                self._pending.setdefault((symbol, timeframe), [])
+
+    def load(self, symbol, timeframe, rows):
+        """
+        DB에서 읽은 캔들(CandleFrame 또는 DB 행 리스트)로 링 새로 만들기
+
+        Returns:
+            CandleRing
+        """
+        ring = CandleRing(self.capacity)
+        ring.append(self.rows_to_array(rows))
+        with self._lock:
+            for pending_rows in self._pending.pop((symbol, timeframe), []):
+                ring.append(pending_rows)
+            self._rings[(symbol, timeframe)] = ring
+        return ring
+
+    def get(self, symbol, timeframe, count):
+        """
+        최신 count개 캔들
+
+        Returns:
+            CandleFrame (lock 안에서 링 구간을 복사), 캐시에 없으면 None
+        """
+        with self._lock:
+            ring = self._rings.get((symbol, timeframe))
+            if ring is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return CandleFrame(ring.view(count).copy(), assume_sorted=True)
+
+    def get_many(self, db, symbols, timeframe, count):
+        """
+        여러 심볼의 최신 count개 캔들 (없는 심볼만 DB에서 한 번에 읽어서 채움)
+
+        Args:
+            db: CandleDatabase (get_candle_frames_bulk 사용)
+            symbols: 심볼 리스트
+            timeframe: 시간봉
+            count: 심볼당 캔들 개수
+
+        Returns:
+            {symbol: CandleFrame}
+        """
+        result = {}
+        missing = []
+        for symbol in symbols:
+            view = self.get(symbol, timeframe, count)
+            if view is None:
+                missing.append(symbol)
+            else:
+                result[symbol] = view
+
+        if missing:
+            self.begin_load(missing, timeframe)
+            frames = db.get_candle_frames_bulk(missing, timeframe, limit=self.capacity)
+            for symbol in missing:
+                ring = self.load(symbol, timeframe, frames.get(symbol, []))
+                with self._lock:
+                    result[symbol] = CandleFrame(ring.view(count).copy(), assume_sorted=True)
+
+        return result
+
+    def warm(self, db, symbols, timeframes):
+        """시작할 때 미리 채우기 (시간봉마다 get_candle_frames_bulk 1번)"""
+        for timeframe in timeframes:
+            self.begin_load(symbols, timeframe)
+            frames = db.get_candle_frames_bulk(symbols, timeframe, limit=self.capacity)
+            for symbol in symbols:
+                self.load(symbol, timeframe, frames.get(symbol, []))
+
+    def invalidate(self, symbol=None, timeframe=None):
+        """캐시 비우기 (인자가 없으면 전체)"""
+        with self._lock:
+            if symbol is None and timeframe is None:
+                self._rings.clear()
+                return
+            self._rings.pop((symbol, timeframe), None)
+            self.invalidations += 1
+
+    @property
+    def memory_bytes(self):
+        with self._lock:
+            return sum(ring.nbytes for ring in self._rings.values())
+
+    def stats(self):
+        """hit/miss/메모리 통계"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._rings),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'updates': self.updates,
+            'invalidations': self.invalidations,
+            'memory_mb': round(self.memory_bytes / 1024 / 1024, 2),
+        }
@@ -0,0 +1,196 @@
+"""
+컬럼형 캔들 묶음 (DB → 캐시/저장소 → 필터 사이에서 쓰는 공통 형식)
+
+DB 행 (datetime, Decimal ...) / 바이낸스 캔들 (문자열) / 캐시 배열 view를 읽을 때 한 번만 변환
+- (n, 7) float64 배열 1개 (컬럼: open_time(ms), open, high, low, close, volume, quote_volume)
+  → 행/컬럼 인덱싱은 기존 캐시 배열 view와 같음 (frame[i], frame[:, 4], frame[-1, 0])
+- 새로 만들 때는 컬럼마다 연속된 메모리 (컬럼 단위 계산이 빠름), 캐시/메모리 맵 view는 복사 없이 감쌈
+- 항상 open_time 오름차순 (최신 순으로 들어오면 만들 때 정렬)
+- 시간 범위 선택은 open_time 이진 탐색 (searchsorted)
+- 슬라이스는 복사 없는 CandleFrame
+"""
+import numpy as np
+
+from core.resampler import datetime_to_ms, ms_to_datetime
+
+
+CANDLE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'quote_volume')
+
+# 바이낸스 캔들 [open_time, o, h, l, c, v, close_time, quote_volume]에서 컬럼 위치
+KLINE_COLUMNS = [0, 1, 2, 3, 4, 5, 7]
+
+
+class CandleFrame:
+    """
+    시간순 캔들 (n, 7) float64 배열
+    """
+
+    __slots__ = ('data', '_times')
+
+    def __init__(self, data, assume_sorted=False):
+        """
+        Args:
+            data: (n, 7) 배열 (복사하지 않음, float64가 아니면 변환)
+            assume_sorted: True면 시간순 확인 생략 (캐시/저장소 view처럼 이미 정렬된 경우)
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] != len(CANDLE_COLUMNS):
+            data = data.reshape(-1, len(CANDLE_COLUMNS))
+        if not assume_sorted and len(data) > 1 and np.any(data[1:, 0] < data[:-1, 0]):
+            data = data[np.argsort(data[:, 0], kind='stable')]
+        self.data = data
+        self._times = None
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, len(CANDLE_COLUMNS))), assume_sorted=True)
+
+    @classmethod
+    def _from_columns(cls, columns):
+        """(7, n) 배열 → 컬럼마다 연속된 CandleFrame (정렬해도 컬럼 단위 메모리 유지)"""
+        times = columns[0]
+        if len(times) > 1 and np.any(times[1:] < times[:-1]):
+            columns = columns[:, np.argsort(times, kind='stable')]
+        return cls(np.ascontiguousarray(columns, dtype=np.float64).T, assume_sorted=True)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        DB 행 (open_time, o, h, l, c, v, quote_volume) → CandleFrame
+
+        open_time은 datetime(UTC) 또는 밀리초, 최신 순이어도 됨
+        """
+        if not rows:
+            return cls.empty()
+        columns = np.empty((len(CANDLE_COLUMNS), len(rows)))
+        columns[0] = [datetime_to_ms(row[0]) for row in rows]
+        for column in range(1, 6):
+            columns[column] = [row[column] for row in rows]
+        columns[6] = [row[6] or 0 for row in rows]
+        return cls._from_columns(columns)
+
+    @classmethod
+    def from_klines(cls, klines):
+        """바이낸스 형식 캔들 [open_time, o, h, l, c, v, close_time, quote_volume, ...] → CandleFrame"""
+        if not klines:
+            return cls.empty()
+        columns = np.empty((len(CANDLE_COLUMNS), len(klines)))
+        for column, position in enumerate(KLINE_COLUMNS):
+            columns[column] = [kline[position] for kline in klines]
+        return cls._from_columns(columns)
+
+    @classmethod
+    def of(cls, candles):
+        """
+        CandleFrame / (n, 7) 배열 / DB 행 리스트 → CandleFrame (이미 CandleFrame이면 그대로)
+        """
+        if isinstance(candles, cls):
+            return candles
+        if isinstance(candles, np.ndarray):
+            return cls(candles)
+        return cls.from_rows(candles)
+
+    # --- 컬럼 ---
+
+    @property
+    def open_time(self):
+        """open_time 밀리초 (int64, 처음 사용할 때 한 번 변환)"""
+        if self._times is None:
+            self._times = self.data[:, 0].astype(np.int64)
+        return self._times
+
+    @property
+    def open(self):
+        return self.data[:, 1]
+
+    @property
+    def high(self):
+        return self.data[:, 2]
+
+    @property
+    def low(self):
+        return self.data[:, 3]
+
+    @property
+    def close(self):
+        return self.data[:, 4]
+
+    @property
+    def volume(self):
+        return self.data[:, 5]
+
+    @property
+    def quote_volume(self):
+        return self.data[:, 6]
+
+    @property
+    def latest_open_time(self):
+        """마지막 캔들 open_time (ms), 비어있으면 None"""
+        return int(self.data[-1, 0]) if len(self.data) else None
+
+    # --- 인덱싱 ---
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        """
+        frame[i]: 행 (7,) 배열, frame[a:b]: CandleFrame (복사 없음), 그 외 (frame[:, 4] 등): 배열 인덱싱
+        """
+        if isinstance(key, slice):
+            if key.step is not None and key.step < 0:
+                return self.data[key]
+            return CandleFrame(self.data[key], assume_sorted=True)
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or np.dtype(dtype) == self.data.dtype:
+            return self.data
+        return self.data.astype(dtype)
+
+    def __repr__(self):
+        if not len(self):
+            return "CandleFrame(0)"
+        return f"CandleFrame({len(self)}, {ms_to_datetime(self.data[0, 0])} ~ {ms_to_datetime(self.data[-1, 0])})"
+
+    def tail(self, count):
+        """최신 count개"""
+        return self[max(0, len(self) - count):]
+
+    def index_range(self, start_time, end_time):
+        """
+        open_time이 start_time ~ end_time (둘 다 포함)인 구간의 인덱스 (이진 탐색)
+
+        Args:
+            start_time, end_time: UTC datetime 또는 밀리초
+
+        Returns:
+            (start, end): self[start:end]가 그 구간
+        """
+        times = self.data[:, 0]
+        start = int(np.searchsorted(times, datetime_to_ms(start_time), side='left'))
+        end = int(np.searchsorted(times, datetime_to_ms(end_time), side='right'))
+        return start, max(start, end)
+
+    def between(self, start_time, end_time):
+        """open_time이 start_time ~ end_time (둘 다 포함)인 캔들 (CandleFrame)"""
+        start, end = self.index_range(start_time, end_time)
+        return self[start:end]
+
+    # --- 변환 ---
+
+    def to_rows(self):
+        """DB 행 형식 [(open_time datetime, o, h, l, c, v, quote_volume), ...] (float)"""
+        return [(ms_to_datetime(row[0]), *row[1:]) for row in self.data.tolist()]
+
+    def to_klines(self):
+        """바이낸스 형식 [open_time ms, o, h, l, c, v, None, quote_volume] 리스트"""
+        return [[int(row[0]), row[1], row[2], row[3], row[4], row[5], None, row[6]] for row in self.data.tolist()]
+
+
+def to_frame_sets(candle_sets):
+    """{symbol: DB 행 리스트 또는 배열} → {symbol: CandleFrame}"""
+    return {symbol: CandleFrame.of(candles) for symbol, candles in candle_sets.items()}
@@ -0,0 +1,71 @@
+"""
+캔들 마감 기준 필터 스케줄
+
+기존 스케줄러는 서버 시작 시각부터 30분마다 전체 스캔을 실행해서
+5분 필터도 실제로는 30분마다, 캔들 마감과 상관없는 시각에 실행됨
+→ 필터마다 interval 간격으로, UTC 기준 캔들 마감 시각 + delay_seconds에 실행
+  (예: interval 5m → 00:05:03, 00:10:03, ... / interval 1h → 01:00:03, 02:00:03, ...)
+  실행할 때는 그 필터의 using_timeframe만 최신화하고 그 필터만 실행 (SurgeScanner.scan_filter)
+
+config.json 예시:
+    "schedule": {"mode": "candle_close", "delay_seconds": 3}
+    (mode가 없거나 "interval"이면 기존 30분 전체 스캔)
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from core.resampler import timeframe_to_ms
+
+
+# 필터 1개의 실행 일정 (interval_seconds마다, first_run부터)
+FilterSchedule = namedtuple('FilterSchedule', ['filter_type', 'interval_seconds', 'first_run'])
+
+# 캔들 마감 후 기본 대기 시간 (거래소가 마지막 캔들을 확정할 시간)
+DEFAULT_DELAY_SECONDS = 3
+
+
+def next_close_time(timeframe, now=None, delay_seconds=0):
+    """
+    다음 캔들 마감 시각 + delay_seconds (UTC 기준 정렬)
+
+    Args:
+        timeframe: 시간봉 (예: '5m', '1h')
+        now: 기준 시각 (timezone 있는 datetime, 없으면 현재 UTC)
+        delay_seconds: 마감 후 대기 시간 (초)
+
+    Returns:
+        timezone이 UTC인 datetime (now보다 항상 뒤)
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    interval_ms = timeframe_to_ms(timeframe)
+    delay_ms = int(delay_seconds * 1000)
+    now_ms = int(now.timestamp() * 1000)
+    # 마지막 마감 + delay가 아직 안 지났으면 그 시각, 지났으면 다음 마감
+    close_ms = (now_ms - delay_ms) // interval_ms * interval_ms + interval_ms
+    return datetime.fromtimestamp((close_ms + delay_ms) / 1000, tz=timezone.utc)
+
+
+def build_filter_schedules(filter_configs, delay_seconds=DEFAULT_DELAY_SECONDS, now=None):
+    """
+    활성화된 필터마다 실행 일정 만들기
+
+    Args:
+        filter_configs: config의 filter 리스트
+        delay_seconds: 캔들 마감 후 대기 시간 (초)
+        now: 기준 시각 (테스트용)
+
+    Returns:
+        [FilterSchedule, ...]
+    """
+    schedules = []
+    for filter_config in filter_configs:
+        if filter_config.get('enable') is False:
+            continue
+        interval = filter_config['interval']
+        schedules.append(FilterSchedule(
+            filter_config['types'],
+            timeframe_to_ms(interval) // 1000,
+            next_close_time(interval, now=now, delay_seconds=delay_seconds),
+        ))
+    return schedules
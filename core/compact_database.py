@@ -0,0 +1,307 @@
+"""
+압축 캔들 스키마 (MySQL)
+
+기존 candles 테이블 대신 행 크기를 줄인 candles_compact 테이블 사용
+- open_time: BIGINT 밀리초 (DATETIME 변환 없이 바이낸스 값 그대로)
+- 가격/거래량: DOUBLE (DECIMAL → float 변환 없음)
+- 심볼은 symbols 사전 테이블의 SMALLINT id, 시간봉은 TIMEFRAME_IDS의 TINYINT id
+- close_time은 open_time + 시간봉 길이 - 1로 계산되므로 저장하지 않음
+- PRIMARY KEY (symbol_id, timeframe_id, open_time): InnoDB 클러스터드 키라서 심볼별 최신 N개 조회가 연속 읽기
+
+조회 결과의 open_time은 밀리초 정수 (필터/리샘플러는 정수 시간을 그대로 처리)
+"""
+import threading
+from datetime import datetime
+
+from core.database import CandleDatabase
+from core.resampler import timeframe_to_ms, datetime_to_ms, ms_to_datetime
+from core.watermark import get_watermark_index
+
+
+# 시간봉 → id (값을 바꾸면 저장된 데이터와 맞지 않으므로 추가만 할 것)
+TIMEFRAME_IDS = {
+    '1m': 1, '3m': 2, '5m': 3, '15m': 4, '30m': 5,
+    '1h': 6, '2h': 7, '4h': 8, '6h': 9, '8h': 10, '12h': 11,
+    '1d': 12, '3d': 13, '1w': 14, '1M': 15,
+}
+TIMEFRAME_NAMES = {timeframe_id: timeframe for timeframe, timeframe_id in TIMEFRAME_IDS.items()}
+
+CREATE_SYMBOLS_TABLE = """
+CREATE TABLE IF NOT EXISTS symbols (
+    id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    symbol VARCHAR(20) NOT NULL,
+    UNIQUE KEY unique_symbol (symbol)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+CREATE_COMPACT_CANDLES_TABLE = """
+CREATE TABLE IF NOT EXISTS candles_compact (
+    symbol_id SMALLINT UNSIGNED NOT NULL,
+    timeframe_id TINYINT UNSIGNED NOT NULL,
+    open_time BIGINT NOT NULL,
+    open_price DOUBLE NOT NULL,
+    high_price DOUBLE NOT NULL,
+    low_price DOUBLE NOT NULL,
+    close_price DOUBLE NOT NULL,
+    volume DOUBLE NOT NULL,
+    quote_volume DOUBLE NOT NULL,
+    PRIMARY KEY (symbol_id, timeframe_id, open_time),
+    KEY idx_timeframe_open_time (timeframe_id, open_time)
+) ENGINE=InnoDB
+"""
+
+COMPACT_INSERT_ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s, %s, %s, %s, %s)"
+COMPACT_INSERT_CANDLES_QUERY = """
+INSERT INTO candles_compact
+(symbol_id, timeframe_id, open_time, open_price, high_price, low_price, close_price, volume, quote_volume)
+VALUES {values}
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    quote_volume = VALUES(quote_volume)
+"""
+
+COMPACT_BULK_CANDLES_QUERY = """
+SELECT symbol_id, open_time, open_price, high_price, low_price, close_price, volume, quote_volume
+FROM (
+    SELECT symbol_id, open_time, open_price, high_price, low_price, close_price, volume, quote_volume,
+           ROW_NUMBER() OVER (PARTITION BY symbol_id ORDER BY open_time DESC) AS rn
+    FROM candles_compact
+    WHERE timeframe_id = %s AND symbol_id IN ({symbols}) AND open_time >= %s
+) AS recent
+WHERE rn <= %s
+ORDER BY symbol_id, open_time ASC
+"""
+
+CANDLE_COLUMNS = "open_time, open_price, high_price, low_price, close_price, volume, quote_volume"
+
+
+class CompactCandleDatabase(CandleDatabase):
+    """
+    candles_compact 테이블을 쓰는 CandleDatabase
+
+    커넥션 풀/워터마크/save_candles 배치 저장은 CandleDatabase와 같고
+    심볼·시간봉을 id로 바꾸는 부분과 쿼리만 다름
+    """
+
+    insert_row_placeholder = COMPACT_INSERT_ROW_PLACEHOLDER
+    insert_query_template = COMPACT_INSERT_CANDLES_QUERY
+
+    def __init__(self, host='localhost', user='root', password='1234', database='coin_chart', batch_size=1000, pool_size=8):
+        """
+        Args: CandleDatabase와 같음 (테이블이 없으면 생성)
+        """
+        super().__init__(host, user, password, database, batch_size=batch_size, pool_size=pool_size)
+        # candles 테이블과 따로 관리되는 워터마크 인덱스
+        self.watermarks = get_watermark_index((host, database, 'candles_compact'))
+
+        with self.checkout() as (connection, cursor):
+            cursor.execute(CREATE_SYMBOLS_TABLE)
+            cursor.execute(CREATE_COMPACT_CANDLES_TABLE)
+            connection.commit()
+
+        self._symbols_lock = threading.Lock()
+        self.reload_symbols()
+
+    def reload_symbols(self):
+        """심볼 사전 {symbol: id}를 DB에서 다시 불러옴"""
+        symbol_ids = dict(self._fetchall("SELECT symbol, id FROM symbols"))
+        with self._symbols_lock:
+            self._symbol_ids = symbol_ids
+            self._symbol_names = {symbol_id: symbol for symbol, symbol_id in symbol_ids.items()}
+
+    def symbol_id(self, symbol, create=False):
+        """
+        심볼 → id (사전 테이블)
+
+        Args:
+            symbol: 거래쌍
+            create: 없으면 새로 등록
+
+        Returns:
+            id, 없으면 None (create=False일 때)
+        """
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is not None or not create:
+            return symbol_id
+
+        with self._symbols_lock:
+            if symbol not in self._symbol_ids:
+                self._execute("INSERT IGNORE INTO symbols (symbol) VALUES (%s)", (symbol,))
+                symbol_id = self._fetchone("SELECT id FROM symbols WHERE symbol = %s", (symbol,))[0]
+                self._symbol_ids[symbol] = symbol_id
+                self._symbol_names[symbol_id] = symbol
+            return self._symbol_ids[symbol]
+
+    @staticmethod
+    def timeframe_id(timeframe):
+        if timeframe not in TIMEFRAME_IDS:
+            raise ValueError(f"지원하지 않는 시간봉: {timeframe}")
+        return TIMEFRAME_IDS[timeframe]
+
+    def _klines_to_rows(self, symbol, timeframe, klines):
+        """
+        바이낸스 캔들 데이터를 INSERT 파라미터로 변환 (시간은 밀리초 그대로, close_time 제외)
+
+        Returns:
+            [(symbol_id, timeframe_id, open_time, open, high, low, close, volume, quote_volume), ...]
+        """
+        symbol_id = self.symbol_id(symbol, create=True)
+        timeframe_id = self.timeframe_id(timeframe)
+        return [
+            (symbol_id, timeframe_id, int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]),
+             float(k[5]), float(k[7] or 0))
+            for k in klines
+        ]
+
+    def _key(self, symbol, timeframe):
+        """(symbol_id, timeframe_id), 등록되지 않은 심볼이면 None"""
+        symbol_id = self.symbol_id(symbol)
+        if symbol_id is None:
+            return None
+        return symbol_id, self.timeframe_id(timeframe)
+
+    def load_watermarks(self):
+        query = """
+        SELECT symbol_id, timeframe_id, MAX(open_time), COUNT(*), MIN(open_time)
+        FROM candles_compact
+        GROUP BY symbol_id, timeframe_id
+        """
+        rows = self._fetchall(query)
+        self.watermarks.load([(self._symbol_names[symbol_id], TIMEFRAME_NAMES[timeframe_id], latest, count, earliest)
+                              for symbol_id, timeframe_id, latest, count, earliest in rows])
+        return len(rows)
+
+    def get_latest_candle_time(self, symbol, timeframe):
+        key = self._key(symbol, timeframe)
+        if key is None:
+            return None
+        query = """
+        SELECT MAX(open_time) FROM candles_compact
+        WHERE symbol_id = %s AND timeframe_id = %s
+        """
+        result = self._fetchone(query, key)
+        if result and result[0] is not None:
+            return ms_to_datetime(result[0])
+        return None
+
+    def get_candles(self, symbol, timeframe, limit=100):
+        """
+        최신 캔들 limit개 조회 (오래된 순, open_time은 밀리초 정수)
+        """
+        key = self._key(symbol, timeframe)
+        if key is None:
+            return []
+        query = f"""
+        SELECT {CANDLE_COLUMNS}
+        FROM candles_compact
+        WHERE symbol_id = %s AND timeframe_id = %s
+        ORDER BY open_time DESC
+        LIMIT %s
+        """
+        return self._fetchall(query, (*key, limit))[::-1]
+
+    def get_candles_bulk(self, symbols, timeframe, limit=100, chunk_size=200):
+        """
+        여러 심볼의 최신 캔들 limit개를 한 번에 조회 (CandleDatabase.get_candles_bulk와 같음)
+        """
+        since = datetime_to_ms(datetime.utcnow()) - timeframe_to_ms(timeframe) * (limit + 1) * 2
+        result = self._get_candles_bulk_since(symbols, timeframe, limit, since, chunk_size)
+        short = self._short_symbols(result, timeframe, limit)
+        if short:
+            result.update(self._get_candles_bulk_since(short, timeframe, limit, 0, chunk_size))
+        return result
+
+    def _get_candles_bulk_since(self, symbols, timeframe, limit, since, chunk_size):
+        timeframe_id = self.timeframe_id(timeframe)
+        result = {symbol: [] for symbol in symbols}
+        ids = [self._symbol_ids[symbol] for symbol in symbols if symbol in self._symbol_ids]
+        for i in range(0, len(ids), chunk_size):
+            chunk = ids[i:i + chunk_size]
+            query = COMPACT_BULK_CANDLES_QUERY.format(symbols=', '.join(['%s'] * len(chunk)))
+            for row in self._fetchall(query, (timeframe_id, *chunk, since, limit)):
+                result[self._symbol_names[row[0]]].append(row[1:])
+
+        return result
+
+    def get_candles_between(self, symbol, timeframe, start_time, end_time):
+        """
+        특정 기간의 캔들 조회 (start_time/end_time은 datetime 또는 밀리초, 오래된 순)
+        """
+        key = self._key(symbol, timeframe)
+        if key is None:
+            return []
+        query = f"""
+        SELECT {CANDLE_COLUMNS}
+        FROM candles_compact
+        WHERE symbol_id = %s AND timeframe_id = %s
+        AND open_time >= %s AND open_time <= %s
+        ORDER BY open_time ASC
+        """
+        return self._fetchall(query, (*key, datetime_to_ms(start_time), datetime_to_ms(end_time)))
+
+    def check_symbol_exists(self, symbol, timeframe):
+        return self.get_data_count(symbol, timeframe) > 0
+
+    def get_data_count(self, symbol, timeframe):
+        key = self._key(symbol, timeframe)
+        if key is None:
+            return 0
+        query = "SELECT COUNT(*) FROM candles_compact WHERE symbol_id = %s AND timeframe_id = %s"
+        return self._fetchone(query, key)[0]
+
+    def delete_old_candles(self, symbol, timeframe, keep_count=1000):
+        key = self._key(symbol, timeframe)
+        if key is None:
+            return 0
+        # 클러스터드 키 순서라서 keep_count번째 최신 open_time을 바로 찾을 수 있음
+        query = """
+        SELECT open_time FROM candles_compact
+        WHERE symbol_id = %s AND timeframe_id = %s
+        ORDER BY open_time DESC
+        LIMIT 1 OFFSET %s
+        """
+        boundary = self._fetchone(query, (*key, keep_count - 1))
+        if boundary is None:
+            return 0
+
+        delete_query = """
+        DELETE FROM candles_compact
+        WHERE symbol_id = %s AND timeframe_id = %s AND open_time < %s
+        """
+        deleted = self._execute(delete_query, (*key, boundary[0]))
+        self.watermarks.record_deleted(symbol, timeframe, deleted)
+        if deleted > 0:
+            print(f"🗑️ {symbol} ({timeframe}): {deleted}개 오래된 캔들 삭제 (유지: {keep_count}개)")
+        return deleted
+
+    def cleanup_all_old_data(self, keep_count=10000):
+        total_deleted = 0
+        for symbol_id, timeframe_id in self._fetchall("SELECT DISTINCT symbol_id, timeframe_id FROM candles_compact"):
+            total_deleted += self.delete_old_candles(self._symbol_names[symbol_id], TIMEFRAME_NAMES[timeframe_id], keep_count)
+        return total_deleted
+
+    def get_timeframes(self):
+        rows = self._fetchall("SELECT DISTINCT timeframe_id FROM candles_compact")
+        return [TIMEFRAME_NAMES[row[0]] for row in rows]
+
+    def delete_candles_before(self, timeframe, cutoff, limit=5000):
+        delete_query = """
+        DELETE FROM candles_compact
+        WHERE timeframe_id = %s AND open_time < %s
+        LIMIT %s
+        """
+        return self._execute(delete_query, (self.timeframe_id(timeframe), datetime_to_ms(cutoff), limit))
+
+    def get_partitions(self):
+        """압축 테이블은 파티션을 쓰지 않음 (시간봉별 cutoff 삭제만 사용)"""
+        return []
+
+    def truncate(self):
+        with self.checkout() as (connection, cursor):
+            cursor.execute("TRUNCATE TABLE candles_compact")
+            connection.commit()
+        self.watermarks.reset()
@@ -1,5 +1,48 @@
-import mysql.connector
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from core import profiler
+from core.candle_frame import CandleFrame
+from core.db_pool import get_pool
+from core.resampler import timeframe_to_ms, datetime_to_ms, ms_to_datetime
+from core.watermark import get_watermark_index
+from core.retention import to_days_to_datetime
+
+
+# 밀리초 타임스탬프 → UTC datetime 변환용
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+# save_candles용 multi-row upsert 쿼리 ({values}에 행 개수만큼 placeholder가 들어감)
+INSERT_ROW_PLACEHOLDER = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+INSERT_CANDLES_QUERY = """
+INSERT INTO candles 
+(symbol, timeframe, open_time, open_price, high_price, low_price, close_price, 
+ volume, close_time, quote_volume)
+VALUES {values}
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    close_time = VALUES(close_time),
+    quote_volume = VALUES(quote_volume)
+"""
+
+# get_candles_bulk용 쿼리 ({symbols}에 심볼 개수만큼 placeholder가 들어감)
+BULK_CANDLES_QUERY = """
+SELECT symbol, open_time, open_price, high_price, low_price, close_price, volume, quote_volume
+FROM (
+    SELECT symbol, open_time, open_price, high_price, low_price, close_price, volume, quote_volume,
+           ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY open_time DESC) AS rn
+    FROM candles
+    WHERE timeframe = %s AND symbol IN ({symbols}) AND open_time >= %s
+) AS recent
+WHERE rn <= %s
+ORDER BY symbol, open_time ASC
+"""
 
 
 class CandleDatabase:
@@ -10,76 +53,175 @@ class CandleDatabase:
     1. MySQL 서버가 실행중이어야 합니다
     2. 데이터베이스와 테이블이 생성되어 있어야 합니다 (README_MYSQL.md 참고)
     3. host, user, password, database 정보를 입력해서 연결합니다
+    
+    연결은 프로세스 전체가 공유하는 커넥션 풀에서 작업마다 빌려 씀 (core/db_pool.py)
+    그래서 여러 스레드에서 같은 객체를 동시에 사용해도 됨
     """
     
-    def __init__(self, host='localhost', user='root', password='1234', database='coin_chart'):
+    # save_candles의 multi-row upsert 쿼리 (다른 저장소는 자기 문법으로 바꿔서 사용)
+    insert_row_placeholder = INSERT_ROW_PLACEHOLDER
+    insert_query_template = INSERT_CANDLES_QUERY
+    
+    def __init__(self, host='localhost', user='root', password='1234', database='coin_chart', batch_size=1000, pool_size=8):
         """
-        MySQL 데이터베이스에 연결
+        MySQL 커넥션 풀 연결 (같은 접속 정보의 풀이 이미 있으면 재사용)
         
         Args:
             host: MySQL 서버 주소 (기본값: localhost)
             user: MySQL 사용자 이름 (기본값: root)
             password: MySQL 비밀번호
             database: 사용할 데이터베이스 이름 (기본값: coin_chart)
+            batch_size: save_candles에서 INSERT 1번에 넣을 최대 행 개수 (기본값: 1000)
+            pool_size: 커넥션 풀 크기 (기본값: 8, 풀을 처음 만들 때만 적용)
         """
-        self.connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database
-        )
-        self.cursor = self.connection.cursor()
-        print(f"✅ MySQL 데이터베이스 '{database}'에 연결되었습니다.")
+        self.batch_size = max(1, batch_size)
+        self._insert_queries = {}
+        self.pool = get_pool(host, user, password, database, pool_size=pool_size)
+        
+        # (심볼, 시간봉)별 최신 시간/개수 (같은 DB를 쓰는 객체끼리 공유)
+        self.watermarks = get_watermark_index((host, database))
+        
+        # save_candles 후 호출할 함수들 listener(symbol, timeframe, klines) (예: CandleCache.update)
+        self.save_listeners = []
+    
+    @contextmanager
+    def checkout(self):
+        """
+        풀에서 연결을 빌려서 (connection, cursor)로 사용
+        
+        사용 예:
+            with db.checkout() as (connection, cursor):
+                cursor.execute(...)
+                connection.commit()
+        """
+        started = time.perf_counter()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                yield connection, cursor
+            finally:
+                cursor.close()
+                profiler.count('db_queries')
+                profiler.observe('db_query', time.perf_counter() - started)
+    
+    def _fetchall(self, query, params=None):
+        """조회 쿼리 실행 후 모든 행 반환"""
+        with self.checkout() as (connection, cursor):
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    def _fetchone(self, query, params=None):
+        """조회 쿼리 실행 후 첫 행 반환"""
+        with self.checkout() as (connection, cursor):
+            cursor.execute(query, params)
+            return cursor.fetchone()
+    
+    def _execute(self, query, params=None):
+        """변경 쿼리 실행 + commit 후 영향받은 행 개수 반환"""
+        with self.checkout() as (connection, cursor):
+            cursor.execute(query, params)
+            connection.commit()
+            return cursor.rowcount
     
     def save_candles(self, symbol, timeframe, klines):
         """
         캔들 데이터를 DB에 저장
         이미 존재하는 데이터는 업데이트, 없으면 새로 삽입
+        batch_size개씩 묶어서 multi-row INSERT ... ON DUPLICATE KEY UPDATE 1번으로 저장
         
         Args:
             symbol: 거래쌍 (예: 'BTCUSDT')
             timeframe: 시간봉 (예: '1h', '5m')
             klines: 바이낸스에서 받은 캔들 데이터 리스트
+        
+        Returns:
+            저장된 캔들 개수
         """
-        insert_query = """
-        INSERT INTO candles 
-        (symbol, timeframe, open_time, open_price, high_price, low_price, close_price, 
-         volume, close_time, quote_volume)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open_price = VALUES(open_price),
-            high_price = VALUES(high_price),
-            low_price = VALUES(low_price),
-            close_price = VALUES(close_price),
-            volume = VALUES(volume),
-            close_time = VALUES(close_time),
-            quote_volume = VALUES(quote_volume)
-        """
-        
-        saved_count = 0
-        for kline in klines:
-            # 밀리초를 초로 변환 후 datetime 객체로 변환
-            open_time = datetime.utcfromtimestamp(int(kline[0]) / 1000)
-            close_time = datetime.utcfromtimestamp(int(kline[6]) / 1000)
+        if not klines:
+            return 0
+        
+        rows = self._klines_to_rows(symbol, timeframe, klines)
+        
+        with self.checkout() as (connection, cursor):
+            for i in range(0, len(rows), self.batch_size):
+                chunk = rows[i:i + self.batch_size]
+                # 행 개수별 쿼리는 캐시해서 재사용
+                query = self._insert_queries.get(len(chunk))
+                if query is None:
+                    query = self.insert_query_template.format(values=', '.join([self.insert_row_placeholder] * len(chunk)))
+                    self._insert_queries[len(chunk)] = query
+                
+                # [(row1), (row2), ...] → [row1 값들..., row2 값들...]
+                params = [value for row in chunk for value in row]
+                cursor.execute(query, params)
             
-            values = (
+            connection.commit()
+        
+        self.watermarks.record_saved(symbol, timeframe, [int(k[0]) for k in klines])
+        profiler.count(f"candles_ingested:{timeframe}", len(rows))
+        for listener in self.save_listeners:
+            listener(symbol, timeframe, klines)
+        return len(rows)
+    
+    @staticmethod
+    def _klines_to_rows(symbol, timeframe, klines):
+        """
+        바이낸스 캔들 데이터를 INSERT 파라미터로 변환
+        밀리초 → datetime은 기준 시각 + timedelta로 계산 (utcfromtimestamp 반복 호출 방지)
+        
+        Returns:
+            [(symbol, timeframe, open_time, open, high, low, close, volume, close_time, quote_volume), ...]
+        """
+        epoch = EPOCH
+        ms = MILLISECOND
+        return [
+            (
                 symbol,
                 timeframe,
-                open_time,
-                float(kline[1]),  # 시가
-                float(kline[2]),  # 고가
-                float(kline[3]),  # 저가
-                float(kline[4]),  # 종가
-                float(kline[5]),  # 거래량
-                close_time,
-                float(kline[7])   # 거래대금
+                epoch + int(k[0]) * ms,
+                float(k[1]),  # 시가
+                float(k[2]),  # 고가
+                float(k[3]),  # 저가
+                float(k[4]),  # 종가
+                float(k[5]),  # 거래량
+                epoch + int(k[6]) * ms,
+                float(k[7])   # 거래대금
             )
-            
-            self.cursor.execute(insert_query, values)
-            saved_count += 1
+            for k in klines
+        ]
+    
+    def load_watermarks(self):
+        """
+        모든 (심볼, 시간봉)의 최신 open_time과 캔들 개수를 GROUP BY 쿼리 1번으로 불러옴
         
-        self.connection.commit()
-        return saved_count
+        Returns:
+            불러온 (심볼, 시간봉) 개수
+        """
+        query = """
+        SELECT symbol, timeframe, MAX(open_time), COUNT(*), MIN(open_time)
+        FROM candles
+        GROUP BY symbol, timeframe
+        """
+        rows = self._fetchall(query)
+        self.watermarks.load([(symbol, timeframe, datetime_to_ms(latest), count, datetime_to_ms(earliest))
+                              for symbol, timeframe, latest, count, earliest in rows])
+        return len(rows)
+    
+    def get_watermark(self, symbol, timeframe):
+        """
+        메모리 인덱스에서 최신 캔들 시간과 개수 조회 (DB 조회 없음, 최초 1번만 불러옴)
+        
+        Args:
+            symbol: 거래쌍 (예: 'BTCUSDT')
+            timeframe: 시간봉 (예: '1h', '5m')
+        
+        Returns:
+            (최신 open_time 밀리초, 캔들 개수), 데이터가 없으면 None
+        """
+        if not self.watermarks.loaded:
+            count = self.load_watermarks()
+            print(f"✅ 워터마크 인덱스 로드 완료: {count}개 (심볼, 시간봉)")
+        return self.watermarks.get(symbol, timeframe)
     
     def get_latest_candle_time(self, symbol, timeframe):
         """
@@ -100,8 +242,7 @@ class CandleDatabase:
         LIMIT 1
         """
         
-        self.cursor.execute(query, (symbol, timeframe))
-        result = self.cursor.fetchone()
+        result = self._fetchone(query, (symbol, timeframe))
         
         if result:
             return result[0]  # datetime 객체
@@ -109,7 +250,7 @@ class CandleDatabase:
     
     def get_candles(self, symbol, timeframe, limit=100):
         """
-        DB에서 캔들 데이터를 조회 (최신순)
+        DB에서 최신 캔들 limit개를 조회 (오래된 것부터 정렬해서 반환)
         
         Args:
             symbol: 거래쌍 (예: 'BTCUSDT')
@@ -117,7 +258,7 @@ class CandleDatabase:
             limit: 조회할 캔들 개수 (기본값: 100)
         
         Returns:
-            캔들 데이터 리스트 [(open_time, open, high, low, close, volume), ...]
+            캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
         """
         query = """
         SELECT open_time, open_price, high_price, low_price, close_price, volume, quote_volume
@@ -127,11 +268,116 @@ class CandleDatabase:
         LIMIT %s
         """
         
-        self.cursor.execute(query, (symbol, timeframe, limit))
-        results = self.cursor.fetchall()
+        results = self._fetchall(query, (symbol, timeframe, limit))
         
         # 시간순으로 정렬 (오래된 것부터)
-        return results
+        return results[::-1]
+    
+    def get_candles_bulk(self, symbols, timeframe, limit=100, chunk_size=200):
+        """
+        여러 심볼의 최신 캔들 limit개를 한 번에 조회
+        심볼마다 get_candles를 호출하는 대신 chunk_size개 심볼당 쿼리 1번
+        
+        - open_time 범위(최근 limit*2개 캔들 기간)로 먼저 좁히고
+        - ROW_NUMBER() 윈도우 함수로 심볼별 최신 limit개만 남김 (MySQL 8.0 이상)
+        - 업데이트가 밀린 심볼처럼 그 기간에 캔들이 부족한데 DB에는 더 있는 심볼은 기간 제한 없이 다시 조회
+        
+        Args:
+            symbols: 심볼 리스트
+            timeframe: 시간봉 (예: '1h', '5m')
+            limit: 심볼당 조회할 캔들 개수
+            chunk_size: 쿼리 1번에 넣을 심볼 개수
+        
+        Returns:
+            {symbol: 캔들 데이터 리스트 (오래된 순)} - 데이터가 없는 심볼은 빈 리스트
+        """
+        # 조회 범위 하한 (캔들이 중간에 빠져도 충분하도록 limit의 2배 기간)
+        since = datetime.utcnow() - timedelta(milliseconds=timeframe_to_ms(timeframe) * (limit + 1) * 2)
+        
+        result = self._get_candles_bulk_since(symbols, timeframe, limit, since, chunk_size)
+        short = self._short_symbols(result, timeframe, limit)
+        if short:
+            result.update(self._get_candles_bulk_since(short, timeframe, limit, ms_to_datetime(0), chunk_size))
+        return result
+    
+    def _get_candles_bulk_since(self, symbols, timeframe, limit, since, chunk_size):
+        """get_candles_bulk의 쿼리 부분 (open_time >= since 중 심볼별 최신 limit개)"""
+        result = {symbol: [] for symbol in symbols}
+        for i in range(0, len(symbols), chunk_size):
+            chunk = symbols[i:i + chunk_size]
+            query = BULK_CANDLES_QUERY.format(symbols=', '.join(['%s'] * len(chunk)))
+            rows = self._fetchall(query, (timeframe, *chunk, since, limit))
+            
+            # (symbol, open_time, ...) → 심볼별 리스트 (쿼리에서 이미 심볼, 시간 순으로 정렬됨)
+            for row in rows:
+                result[row[0]].append(row[1:])
+        
+        return result
+    
+    def _short_symbols(self, candle_sets, timeframe, limit):
+        """
+        limit개보다 적게 조회됐는데 워터마크 기준으로 DB에 더 있는 심볼
+        (워터마크가 없으면 DB에 데이터가 없으므로 제외)
+        """
+        short = []
+        for symbol, rows in candle_sets.items():
+            if len(rows) >= limit:
+                continue
+            watermark = self.get_watermark(symbol, timeframe)
+            if watermark is not None and watermark[1] > len(rows):
+                short.append(symbol)
+        return short
+    
+    def get_candles_between(self, symbol, timeframe, start_time, end_time):
+        """
+        특정 기간의 캔들 데이터를 조회 (오래된 순)
+        
+        Args:
+            symbol: 거래쌍 (예: 'BTCUSDT')
+            timeframe: 시간봉 (예: '1h', '5m')
+            start_time: 시작 open_time (UTC datetime, 포함)
+            end_time: 종료 open_time (UTC datetime, 포함)
+        
+        Returns:
+            캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
+        """
+        query = """
+        SELECT open_time, open_price, high_price, low_price, close_price, volume, quote_volume
+        FROM candles 
+        WHERE symbol = %s AND timeframe = %s 
+        AND open_time >= %s AND open_time <= %s
+        ORDER BY open_time ASC
+        """
+        
+        return self._fetchall(query, (symbol, timeframe, start_time, end_time))
+    
+    def get_candle_frame(self, symbol, timeframe, limit=100):
+        """
+        get_candles 결과를 CandleFrame으로 (조회할 때 한 번만 float/밀리초로 변환)
+        
+        Returns:
+            CandleFrame (오래된 순)
+        """
+        return CandleFrame.from_rows(self.get_candles(symbol, timeframe, limit))
+    
+    def get_candle_frames_bulk(self, symbols, timeframe, limit=100):
+        """
+        get_candles_bulk 결과를 CandleFrame으로
+        
+        Returns:
+            {symbol: CandleFrame} - 데이터가 없는 심볼은 빈 CandleFrame
+        """
+        candle_sets = self.get_candles_bulk(symbols, timeframe, limit=limit)
+        return {symbol: CandleFrame.from_rows(candle_sets.get(symbol, [])) for symbol in symbols}
+    
+    def get_candle_frame_between(self, symbol, timeframe, start_time, end_time):
+        """
+        get_candles_between 결과를 CandleFrame으로
+        
+        Returns:
+            CandleFrame (오래된 순)
+        """
+        return CandleFrame.from_rows(self.get_candles_between(symbol, timeframe, start_time, end_time))
     
     def check_symbol_exists(self, symbol, timeframe):
         """
@@ -150,8 +396,7 @@ class CandleDatabase:
         WHERE symbol = %s AND timeframe = %s
         """
         
-        self.cursor.execute(query, (symbol, timeframe))
-        count = self.cursor.fetchone()[0]
+        count = self._fetchone(query, (symbol, timeframe))[0]
         return count > 0
     
     def get_data_count(self, symbol, timeframe):
@@ -171,8 +416,7 @@ class CandleDatabase:
         WHERE symbol = %s AND timeframe = %s
         """
         
-        self.cursor.execute(query, (symbol, timeframe))
-        count = self.cursor.fetchone()[0]
+        count = self._fetchone(query, (symbol, timeframe))[0]
         return count
     
     def delete_old_candles(self, symbol, timeframe, keep_count=1000):
@@ -208,9 +452,8 @@ class CandleDatabase:
         )
         """
         
-        self.cursor.execute(delete_query, (symbol, timeframe, symbol, timeframe, keep_count - 1))
-        self.connection.commit()
-        deleted = self.cursor.rowcount
+        deleted = self._execute(delete_query, (symbol, timeframe, symbol, timeframe, keep_count - 1))
+        self.watermarks.record_deleted(symbol, timeframe, deleted)
         
         if deleted > 0:
             print(f"🗑️ {symbol} ({timeframe}): {deleted}개 오래된 캔들 삭제 (유지: {keep_count}개)")
@@ -229,8 +472,7 @@ class CandleDatabase:
         """
         # 모든 심볼/시간봉 조합 조회
         query = "SELECT DISTINCT symbol, timeframe FROM candles"
-        self.cursor.execute(query)
-        combinations = self.cursor.fetchall()
+        combinations = self._fetchall(query)
         
         total_deleted = 0
         for symbol, timeframe in combinations:
@@ -244,10 +486,96 @@ class CandleDatabase:
         
         return total_deleted
     
+    def get_timeframes(self):
+        """
+        DB에 저장된 시간봉 목록
+        
+        Returns:
+            시간봉 리스트 (예: ['15m', '1h', '5m'])
+        """
+        return [row[0] for row in self._fetchall("SELECT DISTINCT timeframe FROM candles")]
+    
+    def delete_candles_before(self, timeframe, cutoff, limit=5000):
+        """
+        시간봉의 cutoff 이전 캔들 삭제 (모든 심볼, 최대 limit개)
+        
+        Args:
+            timeframe: 시간봉 (예: '1h', '5m')
+            cutoff: 기준 시각 (naive UTC datetime, 이 시각 이전 open_time이 삭제 대상)
+            limit: 한 번에 삭제할 최대 행 수 (잠금 시간 제한)
+        
+        Returns:
+            삭제된 캔들 개수
+        """
+        delete_query = """
+        DELETE FROM candles
+        WHERE timeframe = %s AND open_time < %s
+        LIMIT %s
+        """
+        return self._execute(delete_query, (timeframe, cutoff, limit))
+    
+    def get_partitions(self):
+        """
+        candles 테이블의 RANGE(TO_DAYS(open_time)) 파티션 목록
+        
+        Returns:
+            [(파티션 이름, TO_DAYS 상한값 또는 None(MAXVALUE), 행 수 추정치)], 파티션이 없으면 []
+        """
+        query = """
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS, PARTITION_METHOD, PARTITION_EXPRESSION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'candles' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """
+        partitions = []
+        for name, description, rows, method, expression in self._fetchall(query):
+            if method != 'RANGE' or 'to_days' not in (expression or '').lower():
+                return []
+            upper = None if description == 'MAXVALUE' else int(description)
+            partitions.append((name, upper, rows))
+        return partitions
+    
+    def drop_partitions(self, names):
+        """
+        파티션 통째로 삭제 (행 단위 DELETE 없이 바로 공간 반환)
+        
+        Args:
+            names: 파티션 이름 리스트
+        """
+        with self.checkout() as (connection, cursor):
+            cursor.execute(f"ALTER TABLE candles DROP PARTITION {', '.join(names)}")
+        print(f"🗑️ 파티션 {len(names)}개 삭제: {', '.join(names)}")
+    
+    def split_max_partition(self, max_partition, bounds):
+        """
+        MAXVALUE 파티션에서 일별 파티션 분리
+        
+        Args:
+            max_partition: MAXVALUE 파티션 이름 (예: 'pmax')
+            bounds: 새 파티션 상한값 리스트 (TO_DAYS 값, 오름차순)
+        
+        Returns:
+            만든 파티션 이름 리스트 (p + 해당 날짜, 예: 'p20260101')
+        """
+        names = [(to_days_to_datetime(bound) - timedelta(days=1)).strftime('p%Y%m%d') for bound in bounds]
+        definitions = [f"PARTITION {name} VALUES LESS THAN ({bound})" for name, bound in zip(names, bounds)]
+        definitions.append(f"PARTITION {max_partition} VALUES LESS THAN MAXVALUE")
+        with self.checkout() as (connection, cursor):
+            cursor.execute(f"ALTER TABLE candles REORGANIZE PARTITION {max_partition} INTO ({', '.join(definitions)})")
+        return names
+    
+    def truncate(self):
+        """
+        모든 캔들 데이터 삭제
+        """
+        with self.checkout() as (connection, cursor):
+            cursor.execute("TRUNCATE TABLE candles")
+            connection.commit()
+        self.watermarks.reset()
+    
     def close(self):
         """
-        데이터베이스 연결 종료
+        데이터베이스 사용 종료
+        연결은 작업마다 풀에 반납되므로 여기서 닫을 연결은 없음 (풀 정리는 db_pool.close_all_pools)
         """
-        self.cursor.close()
-        self.connection.close()
-        print("✅ 데이터베이스 연결이 종료되었습니다.")
+        pass
@@ -0,0 +1,110 @@
+"""
+MySQL 커넥션 풀 (프로세스 전체 공유)
+
+같은 접속 정보로 만든 CandleDatabase는 모두 하나의 풀을 공유
+스캔마다 연결/핸드셰이크를 새로 하지 않고, 작업 단위로 연결을 빌렸다가 돌려줌
+"""
+import threading
+from contextlib import contextmanager
+
+from mysql.connector import pooling
+
+
+# mysql.connector 풀의 최대 크기
+MAX_POOL_SIZE = 32
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    mysql.connector 풀 + 대기 기능
+
+    mysql.connector 풀은 연결이 모두 사용 중이면 바로 에러를 내기 때문에
+    세마포어로 빈 연결이 생길 때까지 기다리게 함
+    """
+
+    def __init__(self, host, user, password, database, pool_size=8, checkout_timeout=30.0):
+        """
+        Args:
+            host, user, password, database: MySQL 접속 정보
+            pool_size: 풀 크기 (최대 32)
+            checkout_timeout: 빈 연결을 기다릴 최대 시간 (초)
+        """
+        self.pool_size = max(1, min(pool_size, MAX_POOL_SIZE))
+        self.checkout_timeout = checkout_timeout
+        self.database = database
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=f"coinalarm_{id(self)}",
+            pool_size=self.pool_size,
+            pool_reset_session=True,
+            host=host,
+            user=user,
+            password=password,
+            database=database
+        )
+        self._available = threading.BoundedSemaphore(self.pool_size)
+
+        # 통계
+        self.checkouts = 0
+        self.reconnects = 0
+
+    @contextmanager
+    def connection(self):
+        """
+        연결 1개를 빌려서 사용 후 풀에 반납
+
+        빌릴 때 연결 상태를 확인하고 끊어져 있으면 재연결 (health check)
+
+        Yields:
+            MySQL 연결
+        """
+        if not self._available.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"DB 커넥션 풀 대기 시간 초과 ({self.checkout_timeout}초, 풀 크기: {self.pool_size})")
+
+        connection = None
+        try:
+            connection = self._pool.get_connection()
+            self.checkouts += 1
+
+            # health check: 서버가 끊은 연결이면 재연결
+            if not connection.is_connected():
+                connection.reconnect(attempts=3, delay=0.5)
+                self.reconnects += 1
+
+            yield connection
+        finally:
+            if connection is not None:
+                # 풀링된 연결의 close()는 풀에 반납
+                connection.close()
+            self._available.release()
+
+    def close(self):
+        """풀에 남아있는 연결 모두 종료"""
+        self._pool._remove_connections()
+
+
+def get_pool(host, user, password, database, pool_size=8):
+    """
+    접속 정보별 공유 풀 반환 (없으면 생성)
+
+    Returns:
+        ConnectionPool
+    """
+    key = (host, user, database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(host, user, password, database, pool_size=pool_size)
+            _pools[key] = pool
+            print(f"✅ MySQL 커넥션 풀 생성: '{database}' (크기: {pool.pool_size})")
+        return pool
+
+
+def close_all_pools():
+    """모든 풀 정리 (서버 종료 시)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
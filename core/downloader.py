@@ -3,12 +3,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../')
 
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
-from core.database import CandleDatabase
+from core.storage import create_candle_database
+from core.fetcher import KlineFetcher, FetchJob, FetchStats
+from core import profiler
+from core.rate_limiter import WeightRateLimiter, kline_request_weight, TICKER_24H_WEIGHT
+from core.resampler import CandleResampler, BASE_TIMEFRAME, ms_to_datetime
 import requests
 import time
 import logging
 import json
 from datetime import timedelta
+from functools import partial
 import pickle
 
 
@@ -17,18 +22,40 @@ class ChartDownloader:
     바이낸스에서 캔들 데이터를 다운로드하고 MySQL DB에 저장하는 클래스
     """
     
-    def __init__(self, db_config=None):
+    def __init__(self, db_config=None, max_workers=8, weight_per_minute=2400, storage_config=None, candle_cache=None, candle_store=None, indicators=None):
         """
         Args:
             db_config: DB 연결 정보 딕셔너리 (없으면 기본값 사용) 예: {'host': 'localhost', 'user': 'root', 'password': '1234', 'database': 'coin_alarm'}
+            max_workers: 동시 다운로드 스레드 개수 (기본값: 8)
+            weight_per_minute: 바이낸스 분당 request weight 제한 (기본값: 2400)
+            storage_config: 저장소 설정 (config.json의 storage, 없으면 MySQL) 예: {'backend': 'sqlite', 'path': 'data/candles.db'}
+            candle_cache: 저장한 캔들을 반영할 CandleCache (없으면 사용 안 함)
+            candle_store: 저장한 캔들을 이어 쓸 MmapCandleStore (없으면 사용 안 함)
+            indicators: 저장한 캔들로 갱신할 IndicatorStore (없으면 사용 안 함)
         """
         self.client = Client()
         
-        # DB 설정이 주어지면 사용, 아니면 기본값 사용
-        if db_config:
-            self.db = CandleDatabase(**db_config)
-        else:
-            self.db = CandleDatabase()
+        # 모든 요청이 공유하는 weight 제한 + 동시 다운로드 엔진
+        self.rate_limiter = WeightRateLimiter(weight_per_minute=weight_per_minute)
+        self.fetcher = KlineFetcher(max_workers=max_workers, rate_limiter=self.rate_limiter)
+        
+        # 저장소 설정(storage.backend)에 맞는 DB 생성 (기본값: MySQL, db_config가 없으면 기본 접속 정보)
+        self.db = create_candle_database(db_config, storage_config)
+        
+        # DB에 저장하는 모든 캔들(다운로드/리샘플/스트림)을 캐시/메모리 맵 파일/지표 상태에도 반영
+        self.candle_cache = candle_cache
+        if candle_cache is not None:
+            self.db.save_listeners.append(candle_cache.update)
+        self.candle_store = candle_store
+        if candle_store is not None:
+            # 새 파일은 저장한 이 DB에서 채움 (공유 저장소에 DB를 붙여두지 않음)
+            self.db.save_listeners.append(partial(candle_store.append, db=self.db))
+        self.indicators = indicators
+        if indicators is not None:
+            self.db.save_listeners.append(indicators.update)
+        
+        # 1분봉 → 상위 시간봉 리샘플러
+        self.resampler = CandleResampler(self.db)
         
         # 로거 설정
         self.logger = self._setup_logger()
@@ -75,19 +102,17 @@ class ChartDownloader:
         try:
             self.logger.debug(f"{symbol} ({timeframe}) 데이터 처리 시작")
             
-            # API 요청 전 딜레이 (요청 제한 방지)
-            time.sleep(0.05)
-            
-            # 1. DB에 해당 심볼의 데이터가 있는지 확인
-            if self.db.check_symbol_exists(symbol, timeframe):
+            # 1. DB에 해당 심볼의 데이터가 있는지 확인 (워터마크 인덱스, DB 조회 없음)
+            watermark = self.db.get_watermark(symbol, timeframe)
+            if watermark is not None:
                 # 데이터가 있으면 업데이트만 수행
-                existing_count = self.db.get_data_count(symbol, timeframe)
+                existing_count = watermark[1]
                 self.logger.debug(f"{symbol}: DB에 기존 데이터 {existing_count}개 발견")
                 return self._update_latest_data(symbol, timeframe)
             else:
                 # 데이터가 없으면 처음부터 다운로드
                 self.logger.info(f"{symbol}: 신규 다운로드 ({initial_limit}개 캔들)")
-                klines = self.client.futures_klines(symbol=symbol, interval=timeframe, limit=initial_limit)
+                klines = self.fetcher.fetch(FetchJob(symbol, timeframe, initial_limit, None))
                 
                 if not klines:
                     self.logger.warning(f"{symbol}: 바이낸스에서 데이터를 가져올 수 없습니다")
@@ -96,32 +121,206 @@ class ChartDownloader:
                 return self.db.save_candles(symbol, timeframe, klines)
                 
         except BinanceAPIException as e:
-            self.logger.error(f"{symbol} ({timeframe}) API 에러: {type(e).__name__}(code={e.code}): {e.message}")
-            
-            # API 제한 에러 처리 (code=-1003)
-            if e.code == -1003:
-                self.logger.critical(f"API 요청 제한 초과! IP 차단됨")
-                # ban 시간 파싱 (밀리초 → 초)
-                if 'banned until' in e.message:
-                    import re
-                    match = re.search(r'banned until (\d+)', e.message)
-                    if match:
-                        ban_until_ms = int(match.group(1))
-                        ban_until_sec = ban_until_ms / 1000
-                        now_sec = time.time()
-                        wait_time = max(0, ban_until_sec - now_sec)
-                        self.logger.critical(f"대기 시간: {wait_time:.0f}초 ({wait_time/60:.1f}분)")
+            self._log_api_error(symbol, timeframe, e)
             return 0
             
         except Exception as e:
-            self.logger.error(f"{symbol} ({timeframe}) 다운로드 실패: {e}")
-            # 흔한 에러 케이스 안내
-            if 'Invalid symbol' in str(e):
-                self.logger.warning(f"{symbol}은(는) 존재하지 않거나 상장 폐지된 심볼")
-            elif 'Invalid interval' in str(e):
-                self.logger.warning(f"{timeframe}은(는) 유효하지 않은 시간봉")
+            self._log_download_error(symbol, timeframe, e)
             return 0
     
+    def _log_api_error(self, symbol, timeframe, e):
+        """바이낸스 API 에러 로깅 (요청 제한 초과 시 ban 시간 안내)"""
+        self.logger.error(f"{symbol} ({timeframe}) API 에러: {type(e).__name__}(code={e.code}): {e.message}")
+        
+        # API 제한 에러 처리 (code=-1003)
+        if e.code == -1003:
+            self.logger.critical(f"API 요청 제한 초과! IP 차단됨 (해제 시각까지 모든 요청 정지)")
+            # ban 시간 파싱 (밀리초 → 초)
+            if 'banned until' in e.message:
+                import re
+                match = re.search(r'banned until (\d+)', e.message)
+                if match:
+                    ban_until_ms = int(match.group(1))
+                    ban_until_sec = ban_until_ms / 1000
+                    now_sec = time.time()
+                    wait_time = max(0, ban_until_sec - now_sec)
+                    self.logger.critical(f"대기 시간: {wait_time:.0f}초 ({wait_time/60:.1f}분)")
+    
+    def _log_download_error(self, symbol, timeframe, e):
+        """일반 다운로드 에러 로깅"""
+        self.logger.error(f"{symbol} ({timeframe}) 다운로드 실패: {e}")
+        # 흔한 에러 케이스 안내
+        if 'Invalid symbol' in str(e):
+            self.logger.warning(f"{symbol}은(는) 존재하지 않거나 상장 폐지된 심볼")
+        elif 'Invalid interval' in str(e):
+            self.logger.warning(f"{timeframe}은(는) 유효하지 않은 시간봉")
+    
+    def _get_latest_timestamp(self, symbol, timeframe):
+        """
+        DB에 저장된 가장 최신 캔들의 open_time을 UTC 밀리초 타임스탬프로 반환
+        (워터마크 인덱스에서 조회, DB 조회 없음)
+        
+        Returns:
+            밀리초 타임스탬프, 데이터가 없으면 None
+        """
+        watermark = self.db.get_watermark(symbol, timeframe)
+        
+        if watermark is None:
+            return None
+        
+        latest_timestamp = watermark[0]
+        latest_time = ms_to_datetime(latest_timestamp)
+        self.logger.debug(f"{symbol} DB 최신: KST={latest_time + timedelta(hours=9)}, UTC={latest_time}")
+        return latest_timestamp
+    
+    def _plan_download(self, symbol, timeframe, initial_limit):
+        """
+        DB 상태를 보고 필요한 다운로드 작업 결정
+        
+        Returns:
+            FetchJob (신규면 initial_limit개, 기존이면 최신 시간 이후 최대 500개), 불가능하면 None
+        """
+        latest_timestamp = self._get_latest_timestamp(symbol, timeframe)
+        if latest_timestamp is not None:
+            # startTime을 설정하면 그 이후의 데이터를 가져옴
+            return FetchJob(symbol, timeframe, 500, latest_timestamp)
+        
+        self.logger.debug(f"{symbol} ({timeframe}): 신규 다운로드 ({initial_limit}개 캔들)")
+        return FetchJob(symbol, timeframe, initial_limit, None)
+    
+    def download_many(self, symbols, timeframes, initial_limit=350, progress_every=50, on_saved=None, on_symbol_done=None):
+        """
+        여러 심볼/시간봉을 동시에 다운로드하고 DB에 저장
+        HTTP 요청은 스레드 풀에서 동시에 실행되고, DB 저장은 현재 스레드에서 순서대로 처리
+        
+        Args:
+            symbols: 심볼 리스트
+            timeframes: 시간봉 리스트
+            initial_limit: 처음 다운로드할 때 가져올 캔들 개수
+            progress_every: 진행 상황 로그 간격 (완료된 요청 수 기준)
+            on_saved: 저장 후 호출할 콜백 on_saved(symbol, timeframe, klines)
+            on_symbol_done: 심볼의 모든 시간봉 처리가 끝나면 호출할 콜백 on_symbol_done(symbol)
+        
+        Returns:
+            FetchStats (요청 수, 처리량 등)
+        """
+        pairs = [(symbol, timeframe) for timeframe in timeframes for symbol in symbols]
+        return self.download_pairs(pairs, initial_limit=initial_limit, progress_every=progress_every, on_saved=on_saved,
+                                   on_symbol_done=on_symbol_done)
+    
+    def download_pairs(self, pairs, initial_limit=350, progress_every=50, on_saved=None, on_symbol_done=None):
+        """
+        (심볼, 시간봉) 목록을 동시에 다운로드하고 DB에 저장
+        
+        Args:
+            pairs: [(symbol, timeframe), ...]
+            initial_limit: 처음 다운로드할 때 가져올 캔들 개수
+            progress_every: 진행 상황 로그 간격 (완료된 요청 수 기준)
+            on_saved: 저장 후 호출할 콜백 on_saved(symbol, timeframe, klines)
+            on_symbol_done: 심볼의 모든 (심볼, 시간봉) 처리가 끝나면 (성공/실패/최신이라 생략 모두) 호출할 콜백
+                            on_symbol_done(symbol) - 있으면 심볼 단위로 모아서 요청 (심볼이 차례로 끝나도록)
+        
+        Returns:
+            FetchStats (요청 수, 처리량 등)
+        """
+        stats = FetchStats()
+        
+        # 심볼별 남은 (심볼, 시간봉) 수
+        remaining = {}
+        if on_symbol_done is not None:
+            order = {}
+            for symbol, _ in pairs:
+                order.setdefault(symbol, len(order))
+                remaining[symbol] = remaining.get(symbol, 0) + 1
+            pairs = sorted(pairs, key=lambda pair: order[pair[0]])
+        
+        def pair_done(symbol):
+            if on_symbol_done is None:
+                return
+            remaining[symbol] -= 1
+            if remaining[symbol] == 0:
+                on_symbol_done(symbol)
+        
+        # 1. 작업 목록 생성 (DB 조회)
+        jobs = []
+        for symbol, timeframe in pairs:
+            try:
+                job = self._plan_download(symbol, timeframe, initial_limit)
+            except Exception as e:
+                self.logger.error(f"{symbol} ({timeframe}) 다운로드 계획 실패: {e}")
+                stats.record_error(symbol)
+                pair_done(symbol)
+                continue
+            if job is not None:
+                jobs.append(job)
+            else:
+                pair_done(symbol)
+        
+        self.logger.info(f"다운로드 작업 {len(jobs)}개 시작 (동시 요청: {self.fetcher.max_workers}개)")
+        
+        # 2. 동시 다운로드 + 완료 순서대로 저장
+        for done, (job, klines, error) in enumerate(self.fetcher.fetch_many(jobs), 1):
+            if error is not None:
+                if isinstance(error, BinanceAPIException):
+                    self._log_api_error(job.symbol, job.timeframe, error)
+                else:
+                    self._log_download_error(job.symbol, job.timeframe, error)
+                stats.record_error(job.symbol)
+            else:
+                saved = 0
+                try:
+                    if klines:
+                        started = time.perf_counter()
+                        saved = self.db.save_candles(job.symbol, job.timeframe, klines)
+                        profiler.observe('save', time.perf_counter() - started, job.symbol, job.timeframe)
+                        if on_saved is not None:
+                            on_saved(job.symbol, job.timeframe, klines)
+                    stats.record(job.symbol, saved)
+                except Exception as e:
+                    self.logger.error(f"{job.symbol} ({job.timeframe}) 저장 실패: {e}")
+                    stats.record_error(job.symbol)
+            pair_done(job.symbol)
+            
+            if progress_every and done % progress_every == 0:
+                self.logger.info(f"다운로드 진행: {done}/{len(jobs)} ({stats.requests_per_sec:.1f} req/s)")
+        
+        stats.finish()
+        return stats
+    
+    def download_and_resample(self, symbols, timeframes, initial_limit=350, progress_every=50, on_symbol_done=None):
+        """
+        1분봉만 다운로드하고 나머지 시간봉은 DB의 1분봉으로 직접 만들어서 저장
+        
+        - 데이터가 아예 없는 (심볼, 시간봉)은 처음 한 번만 바이낸스에서 직접 다운로드
+        - 이후에는 새 1분봉이 속한 구간만 리샘플링 (REST 요청은 심볼당 1회)
+        
+        Args:
+            symbols: 심볼 리스트
+            timeframes: 시간봉 리스트 (1분봉이 없어도 1분봉은 항상 다운로드)
+            initial_limit: 처음 다운로드할 때 가져올 캔들 개수
+            progress_every: 진행 상황 로그 간격
+            on_symbol_done: 심볼의 1분봉 + 리샘플링 + 신규 시간봉 다운로드가 끝나면 호출할 콜백 on_symbol_done(symbol)
+        
+        Returns:
+            FetchStats (1분봉 + 신규 시간봉 다운로드 통계)
+        """
+        derived = [timeframe for timeframe in timeframes if timeframe != BASE_TIMEFRAME]
+        
+        # 1. 데이터가 없는 상위 시간봉은 직접 다운로드 (과거 데이터 확보)
+        missing = [(symbol, timeframe) for timeframe in derived for symbol in symbols
+                   if self.db.get_watermark(symbol, timeframe) is None]
+        if missing:
+            self.logger.info(f"신규 상위 시간봉 {len(missing)}개 직접 다운로드")
+        
+        # 2. 1분봉 다운로드 + 저장될 때마다 상위 시간봉 리샘플링
+        def resample(symbol, timeframe, klines):
+            if timeframe == BASE_TIMEFRAME:
+                self.resampler.update(symbol, klines, derived)
+        
+        pairs = missing + [(symbol, BASE_TIMEFRAME) for symbol in symbols]
+        return self.download_pairs(pairs, initial_limit=initial_limit, progress_every=progress_every, on_saved=resample,
+                                   on_symbol_done=on_symbol_done)
+    
     def _update_latest_data(self, symbol, timeframe):
         """
         DB에 있는 데이터를 최신으로 업데이트
@@ -135,35 +334,15 @@ class ChartDownloader:
             저장된 캔들 개수
         """
         try:
-            # API 요청 전 딜레이
-            time.sleep(0.5)
-            
-            # DB에서 가장 최신 캔들 시간 조회 (UTC로 저장되어 있음)
-            latest_time = self.db.get_latest_candle_time(symbol, timeframe)
+            latest_timestamp = self._get_latest_timestamp(symbol, timeframe)
             
-            if not latest_time:
+            if latest_timestamp is None:
                 self.logger.warning(f"{symbol} ({timeframe}): DB에 데이터가 없습니다")
                 return 0
             
-            # DB의 UTC 시간을 UTC 타임스탬프로 변환
-            # replace(tzinfo=None)으로 naive datetime을 만든 후 UTC로 해석
-            from datetime import timezone
-            if latest_time.tzinfo is None:
-                # naive datetime을 UTC로 해석
-                latest_timestamp = int(latest_time.replace(tzinfo=timezone.utc).timestamp() * 1000)
-            else:
-                latest_timestamp = int(latest_time.timestamp() * 1000)
-            
-            self.logger.debug(f"{symbol} DB 최신: KST={latest_time + timedelta(hours=9)}, UTC={latest_time}")
-            
             # 최신 시간 이후의 데이터만 다운로드
             # startTime을 설정하면 그 이후의 데이터를 가져옴
-            klines = self.client.futures_klines(
-                symbol=symbol,
-                interval=timeframe,
-                startTime=latest_timestamp,
-                limit=500  # 최대 500개 
-            )
+            klines = self.fetcher.fetch(FetchJob(symbol, timeframe, 500, latest_timestamp))  # 최대 500개
             
             if not klines:
                 self.logger.debug(f"{symbol}: 새로운 데이터 없음 (최신 상태)")
@@ -194,9 +373,9 @@ class ChartDownloader:
             limit: 조회할 캔들 개수 (기본값: 100)
         
         Returns:
-            캔들 데이터 리스트
+            CandleFrame (오래된 순)
         """
-        return self.db.get_candles(symbol, timeframe, limit)
+        return self.db.get_candle_frame(symbol, timeframe, limit)
 
     def update_and_get_candles(self, symbol, timeframe, limit=100):
         """
@@ -208,12 +387,12 @@ class ChartDownloader:
             limit: 조회할 캔들 개수 (기본값: 100)
 
         Returns:
-            캔들 데이터 리스트
+            CandleFrame (오래된 순)
         """
         
         self.download_and_save(symbol, timeframe, initial_limit=1000)
             
-        return self.db.get_candles(symbol, timeframe, limit)
+        return self.db.get_candle_frame(symbol, timeframe, limit)
     
     def get_all_usdt_symbols(self, limit=None):
         """
@@ -223,11 +402,12 @@ class ChartDownloader:
             USDT 심볼 리스트 (예: ['BTCUSDT', 'ETHUSDT', ...])
         """
         try:
-            # API 요청 전 딜레이
-            time.sleep(0.5)
+            # weight 예산 확보 (exchangeInfo weight: 1)
+            self.rate_limiter.acquire(1)
             
             # 선물 거래소 정보 조회
             exchange_info = self.client.futures_exchange_info()
+            self.rate_limiter.update_from_headers(self.client.response.headers)
             
             # USDT 마진 심볼만 필터링
             usdt_symbols = []
@@ -253,6 +433,34 @@ class ChartDownloader:
             print(f"❌ 심볼 리스트 조회 실패: {e}")
             return []
         
+    def get_ticker_24h(self):
+        """
+        모든 선물 심볼의 24시간 시세를 한 번에 조회 (/fapi/v1/ticker/24hr, 심볼 없이 1번 호출)
+        
+        Returns:
+            {symbol: {'quote_volume', 'price_change_percent', 'last_price'}}, 실패하면 빈 dict
+        """
+        try:
+            # weight 예산 확보 (심볼 없이 요청하면 weight: 40)
+            self.rate_limiter.acquire(TICKER_24H_WEIGHT)
+            tickers = self.client.futures_ticker()
+            self.rate_limiter.update_from_headers(self.client.response.headers)
+        except BinanceAPIException as e:
+            self.logger.error(f"24시간 시세 조회 실패: {type(e).__name__}(code={e.code}): {e.message}")
+            return {}
+        except Exception as e:
+            self.logger.error(f"24시간 시세 조회 실패: {e}")
+            return {}
+        
+        return {
+            ticker['symbol']: {
+                'quote_volume': float(ticker['quoteVolume']),
+                'price_change_percent': float(ticker['priceChangePercent']),
+                'last_price': float(ticker['lastPrice']),
+            }
+            for ticker in tickers
+        }
+    
     # --- 1. 바이낸스 BASE 자산 목록 가져오기 ---
     def _get_binance_base_assets(self):
         url = "https://api.binance.com/api/v3/exchangeInfo"
@@ -427,14 +635,13 @@ class ChartDownloader:
         end_timestamp = int(end_time_utc.timestamp() * 1000)
         
         try:
-            # API 요청 전 딜레이
-            time.sleep(0.5)
-            
             # 바이낸스 API는 최대 1500개씩만 가져올 수 있음
             all_klines = []
             current_start = start_timestamp
             
             while current_start < end_timestamp:
+                # weight 예산 확보 (고정 딜레이 대신)
+                self.rate_limiter.acquire(kline_request_weight(1500))
                 klines = self.client.futures_klines(
                     symbol=symbol,
                     interval=timeframe,
@@ -442,6 +649,7 @@ class ChartDownloader:
                     endTime=end_timestamp,
                     limit=1500
                 )
+                self.rate_limiter.update_from_headers(self.client.response.headers)
                 
                 if not klines:
                     break
@@ -452,9 +660,6 @@ class ChartDownloader:
                 current_start = klines[-1][6] + 1  # klines[-1][6]은 종료 시간
                 
                 print(f"  ✓ {len(klines)}개 캔들 다운로드 완료 (전체: {len(all_klines)}개)")
-                
-                # API 제한 방지를 위한 딜레이
-                time.sleep(0.5)
             
             print(f"\n✅ 총 {len(all_klines)}개 캔들 다운로드 완료")
             
@@ -487,7 +692,7 @@ class ChartDownloader:
             timezone: 'KST' (한국시간, 기본값) 또는 'UTC' (세계시)
         
         Returns:
-            캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
+            CandleFrame (오래된 순, 데이터가 없으면 빈 CandleFrame)
         """
         from datetime import datetime, timedelta
         
@@ -513,18 +718,9 @@ class ChartDownloader:
             print(f"   기간 (UTC): {start_time} ~ {end_time}")
         
         # DB에서 해당 시간대 데이터 조회
-        query = """
-        SELECT open_time, open_price, high_price, low_price, close_price, volume, quote_volume
-        FROM candles 
-        WHERE symbol = %s AND timeframe = %s 
-        AND open_time >= %s AND open_time <= %s
-        ORDER BY open_time ASC
-        """
+        results = self.db.get_candle_frame_between(symbol, timeframe, start_time, end_time)
         
-        self.db.cursor.execute(query, (symbol, timeframe, start_time, end_time))
-        results = self.db.cursor.fetchall()
-        
-        if results:
+        if len(results):
             print(f"✅ DB에서 {len(results)}개 캔들 조회 완료")
             return results
         else:
@@ -535,18 +731,17 @@ class ChartDownloader:
                 self.download_historical_data(symbol, timeframe, start_time, end_time, timezone='UTC')
                 
                 # 다시 조회
-                self.db.cursor.execute(query, (symbol, timeframe, start_time, end_time))
-                results = self.db.cursor.fetchall()
+                results = self.db.get_candle_frame_between(symbol, timeframe, start_time, end_time)
                 
-                if results:
+                if len(results):
                     print(f"✅ 다운로드 후 {len(results)}개 캔들 조회 완료")
                     return results
                 else:
                     print(f"❌ 다운로드 후에도 데이터를 찾을 수 없습니다.")
-                    return []
+                    return results
             else:
                 print(f"💡 auto_update=True로 설정하면 자동으로 다운로드합니다.")
-                return []
+                return results
 
     def close(self):
         """
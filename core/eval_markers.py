@@ -0,0 +1,151 @@
+"""
+(심볼, 시간봉, 필터)별 마지막으로 평가한 캔들 표시
+
+필터 결과는 새 캔들이 생기기 전에는 바뀌지 않는데, 기존 스캔은 매번 모든 심볼/시간봉을 다시 받고 다시 필터링함
+→ 평가할 때의 최신 캔들 시간(워터마크)과 결과를 기억해두고
+  - 다운로드: 현재 진행 중인 캔들이 이미 DB에 있으면 (시간봉 경계가 안 지났으면) 요청하지 않음
+  - 필터: 워터마크가 마지막 평가 이후로 바뀐 심볼만 다시 평가, 나머지는 이전 결과를 그대로 사용
+  (1h, 30m 시간봉은 대부분의 스캔에서 할 일이 거의 없어짐)
+
+config.json의 incremental.enable이 true일 때 SurgeScanner에서 사용
+"""
+import threading
+import time
+
+from core.resampler import timeframe_to_ms
+
+
+def current_open_time(timeframe, now_ms=None):
+    """
+    지금 진행 중인 캔들의 open_time (UTC 밀리초, 마지막으로 지난 시간봉 경계)
+
+    Args:
+        timeframe: 시간봉 (예: '5m', '1h')
+        now_ms: 기준 시각 (밀리초, 없으면 현재 시각)
+    """
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    interval_ms = timeframe_to_ms(timeframe)
+    return now_ms // interval_ms * interval_ms
+
+
+def stale_pairs(db, symbols, timeframes, now_ms=None):
+    """
+    시간봉 경계가 지나서 다시 받아야 하는 (심볼, 시간봉)
+    (바이낸스는 진행 중인 캔들도 내려주므로, 최신화 직후 워터마크는 진행 중인 캔들의 open_time)
+
+    Args:
+        db: get_watermark(symbol, timeframe)이 있는 CandleDatabase
+        symbols: 심볼 리스트
+        timeframes: 시간봉 리스트
+
+    Returns:
+        [(symbol, timeframe), ...] (download_many와 같은 순서)
+    """
+    pairs = []
+    for timeframe in timeframes:
+        boundary = current_open_time(timeframe, now_ms)
+        for symbol in symbols:
+            watermark = db.get_watermark(symbol, timeframe)
+            if watermark is None or watermark[0] < boundary:
+                pairs.append((symbol, timeframe))
+    return pairs
+
+
+class WatermarkSnapshot:
+    """
+    한 시점의 워터마크 (get_watermark만 있는 DB 대용)
+
+    캔들 조회 대상 결정(peek), 평가할 심볼 나누기(split), 기록(record)이 같은 워터마크를 보도록
+    필터 실행 1번 동안 고정해서 사용 (중간에 저장된 캔들로 결과를 잘못된 워터마크에 기록하지 않음)
+    """
+
+    def __init__(self, db, symbols, timeframes):
+        """
+        Args:
+            db: get_watermark(symbol, timeframe)이 있는 CandleDatabase
+        """
+        self._watermarks = {(symbol, timeframe): db.get_watermark(symbol, timeframe)
+                            for timeframe in timeframes for symbol in symbols}
+
+    def get_watermark(self, symbol, timeframe):
+        return self._watermarks.get((symbol, timeframe))
+
+
+class EvaluationMarkers:
+    """
+    {(symbol, timeframe, filter_type): (평가한 캔들의 open_time(ms), pattern_time 또는 None)}
+
+    필터 실행 전에 split으로 다시 평가할 심볼과 이전 결과를 나누고, 실행 후 record로 기록
+    """
+
+    def __init__(self):
+        self._marks = {}
+        self._lock = threading.Lock()
+        self.evaluated = 0
+        self.carried = 0
+
+    def _stale(self, db, symbols, timeframe, filter_type):
+        stale = []
+        carried = {}
+        for symbol in symbols:
+            mark = self._marks.get((symbol, timeframe, filter_type))
+            watermark = db.get_watermark(symbol, timeframe)
+            if mark is None or watermark is None or watermark[0] > mark[0]:
+                stale.append(symbol)
+            else:
+                carried[symbol] = mark[1]
+        return stale, carried
+
+    def peek(self, db, symbols, timeframe, filter_type):
+        """
+        다시 평가할 심볼만 확인 (통계에 세지 않음, 캔들 조회 대상 결정용)
+
+        Returns:
+            다시 평가할 심볼 리스트
+        """
+        with self._lock:
+            return self._stale(db, symbols, timeframe, filter_type)[0]
+
+    def split(self, db, symbols, timeframe, filter_type):
+        """
+        Args:
+            db: get_watermark(symbol, timeframe)이 있는 CandleDatabase
+
+        Returns:
+            (다시 평가할 심볼 리스트, 이전 결과를 쓰는 심볼 {symbol: pattern_time 또는 None})
+        """
+        with self._lock:
+            stale, carried = self._stale(db, symbols, timeframe, filter_type)
+            self.evaluated += len(stale)
+            self.carried += len(carried)
+        return stale, carried
+
+    def record(self, db, symbols, timeframe, filter_type, matches):
+        """
+        평가한 심볼의 현재 워터마크와 결과 기록
+
+        Args:
+            symbols: 이번에 평가한 심볼 리스트
+            matches: {symbol: pattern_time} (걸린 심볼만)
+        """
+        with self._lock:
+            for symbol in symbols:
+                watermark = db.get_watermark(symbol, timeframe)
+                if watermark is None:
+                    continue
+                self._marks[(symbol, timeframe, filter_type)] = (watermark[0], matches.get(symbol))
+
+    def stats(self):
+        """
+        Returns:
+            {'marks', 'evaluated', 'carried', 'carried_ratio'} (evaluated/carried는 누적 (심볼, 시간봉, 필터) 수)
+        """
+        with self._lock:
+            total = self.evaluated + self.carried
+            return {
+                'marks': len(self._marks),
+                'evaluated': self.evaluated,
+                'carried': self.carried,
+                'carried_ratio': round(self.carried / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,175 @@
+"""
+동시 캔들 다운로드 엔진
+
+여러 심볼/시간봉의 futures_klines 요청을 스레드 풀에서 동시에 실행
+모든 요청은 WeightRateLimiter를 거쳐서 바이낸스 weight 예산을 넘지 않음
+매 응답의 X-MBX-USED-WEIGHT-1M 헤더를 limiter에 반영하고, 429/418이면 정지 후 재시도
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from binance.client import Client
+from binance.exceptions import BinanceAPIException
+
+from core import profiler
+from core.rate_limiter import WeightRateLimiter, kline_request_weight
+
+
+# 다운로드 작업 1건 (start_time이 None이면 최신 limit개, 있으면 그 이후 데이터)
+FetchJob = namedtuple('FetchJob', ['symbol', 'timeframe', 'limit', 'start_time'])
+
+# 요청 제한 응답 (429: 요청 과다, 418: IP ban)
+RATE_LIMIT_STATUS_CODES = (429, 418)
+
+
+class FetchStats:
+    """다운로드 처리량 통계 (requests/s, symbols/s)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.candles = 0
+        self.symbols = set()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    def record(self, symbol, candle_count):
+        """성공한 요청 1건 기록"""
+        self.requests += 1
+        self.candles += candle_count
+        self.symbols.add(symbol)
+
+    def record_error(self, symbol):
+        """실패한 요청 1건 기록"""
+        self.requests += 1
+        self.errors += 1
+        self.symbols.add(symbol)
+
+    def finish(self):
+        """측정 종료"""
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def requests_per_sec(self):
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def symbols_per_sec(self):
+        return len(self.symbols) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'candles': self.candles,
+            'symbols': len(self.symbols),
+            'elapsed_sec': round(self.elapsed, 3),
+            'requests_per_sec': round(self.requests_per_sec, 2),
+            'symbols_per_sec': round(self.symbols_per_sec, 2),
+        }
+
+    def summary(self):
+        return (f"{self.requests}개 요청 ({self.errors}개 실패), {len(self.symbols)}개 심볼, "
+                f"{self.elapsed:.1f}초 → {self.requests_per_sec:.1f} req/s, {self.symbols_per_sec:.1f} symbols/s")
+
+
+class KlineFetcher:
+    """
+    futures_klines 동시 요청 엔진
+
+    - 스레드마다 별도의 바이낸스 Client를 사용 (requests 세션 공유 문제 방지)
+    - 모든 요청 전에 rate_limiter.acquire()로 weight 차감
+    - 응답 헤더의 사용 weight를 rate_limiter에 반영
+    - 429/418 응답이면 rate_limiter가 모든 요청을 정지시키고, 해제 후 max_retries번까지 재시도
+    """
+
+    def __init__(self, max_workers=8, rate_limiter=None, base_url=None, max_retries=2):
+        """
+        Args:
+            max_workers: 동시에 실행할 요청 수 (스레드 개수)
+            rate_limiter: 공유할 WeightRateLimiter (없으면 새로 생성)
+            base_url: 선물 API 주소 변경용 (예: 'http://127.0.0.1:8080/fapi'), None이면 바이낸스 기본값
+            max_retries: 요청 제한 응답 후 재시도 횟수
+        """
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter if rate_limiter is not None else WeightRateLimiter()
+        self.base_url = base_url
+        self._local = threading.local()
+
+    def _get_client(self):
+        """현재 스레드 전용 Client 반환 (없으면 생성)"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            # ping=False: 생성 시 불필요한 요청 방지
+            client = Client(ping=False)
+            if self.base_url:
+                client.FUTURES_URL = self.base_url
+            self._local.client = client
+        return client
+
+    def fetch(self, job):
+        """
+        캔들 데이터 1건 요청 (weight 예산 확보 후 실행)
+
+        Args:
+            job: FetchJob
+
+        Returns:
+            바이낸스 캔들 데이터 리스트
+        """
+        params = {'symbol': job.symbol, 'interval': job.timeframe, 'limit': job.limit}
+        if job.start_time is not None:
+            params['startTime'] = job.start_time
+
+        weight = kline_request_weight(job.limit)
+        client = self._get_client()
+        attempt = 0
+        started = time.perf_counter()
+
+        while True:
+            self.rate_limiter.acquire(weight)
+            try:
+                klines = client.futures_klines(**params)
+            except BinanceAPIException as e:
+                headers = e.response.headers if e.response is not None else None
+                self.rate_limiter.update_from_headers(headers)
+
+                # 요청 제한/ban이면 limiter가 전체 정지 → 해제 후 재시도
+                if e.status_code in RATE_LIMIT_STATUS_CODES or e.code == -1003:
+                    self.rate_limiter.handle_rate_limit_error(e.status_code, e.message, headers)
+                    if attempt < self.max_retries:
+                        attempt += 1
+                        continue
+                raise
+
+            if client.response is not None:
+                self.rate_limiter.update_from_headers(client.response.headers)
+            profiler.observe('fetch', time.perf_counter() - started, job.symbol, job.timeframe)
+            return klines
+
+    def fetch_many(self, jobs):
+        """
+        여러 요청을 동시에 실행하고 끝나는 순서대로 결과 반환
+
+        Args:
+            jobs: FetchJob 리스트
+
+        Yields:
+            (job, klines, error) - 성공 시 error는 None, 실패 시 klines는 None
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kline-fetch') as executor:
+            futures = {executor.submit(self.fetch, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    yield job, future.result(), None
+                except Exception as e:
+                    yield job, None, e
@@ -0,0 +1,267 @@
+"""
+(심볼, 시간봉, period)별 지표 상태 (거래량 이동평균, ATR)
+
+스캔마다 캔들 전체로 다시 계산하지 않고, 새 캔들이 저장될 때마다 O(1)로 갱신
+- 이전 period개 거래량 합 (running sum), True Range deque와 합 → ATR, 마지막 종가
+- 마지막 캔들은 진행 중일 수 있으므로 확정하지 않고 보관 (같은 open_time이 다시 오면 교체)
+- 최근 window개 캔들마다 (open_time, 양봉 여부, 거래량, 그 전 period개 평균 거래량) 보관
+  → high_volume_spike는 window개만 비교하면 됨 (window x period 재계산 없음)
+- CandleDatabase.save_listeners로 갱신, 재시작 후에는 메모리 맵 저장소에서 다시 만듦
+
+running sum은 더하고 빼는 순서가 달라서 전체 재계산과 마지막 자리 반올림이 다를 수 있음
+(일정 개수마다 deque로 합을 다시 계산해서 오차가 쌓이지 않게 함)
+"""
+import threading
+from collections import deque
+from datetime import datetime
+
+from core.resampler import datetime_to_ms
+
+
+# 이 개수만큼 확정할 때마다 running sum을 deque로 다시 계산
+RESYNC_INTERVAL = 256
+
+
+class IndicatorState:
+    """
+    (심볼, 시간봉, period) 1개의 지표 상태
+    """
+
+    def __init__(self, period, window):
+        """
+        Args:
+            period: 평균 거래량/ATR 기간
+            window: 최근 몇 개 캔들의 (거래량, 이전 평균)을 보관할지
+        """
+        self.period = period
+        self.window = window
+
+        # 확정된 캔들 (마지막 캔들 제외)
+        self.volumes = deque(maxlen=period)
+        self.volume_sum = 0.0
+        self.true_ranges = deque(maxlen=period)
+        self.true_range_sum = 0.0
+        self.last_close = None
+        self.history = deque(maxlen=window)  # (open_time, 양봉 여부, 거래량, 이전 period개 평균 또는 None)
+        self.committed = 0
+
+        # 마지막 (진행 중일 수 있는) 캔들: (open_time, open, high, low, close, volume)
+        self.latest = None
+
+    @property
+    def count(self):
+        """지금까지 반영한 캔들 수"""
+        return self.committed + (1 if self.latest is not None else 0)
+
+    @property
+    def ready(self):
+        """window 안의 모든 캔들에 이전 period개 평균이 있는지 (기존 필터의 window + period개 조건)"""
+        return self.count >= self.window + self.period
+
+    @property
+    def latest_open_time(self):
+        return self.latest[0] if self.latest is not None else None
+
+    @property
+    def volume_sma(self):
+        """마지막 캔들 이전 period개 평균 거래량 (부족하면 None)"""
+        if len(self.volumes) < self.period:
+            return None
+        return self.volume_sum / self.period
+
+    @property
+    def atr(self):
+        """마지막 캔들까지의 최근 period개 True Range 평균 (부족하면 None)"""
+        latest_tr = self._latest_true_range()
+        if latest_tr is None or len(self.true_ranges) < self.period - 1:
+            return None
+        total = self.true_range_sum + latest_tr
+        if len(self.true_ranges) == self.period:
+            total -= self.true_ranges[0]
+        return total / self.period
+
+    def _latest_true_range(self):
+        if self.latest is None or self.last_close is None:
+            return None
+        _, _, high, low, _, _ = self.latest
+        return max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+
+    def update(self, rows):
+        """
+        시간순 캔들 반영
+
+        Args:
+            rows: [(open_time ms, open, high, low, close, volume), ...] (오래된 순)
+
+        Returns:
+            False: 마지막 캔들보다 이전 캔들이 들어와서 다시 만들어야 함
+        """
+        for row in rows:
+            if self.latest is None or row[0] > self.latest[0]:
+                if self.latest is not None:
+                    self._commit()
+                self.latest = row
+            elif row[0] == self.latest[0]:
+                # 진행 중이던 마지막 캔들 교체
+                self.latest = row
+            else:
+                return False
+        return True
+
+    def _commit(self):
+        """마지막 캔들 확정 (O(1))"""
+        open_time, open_price, high, low, close, volume = self.latest
+        self.history.append((open_time, close > open_price, volume, self.volume_sma))
+
+        latest_tr = self._latest_true_range()
+        if latest_tr is not None:
+            if len(self.true_ranges) == self.period:
+                self.true_range_sum -= self.true_ranges[0]
+            self.true_ranges.append(latest_tr)
+            self.true_range_sum += latest_tr
+
+        if len(self.volumes) == self.period:
+            self.volume_sum -= self.volumes[0]
+        self.volumes.append(volume)
+        self.volume_sum += volume
+
+        self.last_close = close
+        self.committed += 1
+        if self.committed % RESYNC_INTERVAL == 0:
+            self.volume_sum = sum(self.volumes)
+            self.true_range_sum = sum(self.true_ranges)
+
+    def recent(self, count=None):
+        """
+        최근 count개 (기본 window개) 캔들 (마지막 캔들 포함, 오래된 순)
+
+        Returns:
+            [(open_time, 양봉 여부, 거래량, 이전 period개 평균 또는 None), ...]
+        """
+        entries = list(self.history)
+        if self.latest is not None:
+            open_time, open_price, _, _, close, volume = self.latest
+            entries.append((open_time, close > open_price, volume, self.volume_sma))
+        return entries[-(count or self.window):]
+
+
+def to_indicator_rows(candles):
+    """
+    캔들 리스트/배열 또는 바이낸스 캔들 → [(open_time ms, o, h, l, c, v), ...]
+    """
+    rows = []
+    for candle in candles:
+        open_time = candle[0]
+        if isinstance(open_time, datetime):
+            open_time = datetime_to_ms(open_time)
+        rows.append((int(open_time), float(candle[1]), float(candle[2]), float(candle[3]),
+                     float(candle[4]), float(candle[5])))
+    return rows
+
+
+class IndicatorStore:
+    """
+    (심볼, 시간봉, period) → IndicatorState
+
+    필터 설정마다 track(timeframe, period, window)으로 필요한 상태를 등록
+    여러 스레드(다운로드/스트림/스캔)에서 같이 쓰므로 lock으로 보호
+    """
+
+    def __init__(self):
+        self._specs = {}   # timeframe → {period: window}
+        self._states = {}
+        self._lock = threading.Lock()
+
+        # 통계
+        self.updates = 0
+        self.builds = 0
+        self.invalidations = 0
+
+    def track(self, timeframe, period, window):
+        """timeframe에서 period 지표를 최근 window개 캔들까지 유지 (같은 period는 가장 긴 window)"""
+        with self._lock:
+            periods = self._specs.setdefault(timeframe, {})
+            periods[period] = max(periods.get(period, 0), window)
+
+    def update(self, symbol, timeframe, klines):
+        """
+        저장된 캔들 반영 (CandleDatabase.save_listeners에 등록해서 사용)
+        상태가 없는 (심볼, 시간봉)은 무시 (다음 스캔 때 캔들로 만듦)
+        """
+        periods = self._specs.get(timeframe)
+        if not periods or not klines:
+            return
+        rows = to_indicator_rows(sorted(klines, key=lambda kline: int(kline[0])))
+        with self._lock:
+            for period in periods:
+                key = (symbol, timeframe, period)
+                state = self._states.get(key)
+                if state is None:
+                    continue
+                if not state.update(rows):
+                    del self._states[key]
+                    self.invalidations += 1
+                self.updates += 1
+
+    def build(self, symbol, timeframe, period, candles):
+        """
+        캔들(오래된 순)로 상태 새로 만들기
+
+        Returns:
+            IndicatorState
+        """
+        window = self._specs.get(timeframe, {}).get(period, 0)
+        state = IndicatorState(period, window)
+        # 필요한 만큼만 반영 (window개 + 그 전 period개 + 진행 중 캔들)
+        state.update(to_indicator_rows(candles[-(window + period + 1):]))
+        with self._lock:
+            self._states[(symbol, timeframe, period)] = state
+            self.builds += 1
+        return state
+
+    def get(self, symbol, timeframe, period):
+        with self._lock:
+            return self._states.get((symbol, timeframe, period))
+
+    def ready_state(self, symbol, timeframe, period, candles):
+        """
+        필터에 쓸 상태 (없거나 candles의 마지막 캔들과 다르면 candles로 다시 만듦)
+
+        Returns:
+            ready 상태의 IndicatorState, 캔들이 부족하면 None
+        """
+        if len(candles) == 0:
+            return None
+        state = self.get(symbol, timeframe, period)
+        if state is None or state.latest_open_time != datetime_to_ms(candles[-1][0]):
+            state = self.build(symbol, timeframe, period, candles)
+        return state if state.ready else None
+
+    def rebuild_from_store(self, store):
+        """
+        재시작 후 메모리 맵 저장소의 캔들로 모든 상태 다시 만들기
+
+        Returns:
+            만든 상태 개수
+        """
+        built = 0
+        for symbol, timeframe in store.pairs():
+            for period, window in self._specs.get(timeframe, {}).items():
+                self.build(symbol, timeframe, period, store.get(symbol, timeframe, window + period + 1))
+                built += 1
+        return built
+
+    def invalidate(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        with self._lock:
+            states = list(self._states.values())
+        return {
+            'states': len(states),
+            'ready': sum(1 for state in states if state.ready),
+            'updates': self.updates,
+            'builds': self.builds,
+            'invalidations': self.invalidations,
+        }
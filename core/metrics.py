@@ -0,0 +1,283 @@
+"""
+Prometheus 형식 메트릭 (api_server의 /metrics)
+
+스캔 시간(단계별), 바이낸스 요청 수/weight, DB 쿼리 시간, 저장한 캔들 수, 필터별 평가/발견 수,
+API 응답 시간을 counter/gauge/histogram으로 모아서 Prometheus text 형식(0.0.4)으로 내보냄
+(캐시 hit율 같은 다른 객체의 통계는 /metrics 조회 때 gauge로 옮겨서 내보냄)
+
+측정 지점은 profiler의 phase/observe/count를 그대로 사용 (profiler가 여기로도 전달)
+
+- 값 갱신: (메트릭, 라벨 조합)마다 작은 lock 1개 (같은 값을 갱신하는 스캔 스레드끼리만 경쟁)
+- 내보내기(render): lock을 잡지 않고 현재 값을 읽음 (GIL 아래에서 숫자 읽기와 리스트 복사는 원자적)
+  → /metrics 조회가 스캔 스레드를 기다리게 하거나 멈추게 하지 않음
+  (같은 히스토그램의 _count/_sum이 관측 1건만큼 어긋날 수 있음)
+"""
+import bisect
+import math
+import threading
+
+
+# 지연 시간 히스토그램 구간 상한 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 스캔 시간 히스토그램 구간 상한 (초)
+SCAN_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 900, 1800)
+
+# 스캔 단계 시간 히스토그램 구간 상한 (초, 몇 ms에 끝나는 단계(symbols, load_candles 등)부터 긴 다운로드까지)
+PHASE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# 등록된 메트릭 (내보내는 순서)
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _CounterValue:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'buckets', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    """라벨 조합별 값을 가진 메트릭 (labels(...)로 값 객체를 얻어서 갱신)"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """라벨 값 순서대로 (labelnames와 같은 개수) 값 객체 반환 (처음이면 생성)"""
+        key = tuple(str(value) for value in values)
+        value = self._values.get(key)
+        if value is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames}에 맞지 않는 값 {key}")
+            with self._lock:
+                value = self._values.setdefault(key, self._new_value())
+        return value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in list(self._values.items()):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value.value)}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_value(self):
+        return _CounterValue()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_value(self):
+        return _GaugeValue()
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        self.bounds = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self):
+        return _HistogramValue(self.bounds)
+
+    def _render_value(self, key, value):
+        buckets = list(value.buckets)
+        total, count = value.sum, value.count
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(self.bounds + (math.inf,), buckets):
+            cumulative += bucket
+            labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# --- 스캔 ---
+SCAN_DURATION = Histogram('coinalarm_scan_duration_seconds', '스캔 1번 전체 시간 (mode: full=전체 스캔, filter=필터 1개)',
+                          ['mode'], buckets=SCAN_BUCKETS)
+SCAN_PHASE_DURATION = Histogram('coinalarm_scan_phase_seconds', '스캔 단계별 시간', ['phase'], buckets=PHASE_BUCKETS)
+SCAN_LAST_FINISHED = Gauge('coinalarm_scan_last_finished_timestamp_seconds', '마지막 스캔 완료 시각 (unix 초)', ['mode'])
+SCAN_LAST_DURATION = Gauge('coinalarm_scan_last_duration_seconds', '마지막 스캔 시간', ['mode'])
+
+# --- 바이낸스 ---
+BINANCE_REQUESTS = Counter('coinalarm_binance_requests_total', '바이낸스 요청 수 (rate limiter 통과 기준)')
+BINANCE_WEIGHT = Counter('coinalarm_binance_weight_total', '바이낸스 요청에 사용한 weight 합계')
+BINANCE_USED_WEIGHT = Gauge('coinalarm_binance_used_weight_1m', '서버가 알려준 최근 1분 사용 weight (X-MBX-USED-WEIGHT-1M)')
+KLINE_FETCH_DURATION = Histogram('coinalarm_kline_fetch_seconds', '캔들 요청 1건 시간 (재시도 포함)')
+MARKET_CAP_DURATION = Histogram('coinalarm_market_cap_seconds', '시가총액 조회 1건 시간')
+
+# --- DB ---
+DB_QUERIES = Counter('coinalarm_db_queries_total', 'DB 연결 사용(쿼리) 수')
+DB_QUERY_DURATION = Histogram('coinalarm_db_query_seconds', 'DB 연결 사용 1번 시간 (연결 대기 포함)')
+DB_SAVE_DURATION = Histogram('coinalarm_db_save_seconds', '(심볼, 시간봉) 캔들 저장 1건 시간')
+CANDLES_INGESTED = Counter('coinalarm_candles_ingested_total', '저장한 캔들 수', ['timeframe'])
+
+# --- 필터 ---
+FILTER_EVALUATIONS = Counter('coinalarm_filter_evaluations_total', '필터가 평가한 (심볼, 시간봉) 수', ['filter'])
+FILTER_MATCHES = Counter('coinalarm_filter_matches_total', '필터에 걸린 (심볼, 시간봉) 수', ['filter'])
+FILTER_BATCH_DURATION = Histogram('coinalarm_filter_batch_seconds', '필터 1개 x 시간봉 1개 실행 시간')
+
+# --- 캐시 (조회 시점에 stats()에서 옮김) ---
+CACHE_HITS = Gauge('coinalarm_cache_hits', '캐시 hit 누적 수', ['cache'])
+CACHE_MISSES = Gauge('coinalarm_cache_misses', '캐시 miss 누적 수', ['cache'])
+CACHE_HIT_RATIO = Gauge('coinalarm_cache_hit_ratio', '캐시 hit율 (0~1)', ['cache'])
+
+# --- API 서버 ---
+API_REQUEST_DURATION = Histogram('coinalarm_api_request_seconds', 'API 요청 처리 시간', ['method', 'path', 'status'])
+
+
+# profiler 이름 → 메트릭
+_OBSERVATIONS = {
+    'fetch': KLINE_FETCH_DURATION,
+    'save': DB_SAVE_DURATION,
+    'db_query': DB_QUERY_DURATION,
+    'filter': FILTER_BATCH_DURATION,
+    'market_cap': MARKET_CAP_DURATION,
+}
+_COUNTS = {
+    'binance_requests': BINANCE_REQUESTS,
+    'binance_weight': BINANCE_WEIGHT,
+    'db_queries': DB_QUERIES,
+}
+# 'name:label' 형식 (예: 'filter_matches:3step_surge')
+_LABELED_COUNTS = {
+    'filter_evaluations': FILTER_EVALUATIONS,
+    'filter_matches': FILTER_MATCHES,
+    'candles_ingested': CANDLES_INGESTED,
+}
+
+
+def observe(name, seconds):
+    """profiler.observe 이름의 시간 기록 (해당 메트릭이 없으면 무시)"""
+    metric = _OBSERVATIONS.get(name)
+    if metric is not None:
+        metric.labels().observe(seconds)
+
+
+def count(name, amount=1):
+    """profiler.count 이름의 counter 증가 (해당 메트릭이 없으면 무시)"""
+    metric = _COUNTS.get(name)
+    if metric is not None:
+        metric.labels().inc(amount)
+        return
+    prefix, _, label = name.partition(':')
+    metric = _LABELED_COUNTS.get(prefix)
+    if metric is not None and label:
+        metric.labels(label).inc(amount)
+
+
+def observe_phase(name, seconds):
+    """스캔 단계 시간 기록"""
+    SCAN_PHASE_DURATION.labels(name).observe(seconds)
+
+
+def record_scan(mode, seconds, finished_at):
+    """
+    스캔 1번 완료 기록
+
+    Args:
+        mode: 'full' (전체 스캔) 또는 'filter' (캔들 마감 기준 필터 1개)
+        finished_at: 완료 시각 (unix 초)
+    """
+    SCAN_DURATION.labels(mode).observe(seconds)
+    SCAN_LAST_DURATION.labels(mode).set(seconds)
+    SCAN_LAST_FINISHED.labels(mode).set(finished_at)
+
+
+def set_cache_stats(cache, stats):
+    """
+    캐시 통계를 gauge로 옮김
+
+    Args:
+        cache: 캐시 이름 (라벨)
+        stats: {'hits', 'misses', 'hit_ratio', ...}
+    """
+    CACHE_HITS.labels(cache).set(stats.get('hits', 0))
+    CACHE_MISSES.labels(cache).set(stats.get('misses', 0))
+    CACHE_HIT_RATIO.labels(cache).set(stats.get('hit_ratio', 0.0))
+
+
+def render(registry=REGISTRY):
+    """
+    모든 메트릭을 Prometheus text 형식으로 (lock 없이 현재 값)
+
+    Returns:
+        str
+    """
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
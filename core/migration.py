@@ -0,0 +1,190 @@
+"""
+candles → candles_compact 마이그레이션
+
+서비스를 멈추지 않고 기존 데이터를 압축 스키마로 복사 (online)
+- candles.id 범위로 chunk_size개씩 INSERT ... SELECT 후 바로 commit (긴 잠금 없음)
+- 심볼 사전(symbols)은 먼저 한 번에 채움
+- 이미 복사된 행은 ON DUPLICATE KEY UPDATE로 덮어씀 (여러 번 실행해도 됨)
+- id 범위 복사가 끝나면 최근 구간(open_time 기준)을 한 번 더 복사
+  진행 중 캔들은 스트림/REST가 ON DUPLICATE KEY UPDATE로 제자리 갱신해서 id가 바뀌지 않으므로
+  id 범위만으로는 복사 후 바뀐 값이 candles_compact에 반영되지 않음
+  → 시간봉마다 open_time >= (recopy_since - 캔들 1개 길이)인 행을 다시 복사
+    (recopy_since: 첫 실행을 시작한 시각, 그 뒤에 갱신될 수 있는 캔들은 모두 이 구간 안에 있음)
+
+순서:
+    1. python -m core.migration --password 1234 --database coin_chart
+    2. config.json의 storage를 {"backend": "mysql", "schema": "compact"}로 변경 후 서버 재시작
+    3. 1번 실행 후 재시작 전까지 들어온/갱신된 캔들은 1번 마지막에 출력된 id와 시작 시각으로 한 번 더 복사
+       python -m core.migration --password 1234 --database coin_chart --start-id <마지막 id> --recopy-since "<시작 시각>"
+"""
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from core.compact_database import CompactCandleDatabase, TIMEFRAME_IDS
+from core.resampler import timeframe_to_ms
+
+
+# FIELD()가 1부터 순서대로 반환하므로 id 순으로 나열
+TIMEFRAME_FIELD_LIST = ', '.join(
+    f"'{timeframe}'" for timeframe, _ in sorted(TIMEFRAME_IDS.items(), key=lambda item: item[1])
+)
+
+FILL_SYMBOLS_QUERY = """
+INSERT IGNORE INTO symbols (symbol)
+SELECT DISTINCT symbol FROM candles
+"""
+
+# DATETIME → 밀리초: TIMESTAMPDIFF는 세션 시간대 영향을 받지 않음
+COPY_QUERY_TEMPLATE = f"""
+INSERT INTO candles_compact
+(symbol_id, timeframe_id, open_time, open_price, high_price, low_price, close_price, volume, quote_volume)
+SELECT s.id, FIELD(c.timeframe, {TIMEFRAME_FIELD_LIST}),
+       TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00', c.open_time) DIV 1000,
+       c.open_price, c.high_price, c.low_price, c.close_price, c.volume, COALESCE(c.quote_volume, 0)
+FROM candles c
+JOIN symbols s ON s.symbol = c.symbol
+WHERE {{where}}
+ON DUPLICATE KEY UPDATE
+    open_price = VALUES(open_price),
+    high_price = VALUES(high_price),
+    low_price = VALUES(low_price),
+    close_price = VALUES(close_price),
+    volume = VALUES(volume),
+    quote_volume = VALUES(quote_volume)
+"""
+
+# id 범위 복사
+COPY_CHUNK_QUERY = COPY_QUERY_TEMPLATE.format(
+    where=f"c.id > %s AND c.id <= %s AND FIELD(c.timeframe, {TIMEFRAME_FIELD_LIST}) > 0")
+
+# 최근 구간 다시 복사 (제자리 갱신된 진행 중 캔들, idx_timeframe_open_time 사용)
+RECOPY_RECENT_QUERY = COPY_QUERY_TEMPLATE.format(where="c.timeframe = %s AND c.open_time >= %s")
+
+# resampler가 지원하지 않는 시간봉의 캔들 1개 최대 길이
+LONG_TIMEFRAME_SPANS = {'1w': timedelta(days=7), '1M': timedelta(days=31)}
+
+
+def candle_span(timeframe):
+    """캔들 1개의 (최대) 길이"""
+    if timeframe in LONG_TIMEFRAME_SPANS:
+        return LONG_TIMEFRAME_SPANS[timeframe]
+    return timedelta(milliseconds=timeframe_to_ms(timeframe))
+
+
+def recopy_recent(db, recopy_since):
+    """
+    시간봉마다 open_time >= recopy_since - 캔들 1개 길이인 행을 다시 복사
+    (recopy_since 이후에 제자리 갱신됐을 수 있는 캔들 전부)
+
+    Returns:
+        복사한 행 수 (근사치)
+    """
+    copied = 0
+    for timeframe in TIMEFRAME_IDS:
+        copied += db._execute(RECOPY_RECENT_QUERY, (timeframe, recopy_since - candle_span(timeframe)))
+    print(f"🔁 {recopy_since:%Y-%m-%d %H:%M:%S} 이후 갱신됐을 수 있는 캔들 다시 복사: 약 {copied}행")
+    return copied
+
+
+def migrate(db, start_id=0, chunk_size=20000, chunk_pause=0.0, recopy_since=None):
+    """
+    candles의 id > start_id 행을 candles_compact로 복사한 뒤 최근 구간을 다시 복사
+
+    Args:
+        db: CompactCandleDatabase (테이블 생성까지 끝난 상태)
+        start_id: 이 id 이후 행만 복사
+        chunk_size: INSERT ... SELECT 1번에 처리할 id 범위
+        chunk_pause: chunk 사이 대기 시간 (초, 서비스 부하 조절)
+        recopy_since: 이 시각(UTC) 이후 갱신됐을 수 있는 캔들 다시 복사 (없으면 이번 실행 시작 시각)
+
+    Returns:
+        (복사한 행 수, 마지막으로 확인한 candles.id)
+    """
+    if recopy_since is None:
+        recopy_since = datetime.utcnow()
+    db._execute(FILL_SYMBOLS_QUERY)
+    max_id = db._fetchone("SELECT COALESCE(MAX(id), 0) FROM candles")[0]
+
+    copied = 0
+    started = time.perf_counter()
+    current = start_id
+    while current < max_id:
+        upper = min(current + chunk_size, max_id)
+        # ON DUPLICATE KEY UPDATE는 덮어쓴 행을 2로 세므로 진행 표시용 근사치
+        copied += db._execute(COPY_CHUNK_QUERY, (current, upper))
+        current = upper
+
+        elapsed = time.perf_counter() - started
+        print(f"📦 id {current}/{max_id} ({current / max_id * 100:.1f}%) - {elapsed:.1f}초")
+        if chunk_pause:
+            time.sleep(chunk_pause)
+
+    copied += recopy_recent(db, recopy_since)
+
+    # 심볼 사전이 바뀌었으므로 메모리 캐시와 워터마크 다시 불러오기
+    db.reload_symbols()
+    db.watermarks.reset()
+
+    return copied, current
+
+
+def verify(db):
+    """
+    (심볼, 시간봉)별 행 수를 비교해서 다른 것만 반환
+
+    Returns:
+        [(symbol, timeframe, candles 행 수, candles_compact 행 수), ...]
+    """
+    old_counts = {(symbol, timeframe): count for symbol, timeframe, count in
+                  db._fetchall("SELECT symbol, timeframe, COUNT(*) FROM candles GROUP BY symbol, timeframe")}
+    db.load_watermarks()
+
+    mismatches = []
+    for (symbol, timeframe), count in old_counts.items():
+        if timeframe not in TIMEFRAME_IDS:
+            continue
+        watermark = db.watermarks.get(symbol, timeframe)
+        new_count = watermark[1] if watermark else 0
+        if new_count < count:
+            mismatches.append((symbol, timeframe, count, new_count))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='candles → candles_compact 마이그레이션')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--user', default='root')
+    parser.add_argument('--password', default='1234')
+    parser.add_argument('--database', default='coin_chart')
+    parser.add_argument('--start-id', type=int, default=0, help='이 id 이후 행만 복사 (이어서 실행할 때)')
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    parser.add_argument('--chunk-pause', type=float, default=0.0)
+    parser.add_argument('--recopy-since', type=datetime.fromisoformat, default=None,
+                        help='이 시각(UTC, 예: "2026-01-01 00:00:00") 이후 갱신됐을 수 있는 캔들 다시 복사 (이어서 실행할 때 첫 실행 시작 시각)')
+    args = parser.parse_args()
+
+    db = CompactCandleDatabase(host=args.host, user=args.user, password=args.password, database=args.database)
+
+    started_at = datetime.utcnow()
+    recopy_since = args.recopy_since or started_at
+    started = time.perf_counter()
+    copied, last_id = migrate(db, start_id=args.start_id, chunk_size=args.chunk_size, chunk_pause=args.chunk_pause,
+                              recopy_since=recopy_since)
+    print(f"✅ 복사 완료: 약 {copied}행, 마지막 id {last_id} ({time.perf_counter() - started:.1f}초)")
+
+    mismatches = verify(db)
+    if mismatches:
+        print(f"⚠️ 행 수가 부족한 (심볼, 시간봉) {len(mismatches)}개:")
+        for symbol, timeframe, old_count, new_count in mismatches[:20]:
+            print(f"   {symbol} ({timeframe}): {old_count} → {new_count}")
+    else:
+        print("✅ 검증 완료: 모든 (심볼, 시간봉) 행 수 일치")
+    print(f"이어서 복사하려면: --start-id {last_id} --recopy-since \"{recopy_since:%Y-%m-%d %H:%M:%S}\"")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+메모리 맵 캔들 저장소 (data/ 아래 파일, 재시작 시 바로 사용)
+
+(심볼, 시간봉)마다 고정 폭 컬럼 파일 1개
+- 헤더 64바이트: 매직, 버전, 컬럼 수, 용량(행), 저장된 행 수, 최신 open_time
+- 본문: 컬럼별로 용량만큼 float64 (open_time, open, high, low, close, volume, quote_volume)
+- 뒤에 이어 쓰기만 함 (append-only), 가득 차면 최신 절반만 남기고 앞으로 당김
+- 마지막 캔들과 같은 open_time은 덮어씀 (진행 중 캔들 업데이트)
+
+재시작하면 파일을 mmap으로 여는 것만으로 캔들이 준비되고
+DB/바이낸스에서는 마지막 저장 캔들 이후만 받으면 됨
+
+- 새 파일은 이번 저장분이 아니라 DB의 최신 capacity개로 채움 (append에 db를 넘겼을 때)
+- get은 store lock 안에서 복사본을 만들어 반환 (가득 찼을 때의 당기기(_compact)와 겹치지 않음)
+"""
+import os
+import threading
+
+import numpy as np
+
+from core.candle_cache import CACHE_COLUMNS, CandleCache
+from core.candle_frame import CandleFrame
+from core.resampler import ms_to_datetime
+
+
+MAGIC = 0x43414E444C455331  # 'CANDLES1'
+VERSION = 1
+HEADER_WORDS = 8
+HEADER_SIZE = HEADER_WORDS * 8
+
+# 헤더 위치
+H_MAGIC, H_VERSION, H_COLUMNS, H_CAPACITY, H_COUNT, H_LATEST = range(6)
+
+DEFAULT_DIRECTORY = os.path.join('data', 'candles')
+
+
+class MmapCandleFile:
+    """
+    (심볼, 시간봉) 1개의 메모리 맵 파일
+    """
+
+    def __init__(self, path, capacity=2048):
+        """
+        파일이 있으면 열고, 없으면 capacity 크기로 생성
+
+        Args:
+            path: 파일 경로
+            capacity: 새로 만들 때 최대 행 수
+        """
+        self.path = path
+        if not os.path.exists(path):
+            self._create(capacity)
+        self._map()
+
+    def _create(self, capacity):
+        header = np.zeros(HEADER_WORDS, dtype='<u8')
+        header[H_MAGIC] = MAGIC
+        header[H_VERSION] = VERSION
+        header[H_COLUMNS] = len(CACHE_COLUMNS)
+        header[H_CAPACITY] = capacity
+        with open(self.path, 'wb') as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER_SIZE + capacity * len(CACHE_COLUMNS) * 8)
+
+    def _map(self):
+        self.header = np.memmap(self.path, dtype='<u8', mode='r+', shape=(HEADER_WORDS,))
+        if int(self.header[H_MAGIC]) != MAGIC or int(self.header[H_COLUMNS]) != len(CACHE_COLUMNS):
+            raise ValueError(f"캔들 파일 형식이 아닙니다: {self.path}")
+        self.capacity = int(self.header[H_CAPACITY])
+        # (컬럼, 행) - 컬럼마다 연속된 메모리
+        self.columns = np.memmap(self.path, dtype='<f8', mode='r+', offset=HEADER_SIZE,
+                                 shape=(len(CACHE_COLUMNS), self.capacity))
+
+    @property
+    def count(self):
+        return int(self.header[H_COUNT])
+
+    @property
+    def latest_open_time(self):
+        """마지막 캔들 open_time (ms), 비어있으면 None"""
+        return int(self.header[H_LATEST]) if self.count else None
+
+    def view(self, count=None):
+        """
+        최신 count개 캔들 (오래된 순)
+
+        Returns:
+            (n, 7) 배열 view (복사 없음, 컬럼 파일을 행 단위로 본 것)
+        """
+        end = self.count
+        start = 0 if count is None else max(0, end - count)
+        return self.columns[:, start:end].T
+
+    def append(self, rows):
+        """
+        시간순 행 추가
+
+        Args:
+            rows: (n, 7) float64 배열 (오래된 순)
+
+        Returns:
+            추가/덮어쓴 행 수
+        """
+        written = 0
+        for row in rows:
+            count = self.count
+            latest = self.latest_open_time
+            if latest is not None and row[0] <= latest:
+                if row[0] == latest:
+                    self.columns[:, count - 1] = row
+                    written += 1
+                # 이전 캔들은 append-only라서 무시
+                continue
+
+            if count == self.capacity:
+                count = self._compact()
+            self.columns[:, count] = row
+            # 데이터를 먼저 쓰고 개수를 늘려서, 중간에 죽어도 헤더가 가리키는 행은 항상 완전함
+            self.header[H_LATEST] = int(row[0])
+            self.header[H_COUNT] = count + 1
+            written += 1
+        return written
+
+    def _compact(self):
+        """가득 차면 최신 절반만 앞으로 당김"""
+        keep = self.capacity // 2
+        self.columns[:, :keep] = self.columns[:, self.capacity - keep:self.capacity]
+        self.header[H_COUNT] = keep
+        return keep
+
+    def flush(self):
+        self.columns.flush()
+        self.header.flush()
+
+
+class MmapCandleStore:
+    """
+    data/candles/ 아래의 모든 (심볼, 시간봉) 파일 관리
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, capacity=2048):
+        """
+        Args:
+            directory: 파일을 둘 폴더
+            capacity: 새 파일의 최대 행 수
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self._files = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol, timeframe):
+        return os.path.join(self.directory, f"{symbol}_{timeframe}.bin")
+
+    def open_all(self):
+        """
+        폴더의 모든 파일을 mmap으로 열기 (데이터를 읽지 않으므로 빠름)
+
+        Returns:
+            {(symbol, timeframe): (최신 open_time ms, 행 수)}
+        """
+        index = {}
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.bin'):
+                continue
+            symbol, timeframe = name[:-4].rsplit('_', 1)
+            with self._lock:
+                candle_file = self._files.get((symbol, timeframe))
+                if candle_file is None:
+                    candle_file = MmapCandleFile(os.path.join(self.directory, name), self.capacity)
+                    self._files[(symbol, timeframe)] = candle_file
+            if candle_file.count:
+                index[(symbol, timeframe)] = (candle_file.latest_open_time, candle_file.count)
+        return index
+
+    def pairs(self):
+        """열려 있는 (심볼, 시간봉) 목록"""
+        with self._lock:
+            return list(self._files)
+
+    def get_file(self, symbol, timeframe, create=False):
+        with self._lock:
+            candle_file = self._files.get((symbol, timeframe))
+            if candle_file is None and create:
+                candle_file = MmapCandleFile(self._path(symbol, timeframe), self.capacity)
+                self._files[(symbol, timeframe)] = candle_file
+            return candle_file
+
+    def append(self, symbol, timeframe, klines, db=None):
+        """
+        저장된 캔들 추가 (CandleDatabase.save_listeners에 등록해서 사용)
+        파일이 없으면 db의 최신 capacity개로 먼저 채움 (저장 후에 호출되므로 이번 저장분도 포함)
+
+        Args:
+            klines: 바이낸스 형식 캔들 리스트
+            db: 새 파일을 채울 CandleDatabase (저장한 그 DB, 없으면 이번 저장분부터 시작)
+        """
+        if not klines:
+            return 0
+        rows = CandleCache.klines_to_array(sorted(klines, key=lambda kline: int(kline[0])))
+        seed = None
+        if db is not None and self.get_file(symbol, timeframe) is None:
+            try:
+                seed = db.get_candle_frame(symbol, timeframe, self.capacity).data
+            except Exception as e:
+                # DB 저장은 이미 끝났으므로 저장을 실패시키지 않음 (짧은 파일은 get_many가 DB에서 읽음)
+                print(f"⚠️ 캔들 파일 {symbol} ({timeframe}) DB에서 채우기 실패, 이번 저장분부터 시작: {e}")
+        candle_file = self.get_file(symbol, timeframe, create=True)
+        with self._lock:
+            if seed is not None and candle_file.count == 0:
+                candle_file.append(seed)
+            return candle_file.append(rows)
+
+    def get(self, symbol, timeframe, count):
+        """최신 count개 캔들 (lock 안에서 복사한 CandleFrame), 파일이 없으면 None"""
+        candle_file = self.get_file(symbol, timeframe)
+        if candle_file is None:
+            return None
+        with self._lock:
+            data = np.array(candle_file.view(count), order='C')
+        return CandleFrame(data, assume_sorted=True)
+
+    def get_many(self, symbols, timeframe, count, db=None):
+        """
+        Args:
+            db: 파일이 없거나 count개보다 짧은 심볼을 대신 읽을 CandleDatabase (없으면 파일 내용 그대로)
+
+        Returns:
+            {symbol: CandleFrame} (파일이 없는 심볼은 빈 CandleFrame)
+        """
+        empty = CandleFrame.empty()
+        result = {}
+        missing = []
+        for symbol in symbols:
+            frame = self.get(symbol, timeframe, count)
+            result[symbol] = frame if frame is not None else empty
+            if db is not None and len(result[symbol]) < count:
+                # DB에도 더 없으면 (상장 직후 등) 다시 읽지 않음
+                watermark = db.get_watermark(symbol, timeframe)
+                if watermark is not None and watermark[1] > len(result[symbol]):
+                    missing.append(symbol)
+        if missing:
+            result.update(db.get_candle_frames_bulk(missing, timeframe, limit=count))
+        return result
+
+    def catch_up(self, db):
+        """
+        DB에는 있고 파일에는 없는 최신 캔들만 파일에 추가 (마지막 저장 캔들 이후 구간)
+
+        Args:
+            db: CandleDatabase (get_watermark, get_candle_frame_between 사용)
+
+        Returns:
+            추가한 행 수
+        """
+        added = 0
+        with self._lock:
+            pairs = list(self._files.items())
+        for (symbol, timeframe), candle_file in pairs:
+            latest = candle_file.latest_open_time
+            watermark = db.get_watermark(symbol, timeframe)
+            if latest is None or watermark is None or watermark[0] <= latest:
+                continue
+            frame = db.get_candle_frame_between(symbol, timeframe, ms_to_datetime(latest), ms_to_datetime(watermark[0]))
+            with self._lock:
+                added += candle_file.append(frame.data)
+        return added
+
+    def load_into(self, cache, timeframes=None):
+        """
+        파일 내용으로 CandleCache 채우기 (DB 조회 없이 warm)
+
+        Returns:
+            채운 (심볼, 시간봉) 개수
+        """
+        loaded = 0
+        with self._lock:
+            pairs = list(self._files.items())
+        for (symbol, timeframe), candle_file in pairs:
+            if timeframes is not None and timeframe not in timeframes:
+                continue
+            with self._lock:
+                data = np.array(candle_file.view(cache.capacity), order='C')
+            ring = cache.load(symbol, timeframe, [])
+            ring.append(data)
+            loaded += 1
+        return loaded
+
+    def flush(self):
+        """변경 내용을 디스크에 기록 (종료 시)"""
+        with self._lock:
+            for candle_file in self._files.values():
+                candle_file.flush()
+
+    def stats(self):
+        with self._lock:
+            files = list(self._files.values())
+        return {
+            'files': len(files),
+            'rows': sum(candle_file.count for candle_file in files),
+            'disk_mb': round(sum(os.path.getsize(candle_file.path) for candle_file in files) / 1024 / 1024, 2),
+        }
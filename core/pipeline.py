@@ -0,0 +1,109 @@
+"""
+다운로드/필터 파이프라인 (생산자/소비자)
+
+기존 스캔은 모든 심볼/시간봉 다운로드가 끝난 뒤에 필터를 시작해서
+다운로드(네트워크) 동안 CPU가, 필터 동안 네트워크가 놀고 있음
+→ 다운로드는 별도 스레드에서 실행하고, 필요한 시간봉이 모두 최신화된 심볼부터 바로 필터링
+  (전체 시간 ≈ 다운로드 + 필터 → max(다운로드, 필터) + 마지막 묶음)
+
+- 준비된 심볼은 크기 제한 큐(queue_size)로 전달 → 필터가 느리면 다운로드 저장 루프가 기다림 (backpressure)
+- 필터는 batch_size개씩 묶어서 실행 (시간봉별 DB 일괄 조회/배치 필터를 그대로 사용)
+
+config.json의 pipeline.enable이 true일 때 SurgeScanner.scan에서 사용
+"""
+import queue
+import threading
+import time
+
+
+# 다운로드 종료 표시
+_DONE = object()
+
+
+class ScanPipeline:
+    """
+    produce(on_ready)를 별도 스레드에서, consume(symbols)를 현재 스레드에서 실행
+    """
+
+    def __init__(self, batch_size=50, queue_size=1000):
+        """
+        Args:
+            batch_size: 필터를 한 번에 실행할 최대 심볼 수
+            queue_size: 준비됐지만 아직 필터하지 않은 심볼 최대 개수
+        """
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+        self.stats = None
+
+    def run(self, produce, consume):
+        """
+        Args:
+            produce: produce(on_ready) - 다운로드, 심볼이 준비될 때마다 on_ready(symbol) 호출
+            consume: consume(symbols) - 준비된 심볼 묶음 필터링
+
+        Returns:
+            {'fetch_sec', 'filter_sec', 'wall_sec', 'batches', 'symbols'}
+            (다운로드 중 오류가 나면 필터를 끝낸 뒤 다시 발생)
+        """
+        ready = queue.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+        errors = []
+        fetch_time = {}
+
+        def on_ready(symbol):
+            # 필터 쪽이 오류로 멈추면 더 이상 기다리지 않음
+            while not stopped.is_set():
+                try:
+                    ready.put(symbol, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def producer():
+            started = time.perf_counter()
+            try:
+                produce(on_ready)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                fetch_time['sec'] = time.perf_counter() - started
+                on_ready(_DONE)
+
+        started = time.perf_counter()
+        thread = threading.Thread(target=producer, name='scan-fetch', daemon=True)
+        thread.start()
+
+        filter_sec = 0.0
+        batches = 0
+        symbols = 0
+        finished = False
+        try:
+            while not finished:
+                # 첫 심볼은 기다리고, 이후 batch_size개가 모이거나 다운로드가 끝날 때까지 모음
+                batch = []
+                while len(batch) < self.batch_size:
+                    item = ready.get()
+                    if item is _DONE:
+                        finished = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    continue
+                batch_started = time.perf_counter()
+                consume(batch)
+                filter_sec += time.perf_counter() - batch_started
+                batches += 1
+                symbols += len(batch)
+        finally:
+            stopped.set()
+        thread.join()
+        self.stats = {
+            'fetch_sec': round(fetch_time.get('sec', 0.0), 3),
+            'filter_sec': round(filter_sec, 3),
+            'wall_sec': round(time.perf_counter() - started, 3),
+            'batches': batches,
+            'symbols': symbols,
+        }
+        if errors:
+            raise errors[0]
+        return self.stats
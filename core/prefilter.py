@@ -0,0 +1,154 @@
+"""
+24시간 시세 기반 심볼 사전 필터
+
+기존 스캔은 모든 USDT 심볼의 캔들을 받는데, 대부분의 심볼은 대부분의 시간에 조용함
+→ 24시간 시세(/fapi/v1/ticker/24hr)를 한 번만 받아서 (weight 40)
+  지난 스캔 이후 24시간 거래대금(quote volume) 변화율로 순위를 매기고
+  - cutoff 이상 늘어난 심볼 (후보)
+  - 지난 스캔에서 걸린 심볼, 처음 보는 심볼
+  - 나머지 중 돌아가며 sample_size개 (조용한 심볼도 주기적으로 확인)
+  만 캔들 다운로드 + 필터 실행
+
+24시간 거래대금은 이동 창이라서 스캔 사이의 변화 ≈ 최근 구간 거래대금 - 24시간 전 같은 구간 거래대금
+(최근 거래가 평소보다 많으면 늘어남)
+
+audit_every번마다 한 번은 전체 심볼을 스캔하고, 사전 필터가 골랐을 심볼과 비교해서 놓친 심볼 비율(recall)을 기록
+
+config.json 예시:
+    "prefilter": {"enable": true, "cutoff": 0.02, "sample_size": 20, "audit_every": 12}
+"""
+import threading
+
+from core.rate_limiter import TICKER_24H_WEIGHT, kline_request_weight
+
+
+class TickerPrefilter:
+    """
+    스캔마다 select → (스캔) → finish 순서로 호출
+    """
+
+    def __init__(self, cutoff=0.02, sample_size=20, audit_every=0):
+        """
+        Args:
+            cutoff: 후보로 볼 24시간 거래대금 변화율 (0.02 = 지난 스캔보다 2% 이상 증가)
+            sample_size: 후보가 아닌 심볼 중 매번 돌아가며 포함할 개수
+            audit_every: N번째 스캔마다 전체 스캔으로 recall 측정 (0이면 안 함)
+        """
+        self.cutoff = cutoff
+        self.sample_size = sample_size
+        self.audit_every = audit_every
+        self._previous = {}  # {symbol: 지난 스캔의 24시간 거래대금}
+        self._cursor = 0
+        self._scans = 0
+        self._lock = threading.Lock()
+        self.selection = None  # 이번 스캔의 선택 정보 (select에서 만들고 finish에서 보고서로 바꿈)
+        self.last_report = None
+        self.totals = {'scans': 0, 'audits': 0, 'skipped_pairs': 0, 'weight_saved': 0, 'missed': 0, 'matched': 0}
+
+    def score(self, symbol, ticker):
+        """
+        지난 스캔 대비 24시간 거래대금 변화율 (지난 스캔 값이 없으면 None)
+        """
+        previous = self._previous.get(symbol)
+        if ticker is None or not previous:
+            return None
+        return (ticker['quote_volume'] - previous) / previous
+
+    def select(self, symbols, tickers, keep=(), timeframes=()):
+        """
+        이번 스캔에서 캔들을 받고 필터를 실행할 심볼 선택
+
+        Args:
+            symbols: 전체 심볼 리스트
+            tickers: get_ticker_24h 결과 {symbol: {'quote_volume', ...}} (비어 있으면 전체 스캔)
+            keep: 항상 포함할 심볼 (예: 지난 스캔에서 걸린 심볼)
+            timeframes: 다운로드할 시간봉 (아낀 weight 계산용)
+
+        Returns:
+            (스캔할 심볼 리스트 (symbols 순서), audit 여부 - True면 전체 심볼을 스캔해야 함)
+        """
+        with self._lock:
+            self._scans += 1
+            if not tickers:
+                self.selection = None
+                return list(symbols), False
+
+            keep = set(keep)
+            candidates = []
+            quiet = []
+            for symbol in symbols:
+                score = self.score(symbol, tickers.get(symbol))
+                if score is None or score >= self.cutoff or symbol in keep:
+                    candidates.append(symbol)
+                else:
+                    quiet.append(symbol)
+
+            # 조용한 심볼은 돌아가면서 sample_size개씩
+            sample = []
+            if quiet and self.sample_size > 0:
+                start = self._cursor % len(quiet)
+                sample = (quiet[start:] + quiet[:start])[:self.sample_size]
+                self._cursor = start + len(sample)
+
+            chosen = set(candidates) | set(sample)
+            selected = [symbol for symbol in symbols if symbol in chosen]
+            self._previous = {symbol: ticker['quote_volume'] for symbol, ticker in tickers.items()}
+
+            audit = bool(self.audit_every) and self._scans % self.audit_every == 0
+            skipped = len(symbols) - len(selected)
+            weight_saved = 0 if audit else skipped * len(timeframes) * kline_request_weight(500) - TICKER_24H_WEIGHT
+            self.selection = {
+                'symbols': len(symbols),
+                'candidates': len(candidates),
+                'sample': len(sample),
+                'selected': len(selected),
+                'skipped_pairs': 0 if audit else skipped * len(timeframes),
+                'weight_saved': weight_saved,
+                'audit': audit,
+                'chosen': chosen,
+            }
+            return (list(symbols) if audit else selected), audit
+
+    def finish(self, matched_symbols):
+        """
+        스캔 결과로 보고서 작성
+
+        Args:
+            matched_symbols: 이번 스캔에서 필터에 걸린 심볼
+
+        Returns:
+            보고서 dict (audit 스캔이면 recall/missed 포함), select가 전체 스캔이었으면 None
+        """
+        with self._lock:
+            selection = self.selection
+            self.selection = None
+            if selection is None:
+                return None
+
+            report = dict(selection)
+            chosen = report.pop('chosen')
+            self.totals['scans'] += 1
+            self.totals['skipped_pairs'] += report['skipped_pairs']
+            self.totals['weight_saved'] += report['weight_saved']
+            if report['audit']:
+                matched = set(matched_symbols)
+                missed = sorted(matched - chosen)
+                report['matched'] = len(matched)
+                report['missed'] = missed
+                report['recall'] = round(1 - len(missed) / len(matched), 4) if matched else 1.0
+                self.totals['audits'] += 1
+                self.totals['matched'] += len(matched)
+                self.totals['missed'] += len(missed)
+            self.last_report = report
+            return report
+
+    def stats(self):
+        """
+        Returns:
+            누적 통계 + audit 스캔 기준 recall + 마지막 보고서
+        """
+        with self._lock:
+            stats = dict(self.totals)
+            stats['recall'] = round(1 - stats['missed'] / stats['matched'], 4) if stats['matched'] else None
+            stats['last'] = self.last_report
+            return stats
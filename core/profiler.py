@@ -0,0 +1,248 @@
+"""
+스캔 프로파일링
+
+스캔이 늦어져도 로그만으로는 다운로드(HTTP), DB 저장, 필터, 시가총액 조회 중 어디서 시간이 걸렸는지 알기 어려움
+→ 스캔 1번 동안
+  - 단계별 시간 (phase)
+  - (심볼, 시간봉)별 다운로드/저장 시간, 필터 실행 시간, DB 쿼리 시간 (히스토그램 + 가장 느린 (심볼, 시간봉))
+  - 바이낸스 요청 수/weight, DB 쿼리 수 (counter)
+  를 모아서 결과 파일 옆의 scan_profile.json에 저장
+  (cprofile을 켜면 스캔 스레드의 cProfile 결과도 scan_profile.prof + JSON의 상위 함수 목록으로 저장)
+
+측정 함수(phase/observe/count)는 항상 core.metrics(/metrics)에 전달하고, 프로파일링 중일 때만 프로파일에도 기록
+(다운로드 스레드, DB 저장 등 어디서 호출해도 되고 스레드 안전)
+파이프라인 모드에서는 다운로드와 필터가 겹쳐서 실행되므로 단계 시간의 합이 전체 시간보다 길 수 있음
+
+config.json 예시:
+    "profiling": {"enable": true, "slowest": 20, "cprofile": false, "cprofile_top": 30}
+"""
+import bisect
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from core import metrics
+from core.metrics import LATENCY_BUCKETS
+
+
+class Histogram:
+    """고정 구간 지연 시간 히스토그램 (LATENCY_BUCKETS)"""
+
+    __slots__ = ('buckets', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """q 분위수가 속한 구간의 상한 (초, 마지막 구간이면 최댓값)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        labels = [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g}ms"]
+        return {
+            'count': self.count,
+            'total_sec': round(self.total, 4),
+            'avg_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'buckets': {label: bucket for label, bucket in zip(labels, self.buckets) if bucket},
+        }
+
+
+class ScanProfile:
+    """스캔 1번의 측정값"""
+
+    def __init__(self, slowest=20):
+        """
+        Args:
+            slowest: JSON에 남길 가장 느린 (심볼, 시간봉) 개수
+        """
+        self.slowest = slowest
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.wall_sec = None
+        self.phases = {}      # {phase: 초} (같은 단계가 여러 번이면 합계)
+        self.histograms = {}  # {name: Histogram}
+        self.counters = {}    # {name: int}
+        self.pairs = {}       # {(symbol, timeframe): {name: 초}}
+        self.cprofile = None
+        self._lock = threading.Lock()
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def observe(self, name, seconds, symbol=None, timeframe=None):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if symbol is not None:
+                timings = self.pairs.setdefault((symbol, timeframe), {})
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self):
+        self.wall_sec = time.perf_counter() - self._started
+
+    def to_dict(self):
+        with self._lock:
+            slowest = sorted(self.pairs.items(), key=lambda item: sum(item[1].values()), reverse=True)[:self.slowest]
+            profile = {
+                'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'wall_sec': round(self.wall_sec if self.wall_sec is not None else time.perf_counter() - self._started, 3),
+                'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+                'slowest_pairs': [
+                    {'symbol': symbol, 'timeframe': timeframe,
+                     **{f"{name}_ms": round(seconds * 1000, 3) for name, seconds in timings.items()},
+                     'total_ms': round(sum(timings.values()) * 1000, 3)}
+                    for (symbol, timeframe), timings in slowest
+                ],
+            }
+            if self.cprofile is not None:
+                profile['cprofile'] = self.cprofile
+            return profile
+
+    def summary(self):
+        phases = ', '.join(f"{name} {seconds:.2f}초" for name, seconds in self.phases.items())
+        return (f"전체 {self.wall_sec or 0:.2f}초 ({phases}), 바이낸스 요청 {self.counters.get('binance_requests', 0)}개 "
+                f"(weight {self.counters.get('binance_weight', 0)}), DB 쿼리 {self.counters.get('db_queries', 0)}개")
+
+
+# 현재 진행 중인 프로파일 (스캔 중에만 있음)
+_active = None
+
+
+def start(slowest=20):
+    """프로파일링 시작 (이후 phase/observe/count가 기록됨)"""
+    global _active
+    _active = ScanProfile(slowest=slowest)
+    return _active
+
+
+def stop():
+    """프로파일링 종료, 끝난 ScanProfile 반환"""
+    global _active
+    profile, _active = _active, None
+    if profile is not None:
+        profile.finish()
+    return profile
+
+
+def current():
+    """진행 중인 ScanProfile (없으면 None)"""
+    return _active
+
+
+@contextmanager
+def phase(name):
+    """with 블록의 실행 시간을 단계 시간에 더함"""
+    profile = _active
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        metrics.observe_phase(name, seconds)
+        if profile is not None:
+            profile.add_phase(name, seconds)
+
+
+def observe(name, seconds, symbol=None, timeframe=None):
+    """
+    작업 1건의 시간 기록 (히스토그램, symbol이 있으면 (심볼, 시간봉)별 합계에도 더함)
+
+    Args:
+        name: 작업 이름 (예: 'fetch', 'save', 'filter', 'db_query')
+        seconds: 걸린 시간 (초)
+    """
+    metrics.observe(name, seconds)
+    profile = _active
+    if profile is not None:
+        profile.observe(name, seconds, symbol, timeframe)
+
+
+def count(name, amount=1):
+    """counter 증가 (예: 'binance_requests', 'db_queries')"""
+    metrics.count(name, amount)
+    profile = _active
+    if profile is not None:
+        profile.count(name, amount)
+
+
+def cprofile_top(profiler, top=30):
+    """
+    cProfile 결과 중 누적 시간이 긴 함수 top개
+
+    Returns:
+        [{'function', 'calls', 'total_sec', 'cumulative_sec'}, ...]
+    """
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {'function': f"{os.path.basename(filename)}:{line}({name})", 'calls': calls,
+         'total_sec': round(total, 4), 'cumulative_sec': round(cumulative, 4)}
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+def run_profiled(func, profile_file, slowest=20, use_cprofile=False, cprofile_top_count=30):
+    """
+    func()를 프로파일링하면서 실행하고 결과를 profile_file(JSON)에 저장
+
+    Args:
+        func: 실행할 함수 (예: 스캔)
+        profile_file: 프로파일 JSON 경로 (cProfile을 쓰면 같은 이름의 .prof도 저장)
+        use_cprofile: cProfile 사용 여부 (func를 실행하는 스레드만 측정)
+
+    Returns:
+        ScanProfile
+    """
+    profile = start(slowest=slowest)
+    profiler = cProfile.Profile() if use_cprofile else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            func()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        stop()
+        if profiler is not None:
+            profiler.dump_stats(os.path.splitext(profile_file)[0] + '.prof')
+            profile.cprofile = cprofile_top(profiler, cprofile_top_count)
+        with open(profile_file, 'w', encoding='utf-8') as f:
+            json.dump(profile.to_dict(), f, ensure_ascii=False, indent=2)
+    return profile
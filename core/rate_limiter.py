@@ -0,0 +1,229 @@
+"""
+바이낸스 request weight 제한 관리
+
+바이낸스 선물 API는 IP당 1분에 사용할 수 있는 request weight가 정해져 있음 (기본 2400)
+토큰 버킷으로 weight를 미리 차감해서 여러 스레드가 동시에 요청해도 제한을 넘지 않게 함
+응답 헤더(X-MBX-USED-WEIGHT-1M)로 서버가 집계한 사용량을 받아 버킷을 보정하고,
+429/418(ban) 응답을 받으면 모든 요청을 해당 시간까지 멈춤
+"""
+import re
+import threading
+import time
+
+from core import metrics, profiler
+
+
+# futures_klines 요청의 limit 구간별 weight (바이낸스 문서 기준)
+KLINE_WEIGHT_TABLE = [
+    (100, 1),
+    (500, 2),
+    (1001, 5),
+]
+KLINE_MAX_WEIGHT = 10
+
+# 심볼 없이 요청한 24시간 시세 (/fapi/v1/ticker/24hr) weight
+TICKER_24H_WEIGHT = 40
+
+# 서버가 알려주는 1분간 사용 weight 헤더
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+# -1003 에러 메시지의 ban 해제 시각 (밀리초)
+BANNED_UNTIL_PATTERN = re.compile(r'banned until (\d+)')
+
+
+def kline_request_weight(limit):
+    """
+    futures_klines 요청 1회의 weight 계산
+
+    Args:
+        limit: 요청할 캔들 개수
+
+    Returns:
+        request weight
+    """
+    for upper, weight in KLINE_WEIGHT_TABLE:
+        if limit < upper:
+            return weight
+    return KLINE_MAX_WEIGHT
+
+
+class WeightRateLimiter:
+    """
+    분당 request weight 예산을 기준으로 한 토큰 버킷
+
+    - 버킷 크기: weight_per_minute * safety_ratio
+    - 초당 (버킷 크기 / 60) 만큼 토큰이 다시 채워짐
+    - acquire()는 필요한 weight만큼 토큰이 생길 때까지 대기 (스레드 안전)
+    - update_used_weight()로 서버 집계 사용량을 반영 (남은 예산보다 토큰이 많으면 줄임)
+    - 서버 사용량이 예산에 도달하거나 ban을 받으면 pause_until()로 모든 요청 정지
+    """
+
+    def __init__(self, weight_per_minute=2400, safety_ratio=0.9, default_retry_after=60):
+        """
+        Args:
+            weight_per_minute: 바이낸스가 허용하는 분당 weight (선물 기본값: 2400)
+            safety_ratio: 실제로 사용할 예산 비율 (기본값: 0.9 = 90%)
+            default_retry_after: 429/418 응답에 대기 시간 정보가 없을 때 쉴 시간 (초)
+        """
+        self.weight_per_minute = weight_per_minute
+        self.capacity = weight_per_minute * safety_ratio
+        self.refill_rate = self.capacity / 60.0  # 초당 충전되는 weight
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.default_retry_after = default_retry_after
+
+        # 서버 집계 사용량 / 전체 정지 시각 (time.time() 기준)
+        self.used_weight = None
+        self.paused_until = 0.0
+
+        # 통계
+        self.total_weight = 0
+        self.total_wait = 0.0
+        self.ban_count = 0
+
+    def _refill(self, now):
+        """경과 시간만큼 토큰 충전 (lock을 잡은 상태에서 호출)"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.last_refill = now
+
+    def acquire(self, weight=1):
+        """
+        weight만큼 토큰을 차감, 부족하면 충전될 때까지 대기
+
+        Args:
+            weight: 요청에 필요한 weight
+
+        Returns:
+            대기한 시간 (초)
+        """
+        # 버킷보다 큰 요청은 버킷 크기로 제한 (무한 대기 방지)
+        weight = min(weight, self.capacity)
+        waited = 0.0
+
+        while True:
+            # ban/한도 도달로 정지 중이면 모든 스레드가 해제 시각까지 대기
+            pause_left = self.paused_until - time.time()
+            if pause_left > 0:
+                time.sleep(pause_left)
+                waited += pause_left
+                continue
+
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    self.total_weight += weight
+                    self.total_wait += waited
+                    profiler.count('binance_requests')
+                    profiler.count('binance_weight', weight)
+                    return waited
+
+                wait_time = (weight - self.tokens) / self.refill_rate
+
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def pause_until(self, until_ts):
+        """
+        지정 시각까지 모든 요청 정지 (이미 더 늦게까지 정지 중이면 유지)
+
+        Args:
+            until_ts: 정지 해제 시각 (time.time() 기준 초)
+        """
+        with self.lock:
+            if until_ts > self.paused_until:
+                self.paused_until = until_ts
+            # 정지가 풀리면 빈 버킷에서 다시 시작
+            self.tokens = 0
+            self.last_refill = time.monotonic() + max(0.0, self.paused_until - time.time())
+
+    def update_used_weight(self, used_weight):
+        """
+        서버가 알려준 현재 분의 사용 weight를 반영
+
+        - 남은 예산(capacity - used_weight)보다 토큰이 많으면 토큰을 줄여서 미리 속도를 늦춤
+        - 예산을 다 썼으면 다음 분(서버 집계 초기화)까지 정지
+
+        Args:
+            used_weight: X-MBX-USED-WEIGHT-1M 값
+        """
+        with self.lock:
+            self.used_weight = used_weight
+            remaining = self.capacity - used_weight
+            if remaining < self.tokens:
+                self.tokens = max(0.0, remaining)
+
+        if remaining <= 0:
+            now = time.time()
+            next_minute = (int(now) // 60 + 1) * 60
+            self.pause_until(next_minute)
+
+    def update_from_headers(self, headers):
+        """
+        응답 헤더에서 X-MBX-USED-WEIGHT-1M을 읽어서 반영
+
+        Args:
+            headers: 응답 헤더 (requests의 대소문자 무시 dict)
+
+        Returns:
+            읽은 used weight, 헤더가 없으면 None
+        """
+        if headers is None:
+            return None
+        value = headers.get(USED_WEIGHT_HEADER)
+        if value is None:
+            return None
+        try:
+            used_weight = int(value)
+        except ValueError:
+            return None
+        self.update_used_weight(used_weight)
+        metrics.BINANCE_USED_WEIGHT.labels().set(used_weight)
+        return used_weight
+
+    def handle_rate_limit_error(self, status_code, message=None, headers=None):
+        """
+        429 (요청 제한) / 418 (IP ban) 응답 처리
+        ban 해제 시각 또는 Retry-After만큼 모든 요청 정지
+
+        Args:
+            status_code: HTTP 상태 코드
+            message: 에러 메시지 ('banned until 1700000000000' 포함 가능)
+            headers: 응답 헤더 (Retry-After 포함 가능)
+
+        Returns:
+            정지할 시간 (초)
+        """
+        now = time.time()
+        until_ts = None
+
+        # 1. 메시지의 ban 해제 시각 (밀리초)
+        if message:
+            match = BANNED_UNTIL_PATTERN.search(message)
+            if match:
+                until_ts = int(match.group(1)) / 1000
+
+        # 2. Retry-After 헤더 (초)
+        if until_ts is None and headers is not None:
+            retry_after = headers.get('Retry-After')
+            if retry_after is not None:
+                try:
+                    until_ts = now + float(retry_after)
+                except ValueError:
+                    pass
+
+        # 3. 정보가 없으면 기본값
+        if until_ts is None:
+            until_ts = now + self.default_retry_after
+
+        if status_code == 418:
+            self.ban_count += 1
+
+        self.pause_until(until_ts)
+        return max(0.0, until_ts - now)
@@ -0,0 +1,160 @@
+"""
+1분봉 → 상위 시간봉 리샘플링
+
+1분봉만 바이낸스에서 받고 5m/15m/30m/1h 등은 DB의 1분봉을 모아서 직접 만듦
+새로 들어온 1분봉이 속한 구간(bucket)만 다시 계산해서 save_candles로 저장
+"""
+from datetime import datetime, timedelta, timezone
+
+
+# 시간봉 → 밀리초
+TIMEFRAME_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+}
+
+BASE_TIMEFRAME = '1m'
+
+
+def timeframe_to_ms(timeframe):
+    """
+    시간봉 문자열을 밀리초로 변환
+
+    Args:
+        timeframe: 시간봉 (예: '5m', '1h', '1d')
+
+    Returns:
+        밀리초
+    """
+    unit = timeframe[-1]
+    if unit not in TIMEFRAME_UNIT_MS:
+        raise ValueError(f"지원하지 않는 시간봉: {timeframe}")
+    return int(timeframe[:-1]) * TIMEFRAME_UNIT_MS[unit]
+
+
+def datetime_to_ms(value):
+    """DB의 naive UTC datetime (또는 밀리초 정수)을 밀리초 타임스탬프로 변환"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def ms_to_datetime(value):
+    """밀리초 타임스탬프를 naive UTC datetime으로 변환"""
+    return datetime(1970, 1, 1) + timedelta(milliseconds=value)
+
+
+def resample_klines(klines, timeframe, require_complete_start=True):
+    """
+    1분봉 캔들을 상위 시간봉으로 합치기
+
+    - open: 구간 첫 캔들의 시가, close: 마지막 캔들의 종가
+    - high/low: 구간 최고가/최저가
+    - volume/quote_volume: 합계
+    - close_time: 구간 시작 + 시간봉 길이 - 1ms (바이낸스와 동일)
+
+    Args:
+        klines: 1분봉 리스트 (오래된 순) [open_time(ms), open, high, low, close, volume, close_time, quote_volume]
+        timeframe: 만들 시간봉 (예: '5m')
+        require_complete_start: True면 구간 시작 1분봉이 없는 구간은 제외 (앞부분 데이터 누락 방지)
+
+    Returns:
+        상위 시간봉 리스트 (바이낸스 futures_klines와 같은 형식)
+    """
+    interval_ms = timeframe_to_ms(timeframe)
+    result = []
+    current = None
+
+    for kline in klines:
+        open_time = int(kline[0])
+        bucket = open_time - open_time % interval_ms
+
+        if current is None or current[0] != bucket:
+            if current is not None:
+                result.append(current)
+            if require_complete_start and open_time != bucket:
+                current = None
+                # 구간 중간부터 시작하는 데이터는 다음 구간까지 건너뜀
+                continue
+            current = [
+                bucket,
+                float(kline[1]), float(kline[2]), float(kline[3]), float(kline[4]),
+                float(kline[5]),
+                bucket + interval_ms - 1,
+                float(kline[7]),
+            ]
+        else:
+            high = float(kline[2])
+            low = float(kline[3])
+            if high > current[2]:
+                current[2] = high
+            if low < current[3]:
+                current[3] = low
+            current[4] = float(kline[4])
+            current[5] += float(kline[5])
+            current[7] += float(kline[7])
+
+    if current is not None:
+        result.append(current)
+
+    return result
+
+
+class CandleResampler:
+    """
+    DB에 저장된 1분봉으로 상위 시간봉을 증분 갱신
+
+    새 1분봉이 건드린 구간의 시작 시각부터 1분봉을 다시 읽어서
+    해당 구간들만 다시 합친 뒤 save_candles로 저장 (upsert)
+    """
+
+    def __init__(self, db, base_timeframe=BASE_TIMEFRAME):
+        """
+        Args:
+            db: CandleDatabase (get_candle_frame_between, save_candles 사용)
+            base_timeframe: 원본 시간봉 (기본값: '1m')
+        """
+        self.db = db
+        self.base_timeframe = base_timeframe
+
+    def update(self, symbol, new_klines, timeframes):
+        """
+        새로 저장된 1분봉이 속한 구간만 상위 시간봉으로 다시 계산해서 저장
+
+        Args:
+            symbol: 거래쌍
+            new_klines: 방금 저장된 1분봉 리스트 (바이낸스 형식)
+            timeframes: 만들 시간봉 리스트 (예: ['5m', '15m', '1h'])
+
+        Returns:
+            {timeframe: 저장된 캔들 개수}
+        """
+        if not new_klines:
+            return {}
+
+        first_new = min(int(kline[0]) for kline in new_klines)
+        last_new = max(int(kline[0]) for kline in new_klines)
+
+        targets = [tf for tf in timeframes if tf != self.base_timeframe]
+        if not targets:
+            return {}
+
+        # 가장 긴 시간봉의 구간 시작부터 1분봉을 한 번만 읽음
+        longest_ms = max(timeframe_to_ms(tf) for tf in targets)
+        range_start = first_new - first_new % longest_ms
+        base_klines = self.db.get_candle_frame_between(
+            symbol, self.base_timeframe, ms_to_datetime(range_start), ms_to_datetime(last_new)
+        ).to_klines()
+
+        saved = {}
+        for timeframe in targets:
+            interval_ms = timeframe_to_ms(timeframe)
+            bucket_start = first_new - first_new % interval_ms
+            touched = [kline for kline in base_klines if kline[0] >= bucket_start]
+            resampled = resample_klines(touched, timeframe)
+            saved[timeframe] = self.db.save_candles(symbol, timeframe, resampled) if resampled else 0
+
+        return saved
@@ -0,0 +1,212 @@
+"""
+오래된 캔들 정리 (retention)
+
+심볼마다 COUNT + DELETE 서브쿼리를 날리는 대신 시간봉별 기준 시각(cutoff) 이전 캔들을 삭제
+- cutoff = 현재 시각 - keep_count x 시간봉 길이 (시간봉당 최신 keep_count개 분량만 유지)
+- 테이블이 TO_DAYS(open_time) 기준 RANGE 파티션이면 모든 시간봉에서 만료된 날짜의 파티션은 통째로 DROP
+- 나머지는 timeframe + open_time 조건으로 chunk_size개씩 나눠서 삭제 (한 번에 오래 잠그지 않음)
+
+스캔과 별도의 스케줄러 잡으로 실행하고, 스캔 중에는 chunk 사이에서 대기 (낮은 우선순위)
+"""
+import time
+from datetime import datetime, timedelta
+
+from core.resampler import timeframe_to_ms, datetime_to_ms, ms_to_datetime
+
+
+# MySQL TO_DAYS() 값과 파이썬 date.toordinal()의 차이 (TO_DAYS는 0년부터 계산)
+TO_DAYS_OFFSET = 365
+
+# 스캔이 끝나길 기다리는 최대 시간 (초)
+MAX_YIELD_WAIT = 600
+
+
+def retention_cutoffs(timeframes, keep_count, now_ms):
+    """
+    시간봉별 삭제 기준 시각 계산
+
+    Args:
+        timeframes: 시간봉 리스트 (예: ['1m', '5m', '1h'])
+        keep_count: 시간봉당 유지할 캔들 개수
+        now_ms: 현재 시각 (밀리초)
+
+    Returns:
+        {timeframe: cutoff 밀리초} (open_time이 cutoff보다 이전인 캔들이 삭제 대상)
+    """
+    cutoffs = {}
+    for timeframe in timeframes:
+        try:
+            interval_ms = timeframe_to_ms(timeframe)
+        except ValueError:
+            # '1w', '1M' 등 계산할 수 없는 시간봉은 정리하지 않음
+            continue
+        current_bucket = now_ms - now_ms % interval_ms
+        cutoffs[timeframe] = current_bucket - (keep_count - 1) * interval_ms
+    return cutoffs
+
+
+def to_days_to_datetime(to_days):
+    """MySQL TO_DAYS() 값을 그 날 0시 (naive UTC datetime)로 변환"""
+    return datetime.fromordinal(int(to_days) - TO_DAYS_OFFSET)
+
+
+def datetime_to_to_days(value):
+    """datetime을 MySQL TO_DAYS() 값으로 변환"""
+    return value.toordinal() + TO_DAYS_OFFSET
+
+
+class RetentionReport:
+    """정리 결과 (시간봉별 삭제 개수, 삭제한 파티션, 소요 시간)"""
+
+    def __init__(self):
+        self.deleted = {}
+        self.dropped_partitions = []
+        self.dropped_rows = 0
+        self.created_partitions = []
+        self.statements = 0
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def total_deleted(self):
+        return sum(self.deleted.values()) + self.dropped_rows
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def to_dict(self):
+        return {
+            'total_deleted': self.total_deleted,
+            'deleted_by_timeframe': dict(self.deleted),
+            'dropped_partitions': list(self.dropped_partitions),
+            'dropped_rows': self.dropped_rows,
+            'created_partitions': list(self.created_partitions),
+            'statements': self.statements,
+            'elapsed_sec': round(self.elapsed, 3),
+        }
+
+    def summary(self):
+        parts = [f"{timeframe}: {count}개" for timeframe, count in self.deleted.items() if count]
+        if self.dropped_partitions:
+            parts.append(f"파티션 {len(self.dropped_partitions)}개 DROP ({self.dropped_rows}개)")
+        detail = ", ".join(parts) if parts else "정리할 데이터 없음"
+        return f"총 {self.total_deleted}개 정리 ({detail}) - 쿼리 {self.statements}번, {self.elapsed:.2f}초"
+
+
+class RetentionEngine:
+    """
+    시간봉별 cutoff 기준 데이터 정리
+    """
+
+    def __init__(self, db, keep_count=10000, chunk_size=5000, chunk_pause=0.05,
+                 partition_days_ahead=3, should_yield=None):
+        """
+        Args:
+            db: CandleDatabase
+            keep_count: 시간봉당 유지할 캔들 개수 (config의 scanner.keep_candles)
+            chunk_size: DELETE 1번에 삭제할 최대 행 수
+            chunk_pause: chunk 사이 대기 시간 (초)
+            partition_days_ahead: 파티션 테이블이면 미리 만들어 둘 날짜 수
+            should_yield: True를 반환하는 동안 chunk 사이에서 대기 (예: 스캔 실행 중)
+        """
+        self.db = db
+        self.keep_count = keep_count
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause
+        self.partition_days_ahead = partition_days_ahead
+        self.should_yield = should_yield
+
+    def run(self, now=None):
+        """
+        정리 실행
+
+        Args:
+            now: 기준 시각 (naive UTC datetime, 기본값: 현재)
+
+        Returns:
+            RetentionReport
+        """
+        report = RetentionReport()
+        now = now or datetime.utcnow()
+
+        timeframes = self.db.get_timeframes()
+        report.statements += 1
+        cutoffs = retention_cutoffs(timeframes, self.keep_count, datetime_to_ms(now))
+
+        partitions = self.db.get_partitions()
+        report.statements += 1
+        if partitions and cutoffs:
+            self._drop_expired_partitions(partitions, min(cutoffs.values()), report)
+            self._create_future_partitions(partitions, now, report)
+
+        for timeframe, cutoff_ms in cutoffs.items():
+            report.deleted[timeframe] = self._delete_before(timeframe, ms_to_datetime(cutoff_ms), report)
+
+        if report.total_deleted > 0:
+            # 심볼별 개수가 바뀌었으므로 다음 조회 때 GROUP BY로 다시 불러옴
+            self.db.watermarks.reset()
+
+        report.finish()
+        return report
+
+    def _delete_before(self, timeframe, cutoff, report):
+        """cutoff 이전 캔들을 chunk_size개씩 삭제"""
+        deleted = 0
+        while True:
+            self._wait_if_busy()
+            count = self.db.delete_candles_before(timeframe, cutoff, limit=self.chunk_size)
+            report.statements += 1
+            deleted += count
+            if count < self.chunk_size:
+                return deleted
+            time.sleep(self.chunk_pause)
+
+    def _drop_expired_partitions(self, partitions, cutoff_ms, report):
+        """
+        모든 시간봉에서 만료된 날짜의 파티션 DROP
+
+        Args:
+            partitions: [(파티션 이름, TO_DAYS 상한값 또는 None(MAXVALUE), 행 수)]
+            cutoff_ms: 모든 시간봉 cutoff 중 가장 이른 시각
+        """
+        cutoff = ms_to_datetime(cutoff_ms)
+        expired = [(name, rows) for name, upper, rows in partitions
+                   if upper is not None and to_days_to_datetime(upper) <= cutoff]
+        # 파티션을 모두 지우면 안 되므로 마지막 파티션은 남김
+        expired = expired[:max(0, len(partitions) - 1)]
+        if not expired:
+            return
+
+        self._wait_if_busy()
+        self.db.drop_partitions([name for name, _ in expired])
+        report.statements += 1
+        report.dropped_partitions.extend(name for name, _ in expired)
+        report.dropped_rows += sum(rows or 0 for _, rows in expired)
+
+    def _create_future_partitions(self, partitions, now, report):
+        """
+        MAXVALUE 파티션이 있으면 앞으로 partition_days_ahead일치 일별 파티션을 미리 분리
+        """
+        if partitions[-1][1] is not None:
+            return
+        bounds = [upper for _, upper, _ in partitions if upper is not None]
+        last_bound = max(bounds) if bounds else datetime_to_to_days(now)
+        target = datetime_to_to_days(now + timedelta(days=self.partition_days_ahead + 1))
+
+        new_bounds = list(range(last_bound + 1, target + 1))
+        if not new_bounds:
+            return
+
+        self._wait_if_busy()
+        names = self.db.split_max_partition(partitions[-1][0], new_bounds)
+        report.statements += 1
+        report.created_partitions.extend(names)
+
+    def _wait_if_busy(self):
+        """스캔 중이면 끝날 때까지 대기 (최대 MAX_YIELD_WAIT초)"""
+        if self.should_yield is None:
+            return
+        waited = 0.0
+        while self.should_yield() and waited < MAX_YIELD_WAIT:
+            time.sleep(0.5)
+            waited += 0.5
@@ -9,10 +9,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 import os
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from pytz import timezone
 from core.downloader import ChartDownloader
+from core.storage import create_candle_database
+from core.retention import RetentionEngine
+from core.candle_cache import CandleCache
+from core.indicators import IndicatorStore
+from core.mmap_store import MmapCandleStore, DEFAULT_DIRECTORY
+from core.pipeline import ScanPipeline
+from core.eval_markers import EvaluationMarkers, WatermarkSnapshot, stale_pairs
+from core.prefilter import TickerPrefilter
+from core import metrics, profiler
+from core.stream import KlineStreamIngestor
+from core.resampler import BASE_TIMEFRAME
 from service.filter import Filter
+from service.vectorized_filter import VectorizedFilter
+from service.filter_registry import FilterContext, get_filter_plugin, load_filter_plugins
+from service.parallel_filter import FilterPool
 from core.scheduler_state import scheduler_info
 
 
@@ -36,9 +52,62 @@ class SurgeScanner:
             "last_update": None,
             "surge_coins": []
         }
+        self.last_fetch_stats = None
+        self.last_pipeline_stats = None
+        self.last_retention_report = None
+        self.last_profile = None
+        
+        # 스캔 프로파일 (config의 profiling.enable이 true일 때 결과 파일 옆에 저장)
+        self.profile_file = os.path.join(os.path.dirname(result_file), "scan_profile.json")
+        
+        # 캔들 마감 기준 스케줄: 필터별 최신 결과 {filter_type: [{"symbol", "time", "filter", "timeframe"}, ...]}
+        self.filter_results = {}
+        self.scan_lock = threading.Lock()
+        
+        # (심볼, 시간봉, 필터)별 마지막 평가 캔들 (config의 incremental.enable이 true일 때만 사용)
+        self.eval_markers = EvaluationMarkers() if self.config.get('incremental', {}).get('enable') else None
+        
+        # 24시간 시세 기반 심볼 사전 필터 (config의 prefilter.enable이 true일 때만 사용)
+        prefilter_config = self.config.get('prefilter', {})
+        self.prefilter = None
+        if prefilter_config.get('enable'):
+            self.prefilter = TickerPrefilter(cutoff=prefilter_config.get('cutoff', 0.02),
+                                             sample_size=prefilter_config.get('sample_size', 20),
+                                             audit_every=prefilter_config.get('audit_every', 0))
+        
+        # WebSocket 캔들 스트림 (config의 stream.enable이 true일 때만 사용)
+        self.stream = None
+        self.stream_downloader = None
         
         # 로거 설정
         self.logger = self._setup_logger()
+        
+        # 필터용 캔들 캐시 (config의 cache.enable이 true일 때만 사용)
+        cache_config = self.config.get('cache', {})
+        self.candle_cache = CandleCache(capacity=cache_config.get('capacity', 512)) if cache_config.get('enable') else None
+        
+        # 메모리 맵 캔들 저장소 (config의 mmap_store.enable이 true일 때만 사용)
+        store_config = self.config.get('mmap_store', {})
+        self.candle_store = None
+        if store_config.get('enable'):
+            self.candle_store = MmapCandleStore(directory=store_config.get('directory', DEFAULT_DIRECTORY),
+                                                capacity=store_config.get('capacity', 2048))
+        
+        # (심볼, 시간봉, period)별 지표 상태 (config의 indicators.enable이 true일 때만 사용)
+        self.indicators = None
+        if self.config.get('indicators', {}).get('enable'):
+            self.indicators = IndicatorStore()
+            for filter_config in self.config.get('filter', []):
+                plugin = get_filter_plugin(filter_config.get('types'))
+                plugin.track_indicators(self.indicators, plugin.params(filter_config))
+        
+        # 필터 단계 프로세스 풀 (config의 filter_pool.enable이 true일 때만 사용)
+        pool_config = self.config.get('filter_pool', {})
+        self.filter_pool = None
+        if pool_config.get('enable'):
+            self.filter_pool = FilterPool(workers=pool_config.get('workers', 4),
+                                          engine=self.config.get('scanner', {}).get('filter_engine', 'python'),
+                                          plugin_modules=self.config.get('filter_plugins'))
     
     def _load_config(self):
         """설정 파일 로드"""
@@ -53,7 +122,7 @@ class SurgeScanner:
             
             # 필수 키 검증
             required_keys = {
-                'scanner': ['symbol_limit', 'batch_size', 'batch_delay', 'keep_candles'],
+                'scanner': ['symbol_limit', 'batch_size', 'keep_candles'],
                 'tot_timeframes': None,  # 리스트 타입
                 'filter': None  # 리스트 타입, 하위 검증 필요
             }
@@ -78,14 +147,18 @@ class SurgeScanner:
                 self.logger.critical("설정 파일을 확인하시오!!. 프로그램이 종료됩니다.")
                 exit()
             
-            # 각 필터 설정 검증
-            filter_required_keys = ['types', 'using_timeframe', 'interval', 'period', 'window']
+            # 각 필터 설정 검증 (필터 플러그인의 스키마)
+            load_filter_plugins(config.get('filter_plugins'))
             for i, filter_config in enumerate(config['filter']):
-                for key in filter_required_keys:
-                    if key not in filter_config:
-                        self.logger.critical(f"❌ 설정 파일의 filter[{i}]에 필수 키 '{key}'가 없습니다.")
-                        self.logger.critical("설정 파일을 확인하시오!!. 프로그램이 종료됩니다.")
-                        exit()
+                plugin = get_filter_plugin(filter_config.get('types'))
+                if plugin is None:
+                    self.logger.critical(f"❌ 설정 파일의 filter[{i}]: 등록되지 않은 필터 '{filter_config.get('types')}'")
+                    self.logger.critical("설정 파일을 확인하시오!!. 프로그램이 종료됩니다.")
+                    exit()
+                for error in plugin.validate(filter_config):
+                    self.logger.critical(f"❌ 설정 파일의 filter[{i}] ({plugin.name}): {error}")
+                    self.logger.critical("설정 파일을 확인하시오!!. 프로그램이 종료됩니다.")
+                    exit()
             
             return config
 
@@ -122,6 +195,25 @@ class SurgeScanner:
         logger.addHandler(console_handler)
         return logger
     
+    def _create_downloader(self):
+        """설정(scanner.max_workers, scanner.weight_per_minute, storage)을 반영한 다운로더 생성"""
+        scanner_config = self.config.get('scanner', {})
+        return ChartDownloader(
+            self.db_config,
+            max_workers=scanner_config.get('max_workers', 8),
+            weight_per_minute=scanner_config.get('weight_per_minute', 2400),
+            storage_config=self.config.get('storage'),
+            candle_cache=self.candle_cache,
+            candle_store=self.candle_store,
+            indicators=self.indicators
+        )
+    
+    def _create_filter(self):
+        """config의 scanner.filter_engine에 맞는 필터 생성 ("python" 기본, "vectorized"는 NumPy 버전)"""
+        if self.config.get('scanner', {}).get('filter_engine', 'python') == 'vectorized':
+            return VectorizedFilter()
+        return Filter()
+    
     def _get_current_time(self):
         return datetime.now()
     
@@ -130,78 +222,290 @@ class SurgeScanner:
         전체 스캔 실행
         1. 데이터 최신화
         2. 거래량 급증 필터링
-        3. 오래된 데이터 정리
-        4. 결과 저장
+        3. 결과 저장
+        (오래된 데이터 정리는 별도 잡에서 run_retention으로 실행)
+        
+        config의 profiling.enable이 true면 단계별/(심볼, 시간봉)별 시간을 profile_file에 저장
+        """
+        started = time.perf_counter()
+        try:
+            self._run_profiled(self._run_scan, self.profile_file)
+        finally:
+            metrics.record_scan('full', time.perf_counter() - started, time.time())
+    
+    def _run_profiled(self, func, profile_file):
+        """
+        config의 profiling.enable이 true면 func를 프로파일링하면서 실행하고 profile_file에 저장, 아니면 그냥 실행
         """
+        profiling_config = self.config.get('profiling', {})
+        if not profiling_config.get('enable'):
+            func()
+            return
+        
+        profile = profiler.run_profiled(func, profile_file,
+                                        slowest=profiling_config.get('slowest', 20),
+                                        use_cprofile=profiling_config.get('cprofile', False),
+                                        cprofile_top_count=profiling_config.get('cprofile_top', 30))
+        self.last_profile = profile.to_dict()
+        self.logger.info(f"⏱️ 스캔 프로파일: {profile.summary()} → {profile_file}")
+    
+    def _run_scan(self):
+        """스캔 본문 (scan 참고)"""
         self.logger.info("="*50)
         self.logger.info(f"거래량 급증 스캔 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.logger.info("="*50)
         
         # 다운로더와 필터 생성
-        downloader = ChartDownloader(self.db_config)
-        filter_obj = Filter()  # DB 의존성 제거
+        downloader = self._create_downloader()
+        filter_obj = self._create_filter()  # DB 의존성 제거
         
         # 설정에서 limit 값 가져오기
         symbol_limit = self.config.get('scanner').get('symbol_limit')
         
         # 모든 USDT 심볼 가져오기
-        all_symbols = downloader.get_all_usdt_symbols(limit=symbol_limit)
+        with profiler.phase('symbols'):
+            all_symbols = downloader.get_all_usdt_symbols(limit=symbol_limit)
         self.logger.info(f"총 {len(all_symbols)}개 심볼 확인 중 (설정: {symbol_limit if symbol_limit else '전체'})")
         
         # 확인할 시간봉들 (설정에서 가져오기)
         timeframes = self.config.get('tot_timeframes')
+        rest_timeframes = self._get_rest_timeframes(timeframes, all_symbols)
         
-        # 1단계: 데이터 최신화
-        self._update_data(downloader, all_symbols, timeframes)
+        # 0단계: 24시간 시세로 캔들을 받을 심볼 고르기 (config의 prefilter.enable)
+        scan_symbols = all_symbols
+        if self.prefilter is not None:
+            with profiler.phase('prefilter'):
+                scan_symbols = self._prefilter_symbols(downloader, all_symbols, rest_timeframes)
         
+        # 1단계: 데이터 최신화 (스트림으로 받고 있는 시간봉은 REST 생략)
         # 2단계: 거래량 급증 필터링
-        surge_data = self.apply_filter(filter_obj, all_symbols)
+        if rest_timeframes and self.config.get('pipeline', {}).get('enable'):
+            # 최신화가 끝난 심볼부터 바로 필터링
+            with profiler.phase('pipeline'):
+                surge_data = self._scan_pipelined(downloader, filter_obj, scan_symbols, rest_timeframes)
+        else:
+            if rest_timeframes:
+                with profiler.phase('update_data'):
+                    self._update_data(downloader, scan_symbols, rest_timeframes)
+            else:
+                self.logger.info("📡 모든 시간봉을 스트림으로 수신 중, REST 업데이트 생략")
+            with profiler.phase('filter'):
+                surge_data = self.apply_filter(filter_obj, scan_symbols)
         
-        # 3단계: 오래된 데이터 정리
-        self._cleanup_old_data(downloader)
+        if self.prefilter is not None:
+            report = self.prefilter.finish({item['symbol'] for group in surge_data for item in group['symbols']})
+            if report and report['audit']:
+                self.logger.info(f"🎯 사전 필터 점검 (전체 스캔): 발견 {report['matched']}개 중 놓친 심볼 "
+                                 f"{len(report['missed'])}개 (recall {report['recall'] * 100:.1f}%) {report['missed']}")
         
         # 결과 저장
-        self._save_results(surge_data)
+        with profiler.phase('save_results'):
+            self._save_results(surge_data)
         
         # 연결 종료
         downloader.close()
         
         self.logger.info(f"스캔 완료! 결과가 {self.result_file}에 저장되었습니다")
     
-    def _update_data(self, downloader:ChartDownloader, symbols, timeframes):
+    def scan_filter(self, filter_type):
+        """
+        필터 1개만 실행 (캔들 마감 기준 스케줄, config의 schedule.mode가 "candle_close"일 때)
+        1. 그 필터의 using_timeframe만 최신화
+        2. 그 필터만 실행
+        3. 필터별 최신 결과를 합쳐서 저장
+        
+        여러 필터가 같은 시각에 실행되면 순서대로 처리 (앞 필터가 받은 캔들은 다시 받지 않음)
+        config의 profiling.enable이 true면 scan과 같이 프로파일링 (scan_profile_<필터>.json)
+        """
+        filter_config = next((config for config in self.config.get('filter', []) if config.get('types') == filter_type), None)
+        if filter_config is None:
+            self.logger.warning(f"⚠️ 필터 '{filter_type}' 설정이 없습니다.")
+            return
+        
+        with self.scan_lock:
+            # 필터마다 프로파일 파일 따로 (같은 시각에 실행된 다른 필터가 덮어쓰지 않음)
+            profile_file = os.path.join(os.path.dirname(self.profile_file), f"scan_profile_{filter_type}.json")
+            self._run_profiled(lambda: self._run_scan_filter(filter_type, filter_config), profile_file)
+    
+    def _run_scan_filter(self, filter_type, filter_config):
+        """필터 1개 실행 본문 (scan_filter 참고, scan_lock 안에서 호출)"""
+        started = datetime.now()
+        self.logger.info(f"⏰ 필터 '{filter_type}' 실행 ({', '.join(filter_config['using_timeframe'])})")
+        downloader = self._create_downloader()
+        try:
+            with profiler.phase('symbols'):
+                symbols = downloader.get_all_usdt_symbols(limit=self.config.get('scanner').get('symbol_limit'))
+            
+            # 이 필터가 쓰는 시간봉만 최신화 (스트림으로 받고 있는 시간봉은 생략)
+            rest_timeframes = self._get_rest_timeframes(filter_config['using_timeframe'], symbols)
+            if rest_timeframes:
+                with profiler.phase('update_data'):
+                    self._update_data(downloader, symbols, rest_timeframes)
+            
+            context = FilterContext(self._create_filter(), downloader, self.indicators, self.logger)
+            with profiler.phase('filter'):
+                surge_symbols = self._filter_symbols(context, symbols, {filter_type: filter_config})
+            self._add_market_caps(downloader, surge_symbols)
+        finally:
+            downloader.close()
+        
+        # 필터별 최신 결과 합치기 (심볼 → 설정의 필터 순서)
+        self.filter_results[filter_type] = surge_symbols
+        filter_order = {config.get('types'): i for i, config in enumerate(self.config.get('filter', []))}
+        symbol_order = {symbol: i for i, symbol in enumerate(symbols)}
+        combined = [item for results in self.filter_results.values() for item in results]
+        combined.sort(key=lambda item: (symbol_order.get(item['symbol'], len(symbol_order)), filter_order.get(item['filter'], 0)))
+        with profiler.phase('save_results'):
+            self._save_results(self._group_by_timeframe(combined))
+        
+        info = scheduler_info.setdefault(filter_type, {'start_time': None, 'elapsed_time': timedelta(0), 'trigger': False})
+        info['last_run'] = started
+        metrics.record_scan('filter', (datetime.now() - started).total_seconds(), time.time())
+        self.logger.info(f"✅ 필터 '{filter_type}' 완료: {len(surge_symbols)}개 발견 "
+                         f"({(datetime.now() - started).total_seconds():.1f}초)")
+    
+    def _prefilter_symbols(self, downloader: ChartDownloader, symbols, timeframes):
+        """
+        24시간 시세 1번 조회로 캔들을 받고 필터를 실행할 심볼 고르기
+        (후보 + 지난 스캔에서 걸린 심볼 + 돌아가며 고른 샘플, audit 스캔이면 전체)
+        
+        Returns:
+            스캔할 심볼 리스트
+        """
+        tickers = downloader.get_ticker_24h()
+        keep = {item['symbol'] for group in self.latest_results.get('surge_coins', []) for item in group.get('symbols', [])}
+        selected, audit = self.prefilter.select(symbols, tickers, keep=keep, timeframes=timeframes)
+        if not tickers:
+            self.logger.warning("⚠️ 24시간 시세 조회 실패, 전체 심볼 스캔")
+        elif audit:
+            self.logger.info(f"🎯 사전 필터 점검 스캔: 전체 {len(symbols)}개 심볼 스캔")
+        else:
+            report = self.prefilter.selection
+            self.logger.info(f"🎯 사전 필터: {len(symbols)}개 중 {len(selected)}개 스캔 "
+                             f"(후보 {report['candidates']}개 + 샘플 {report['sample']}개), "
+                             f"weight 약 {report['weight_saved']} 절약")
+        return selected
+    
+    def _update_data(self, downloader:ChartDownloader, symbols, timeframes, on_symbol_done=None):
         """
         모든 심볼의 데이터 최신화
-        배치 처리로 API 제한 방지
+        동시 다운로드 엔진으로 처리하고 weight 제한으로 API 제한 방지
+        
+        Args:
+            on_symbol_done: 심볼의 모든 시간봉 최신화가 끝날 때마다 호출할 콜백 on_symbol_done(symbol) (파이프라인용)
         """
         self.logger.info("데이터 최신화 시작")
-        update_count = 0
         batch_size = self.config.get('scanner', {}).get('batch_size', 10)
-        batch_delay = self.config.get('scanner', {}).get('batch_delay', 1)
         
-        for timeframe in timeframes:
-            self.logger.info(f"{timeframe} 시간봉 업데이트 시작")
-            
-            # 심볼을 배치로 나누기
-            total_batches = (len(symbols) - 1) // batch_size + 1
-            for i in range(0, len(symbols), batch_size):
-                batch = symbols[i:i+batch_size]
-                batch_num = i // batch_size + 1
-                
-                self.logger.info(f"{timeframe} 배치 {batch_num}/{total_batches} 처리 중 ({len(batch)}개 심볼)")
-                
-                for symbol in batch:
-                    try:
-                        downloader.download_and_save(symbol, timeframe, initial_limit=350)
-                        update_count += 1
-                        
-                    except Exception as e:
-                        self.logger.error(f"{symbol} 업데이트 실패: {e}")
-                
-                # 배치 간 딜레이 (API 제한 방지)
-                import time
-                time.sleep(batch_delay)
+        if self._use_resample():
+            # 1분봉만 받고 나머지 시간봉은 리샘플링
+            self.logger.info("1분봉 다운로드 + 상위 시간봉 리샘플링 모드")
+            stats = downloader.download_and_resample(symbols, timeframes, initial_limit=350, progress_every=batch_size * 10,
+                                                     on_symbol_done=on_symbol_done)
+        elif self.eval_markers is not None:
+            # 시간봉 경계가 지난 (심볼, 시간봉)만 다운로드
+            pairs = stale_pairs(downloader.db, symbols, timeframes)
+            self.logger.info(f"⏭️ 새 캔들이 없는 {len(symbols) * len(timeframes) - len(pairs)}개 (심볼, 시간봉) 다운로드 생략")
+            if on_symbol_done is not None:
+                pending = set(symbol for symbol, _ in pairs)
+                for symbol in symbols:
+                    if symbol not in pending:
+                        on_symbol_done(symbol)
+            stats = downloader.download_pairs(pairs, initial_limit=350, progress_every=batch_size * 10,
+                                              on_symbol_done=on_symbol_done)
+        else:
+            stats = downloader.download_many(symbols, timeframes, initial_limit=350, progress_every=batch_size * 10,
+                                             on_symbol_done=on_symbol_done)
+        self.last_fetch_stats = stats
+        
+        self.logger.info(f"데이터 업데이트 완료 (총 {stats.requests - stats.errors}개)")
+        self.logger.info(f"⚡ 다운로드 처리량: {stats.summary()}")
+
+    def start_stream(self):
+        """
+        WebSocket 캔들 스트림 시작 (config의 stream.enable이 true일 때만)
+        
+        config 예시:
+            "stream": {"enable": true, "timeframes": ["5m", "15m"], "flush_interval": 1.0}
+        
+        Returns:
+            KlineStreamIngestor, 비활성화면 None
+        """
+        stream_config = self.config.get('stream', {})
+        if not stream_config.get('enable', False):
+            return None
+        
+        # 스트림 전용 다운로더 (DB 연결을 스캔과 공유하지 않음)
+        self.stream_downloader = self._create_downloader()
+        symbol_limit = self.config.get('scanner').get('symbol_limit')
+        symbols = self.stream_downloader.get_all_usdt_symbols(limit=symbol_limit)
+        timeframes = stream_config.get('timeframes', self.config.get('tot_timeframes'))
+        
+        self.stream = KlineStreamIngestor(
+            self.stream_downloader.db, symbols, timeframes,
+            on_candles=self.on_stream_candles,
+            gap_fill=self._stream_gap_fill,
+            streams_per_connection=stream_config.get('streams_per_connection', 200),
+            flush_interval=stream_config.get('flush_interval', 1.0),
+            flush_size=stream_config.get('flush_size', 500)
+        )
+        self.stream.start()
+        return self.stream
+    
+    def stop_stream(self):
+        """WebSocket 캔들 스트림 종료"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+        if self.stream_downloader is not None:
+            self.stream_downloader.close()
+            self.stream_downloader = None
+    
+    def on_stream_candles(self, symbol, timeframe, klines):
+        """스트림에서 마감된 캔들이 저장되면 호출됨"""
+        self.logger.debug(f"📡 {symbol} ({timeframe}) 캔들 {len(klines)}개 수신")
+        
+        # 리샘플링 모드면 1분봉으로 상위 시간봉도 갱신 (스트림 DB 스레드에서 실행됨)
+        if self._use_resample() and timeframe == BASE_TIMEFRAME:
+            self.stream_downloader.resampler.update(symbol, klines, self.config.get('tot_timeframes'))
+    
+    def _stream_gap_fill(self, pairs):
+        """스트림 재연결 시 끊긴 동안의 캔들을 REST로 채움"""
+        timeframe_symbols = {}
+        for symbol, timeframe in pairs:
+            timeframe_symbols.setdefault(timeframe, []).append(symbol)
+        
+        for timeframe, symbols in timeframe_symbols.items():
+            stats = self.stream_downloader.download_many(symbols, [timeframe], progress_every=0)
+            self.logger.info(f"🔄 {timeframe} 빠진 캔들 채우기 완료: {stats.summary()}")
+    
+    def _get_rest_timeframes(self, timeframes, symbols):
+        """
+        REST로 업데이트해야 할 시간봉 (스트림이 연결되어 있으면 스트림 시간봉 제외)
+        스트림 심볼은 start_stream 때 고정되므로, 그 뒤에 추가된 심볼이 있는 시간봉은 REST로 업데이트
         
-        self.logger.info(f"데이터 업데이트 완료 (총 {update_count}개)")
+        Args:
+            symbols: 이번에 스캔할 심볼 리스트
+        """
+        if self.stream is None or not self.stream.connected:
+            return timeframes
+        streamed = set(self.stream.stream_pairs.values())
+        
+        def covered(timeframe):
+            return all((symbol, timeframe) in streamed for symbol in symbols)
+        
+        if self._use_resample() and covered(BASE_TIMEFRAME):
+            # 1분봉 스트림에서 상위 시간봉까지 리샘플링하고 있음
+            return []
+        rest_timeframes = [timeframe for timeframe in timeframes if not covered(timeframe)]
+        unstreamed = [timeframe for timeframe in rest_timeframes if any(pair[1] == timeframe for pair in streamed)]
+        if unstreamed:
+            self.logger.info(f"📡 스트림에 없는 새 심볼이 있어서 REST로 업데이트: {', '.join(unstreamed)}")
+        return rest_timeframes
+    
+    def _use_resample(self):
+        """scanner.resample_from_1m 설정 여부 (1분봉으로 상위 시간봉을 만듦)"""
+        return self.config.get('scanner', {}).get('resample_from_1m', False)
 
     def _check_filter_scheduling(self, filter_configs):
         """
@@ -274,6 +578,28 @@ class SurgeScanner:
         """
         surge_data = []
         
+        downloader = self._create_downloader()
+        
+        # 필터 스케줄링 확인 + 트리거된 필터들 확인
+        triggered_filters = self._get_triggered_filters()
+        if not triggered_filters:
+            downloader.close()
+            return surge_data
+        
+        context = FilterContext(filter_obj, downloader, self.indicators, self.logger)
+        surge_symbols = self._filter_symbols(context, symbols, triggered_filters)
+        
+        surge_data = self._finish_filters(downloader, triggered_filters, surge_symbols)
+        downloader.close()
+        return surge_data
+    
+    def _get_triggered_filters(self):
+        """
+        필터 스케줄링 확인 후 이번 스캔에서 실행할 필터
+        
+        Returns:
+            {filter_type: filter_config} (없으면 빈 dict)
+        """
         # 설정에서 필터 배열 가져오기
         filter_configs = self.config.get('filter', [])
         
@@ -285,10 +611,6 @@ class SurgeScanner:
         filter_names = [f.get('types', 'unknown') for f in filter_configs]
         self.logger.info(f"🔍 사용 중인 필터: {', '.join(filter_names)}")
         
-        downloader = ChartDownloader(self.db_config)
-            
-        surge_symbols = []
-        
         # 필터 스케줄링 확인
         self._check_filter_scheduling(filter_configs)
         
@@ -302,67 +624,61 @@ class SurgeScanner:
         
         if not triggered_filters:
             self.logger.info("트리거된 필터가 없습니다. 모든 필터가 대기 중입니다.")
-            downloader.close()
-            return surge_data
+        else:
+            self.logger.info(f"트리거된 필터: {', '.join(triggered_filters.keys())}")
+        return triggered_filters
+    
+    def _filter_symbols(self, context, symbols, triggered_filters):
+        """
+        symbols의 캔들을 조회해서 트리거된 필터 실행
+        
+        Returns:
+            [{"symbol", "time", "filter", "timeframe"}, ...] (_run_filters 결과)
+        """
+        # 필터에 필요한 캔들을 시간봉별로 한 번에 조회 (incremental이면 다시 평가할 심볼만)
+        # 워터마크는 한 번만 읽어서 조회 대상 결정과 필터 실행/기록에 같이 사용
+        with profiler.phase('load_candles'):
+            symbols_by_timeframe = None
+            watermarks = None
+            if self.eval_markers is not None:
+                timeframes = {timeframe for filter_config in triggered_filters.values()
+                              for timeframe in filter_config.get('using_timeframe')}
+                watermarks = WatermarkSnapshot(context.downloader.db, symbols, timeframes)
+                symbols_by_timeframe = self._stale_filter_symbols(watermarks, symbols, triggered_filters)
+            candle_sets = self._load_filter_candles(context.downloader, symbols, triggered_filters, symbols_by_timeframe)
         
-        self.logger.info(f"트리거된 필터: {', '.join(triggered_filters.keys())}")
+        # 등록된 필터 플러그인마다 시간봉별로 실행 (모든 필터가 같은 캔들 버퍼를 사용)
+        if self.filter_pool is not None:
+            # 캔들을 공유 메모리에 한 번 올리고 심볼을 작업 프로세스에 나눠서 실행
+            with self.filter_pool.share(candle_sets) as shared:
+                return self._run_filters(context, symbols, triggered_filters, candle_sets, shared, watermarks)
+        return self._run_filters(context, symbols, triggered_filters, candle_sets, watermarks=watermarks)
+    
+    def _stale_filter_symbols(self, watermarks, symbols, triggered_filters):
+        """
+        시간봉별로 다시 평가해야 하는 심볼 (그 시간봉을 쓰는 필터 중 하나라도 새 캔들이 있으면 포함)
         
-        # 각 심볼별로 데이터를 가져와서 필터에 주입
-        for symbol in symbols:
-            try:
-                # 트리거된 필터들만 실행
-                for filter_type, filter_config in triggered_filters.items():
-                    
-                    if filter_type == '3step_surge':
-                        # 해당 필터 설정 값들 가져오기
-                        filter_timeframes:list = filter_config.get('using_timeframe')
-                        volume_range_multiplier = filter_config.get('volume_range_multiplier')
-                        period = filter_config.get('period')
-                        window = filter_config.get('window')
-                        range_multiplier = filter_config.get('range_multiplier')
-                        strong_candle_count = filter_config.get('strong_candle_count', 0)
-                        upper_wick_ratio = filter_config.get('upper_wick_ratio', 0.2)
-                        lower_wick_ratio = filter_config.get('lower_wick_ratio', 0.1)
-
-                        for timeframe in filter_timeframes:
-                            candles = downloader.db.get_candles(symbol, timeframe, limit=window + period + 1)
-                            pattern_time = filter_obj._three_step_surge_filter(
-                                candles, symbol, volume_range_multiplier, period, window, range_multiplier,
-                                strong_candle_count=strong_candle_count,
-                                upper_wick_ratio=upper_wick_ratio,
-                                lower_wick_ratio=lower_wick_ratio
-                            )
-                            if pattern_time:
-                                surge_symbols.append({
-                                    "symbol": symbol, 
-                                    "time": pattern_time, 
-                                    "filter": filter_type,
-                                    "timeframe": timeframe
-                                })
-                                break  # 하나의 필터에 걸리면 다음 심볼로
-                    
-                    elif filter_type == 'high_volume_spike':
-                        # 해당 필터 설정 값들 가져오기
-                        filter_timeframes:list = filter_config.get('using_timeframe')
-                        period = filter_config.get('period')
-                        window = filter_config.get('window')
-                        volume_range_multiplier = filter_config.get('volume_range_multiplier')
-                        spike_threshold = filter_config.get('spike_threshold')
-                        
-                        for timeframe in filter_timeframes:
-                            candles = downloader.db.get_candles(symbol, timeframe, limit=window + period + 1)
-                            pattern_time = filter_obj._high_volume_spike_filter(candles, symbol, downloader=downloader, timeframe=timeframe, period=period, window=window, volume_range_multiplier=volume_range_multiplier, spike_threshold=spike_threshold)
-                            if pattern_time:
-                                surge_symbols.append({
-                                    "symbol": symbol, 
-                                    "time": pattern_time, 
-                                    "filter": filter_type,
-                                    "timeframe": timeframe
-                                })
-                                break  # 하나의 필터에 걸리면 다음 심볼로
-            
-            except Exception as e:
-                self.logger.warning(f"⚠️ {symbol} 확인 중 오류: {e}")
+        Args:
+            watermarks: WatermarkSnapshot (_run_filters와 같은 것)
+        
+        Returns:
+            {timeframe: [symbol, ...]} (symbols 순서)
+        """
+        stale = {}
+        for filter_type, filter_config in triggered_filters.items():
+            for timeframe in filter_config.get('using_timeframe'):
+                found = set(self.eval_markers.peek(watermarks, symbols, timeframe, filter_type))
+                stale[timeframe] = stale.get(timeframe, set()) | found
+        return {timeframe: [symbol for symbol in symbols if symbol in found] for timeframe, found in stale.items()}
+    
+    def _finish_filters(self, downloader: ChartDownloader, triggered_filters, surge_symbols):
+        """
+        필터 실행 완료 처리 (trigger 해제, 시가총액 추가, 시간봉별 그룹화)
+        
+        Returns:
+            surge_data: [{"timeframe", "count", "symbols"}, ...]
+        """
+        surge_data = []
         
         # 필터 실행 완료 후 trigger를 False로 설정
         for filter_type in triggered_filters.keys():
@@ -374,46 +690,284 @@ class SurgeScanner:
             
             # 시가총액 정보 추가
             self.logger.info(f"💰 시가총액 정보 가져오는 중...")
+            self._add_market_caps(downloader, surge_symbols)
+            
+            surge_data = self._group_by_timeframe(surge_symbols)
+        
+        return surge_data
+    
+    def _add_market_caps(self, downloader: ChartDownloader, surge_symbols):
+        """발견된 심볼마다 시가총액 정보 추가 (조회 실패 시 None)"""
+        with profiler.phase('market_cap'):
             for symbol_info in surge_symbols:
+                started = time.perf_counter()
                 try:
                     market_cap = downloader.get_market_cap(symbol_info['symbol'])
                     symbol_info['market_cap'] = market_cap
                 except Exception as e:
                     self.logger.warning(f"⚠️ {symbol_info['symbol']} 시가총액 조회 실패: {e}")
                     symbol_info['market_cap'] = None
-            
-            # timeframe별로 그룹화
-            timeframe_groups = {}
-            for symbol_info in surge_symbols:
-                tf = symbol_info['timeframe']
-                if tf not in timeframe_groups:
-                    timeframe_groups[tf] = []
-                timeframe_groups[tf].append(symbol_info)
-            
-            # surge_data 생성
-            for tf, symbols_list in timeframe_groups.items():
-                surge_data.append({
-                    "timeframe": tf,
-                    "count": len(symbols_list),
-                    "symbols": symbols_list
-                })
-                self.logger.info(f"🔥 {tf}: {len(symbols_list)}개 발견")
+                profiler.observe('market_cap', time.perf_counter() - started, symbol_info['symbol'], symbol_info['timeframe'])
+    
+    def _group_by_timeframe(self, surge_symbols):
+        """
+        발견된 심볼을 시간봉별로 그룹화
+        
+        Returns:
+            surge_data: [{"timeframe", "count", "symbols"}, ...]
+        """
+        surge_data = []
+        
+        # timeframe별로 그룹화
+        timeframe_groups = {}
+        for symbol_info in surge_symbols:
+            tf = symbol_info['timeframe']
+            if tf not in timeframe_groups:
+                timeframe_groups[tf] = []
+            timeframe_groups[tf].append(symbol_info)
+        
+        # surge_data 생성
+        for tf, symbols_list in timeframe_groups.items():
+            surge_data.append({
+                "timeframe": tf,
+                "count": len(symbols_list),
+                "symbols": symbols_list
+            })
+            self.logger.info(f"🔥 {tf}: {len(symbols_list)}개 발견")
         
-        downloader.close()
         return surge_data
     
-    def _cleanup_old_data(self, downloader: ChartDownloader):
+    def _scan_pipelined(self, downloader: ChartDownloader, filter_obj, symbols, rest_timeframes):
+        """
+        데이터 최신화와 필터링을 겹쳐서 실행 (config의 pipeline.enable)
+        
+        다운로드는 별도 스레드에서 실행하고, 심볼의 모든 시간봉이 최신화되면 바로 필터링
+        발견된 심볼은 바로 로그로 출력, 최종 결과는 순차 스캔과 같은 순서 (심볼 → 필터)
+        
+        Returns:
+            surge_data (apply_filter와 같은 구조)
         """
-        오래된 데이터 정리
-        각 심볼/시간봉당 최신 N개만 유지
+        triggered_filters = self._get_triggered_filters()
+        if not triggered_filters:
+            self._update_data(downloader, symbols, rest_timeframes)
+            return []
+        
+        # 필터 쪽은 별도 DB 연결 (다운로드 스레드와 연결을 공유하지 않음)
+        filter_downloader = self._create_downloader()
+        context = FilterContext(filter_obj, filter_downloader, self.indicators, self.logger)
+        surge_symbols = []
+        
+        def consume(batch):
+            found = self._filter_symbols(context, batch, triggered_filters)
+            for item in found:
+                self.logger.info(f"🔥 {item['symbol']}: {item['filter']} ({item['timeframe']}) [{item['time']}]")
+            surge_symbols.extend(found)
+        
+        pipeline_config = self.config.get('pipeline', {})
+        pipeline = ScanPipeline(batch_size=pipeline_config.get('batch_size', 50),
+                                queue_size=pipeline_config.get('queue_size', 1000))
+        try:
+            stats = pipeline.run(
+                lambda on_ready: self._update_data(downloader, symbols, rest_timeframes, on_symbol_done=on_ready),
+                consume)
+            self.last_pipeline_stats = stats
+            self.logger.info(f"⏱️ 파이프라인: 다운로드 {stats['fetch_sec']}초, 필터 {stats['filter_sec']}초 "
+                             f"({stats['batches']}묶음) → 전체 {stats['wall_sec']}초")
+            
+            # 순차 스캔과 같은 순서 (심볼 순, 같은 심볼은 필터 순)
+            order = {symbol: i for i, symbol in enumerate(symbols)}
+            surge_symbols.sort(key=lambda item: order[item['symbol']])
+            return self._finish_filters(filter_downloader, triggered_filters, surge_symbols)
+        finally:
+            filter_downloader.close()
+    
+    def _run_filters(self, context, symbols, triggered_filters, candle_sets, shared=None, watermarks=None):
+        """
+        트리거된 필터 플러그인 실행
+        
+        필터마다 using_timeframe 순서대로, 앞 시간봉에서 이미 걸린 심볼은 다음 시간봉에서 검사하지 않음
+        shared(SharedCandleSets)가 있으면 프로세스 풀에서 실행
+        watermarks(WatermarkSnapshot)는 incremental일 때 캔들을 조회할 때 쓴 워터마크
+        
+        Returns:
+            [{"symbol", "time", "filter", "timeframe"}, ...] (심볼 → 필터 → 처음 걸린 시간봉 순서)
+        """
+        if self.eval_markers is not None and watermarks is None:
+            watermarks = context.downloader.db
+        
+        # {filter_type: {timeframe: {symbol: pattern_time}}}
+        matches = {}
+        for filter_type, filter_config in triggered_filters.items():
+            plugin = get_filter_plugin(filter_type)
+            params = plugin.params(filter_config)
+            matches[filter_type] = {}
+            remaining = list(symbols)
+            for timeframe in params['using_timeframe']:
+                if not remaining:
+                    break
+                # incremental이면 마지막 평가 이후 새 캔들이 없는 심볼은 이전 결과 사용
+                evaluate, carried = remaining, {}
+                if self.eval_markers is not None:
+                    evaluate, carried = self.eval_markers.split(watermarks, remaining, timeframe, filter_type)
+                started = time.perf_counter()
+                try:
+                    found = {}
+                    if evaluate and shared is not None:
+                        found = self.filter_pool.run(context, plugin, shared, timeframe, evaluate, params)
+                    elif evaluate:
+                        found = plugin.run(context, candle_sets[timeframe], evaluate, timeframe, params)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ {filter_type} ({timeframe}) 필터링 중 오류: {e}")
+                    continue
+                if self.eval_markers is not None:
+                    self.eval_markers.record(watermarks, evaluate, timeframe, filter_type, found)
+                if evaluate:
+                    profiler.observe('filter', time.perf_counter() - started)
+                profiler.count(f"filter_evaluations:{filter_type}", len(evaluate))
+                profiler.count(f"filter_matches:{filter_type}", len(found))
+                matches[filter_type][timeframe] = {**{symbol: t for symbol, t in carried.items() if t}, **found}
+                self.logger.info(f"⚡ {filter_type} ({timeframe}): {len(evaluate)}개 심볼 필터링 "
+                                 f"{(time.perf_counter() - started) * 1000:.1f}ms"
+                                 + (f" (이전 결과 사용 {len(carried)}개)" if carried else ""))
+                remaining = [symbol for symbol in remaining if symbol not in matches[filter_type][timeframe]]
+        
+        surge_symbols = []
+        for symbol in symbols:
+            for filter_type, filter_config in triggered_filters.items():
+                for timeframe in filter_config.get('using_timeframe'):
+                    pattern_time = matches[filter_type].get(timeframe, {}).get(symbol)
+                    if pattern_time:
+                        surge_symbols.append({
+                            "symbol": symbol, 
+                            "time": pattern_time, 
+                            "filter": filter_type,
+                            "timeframe": timeframe
+                        })
+                        break
+        return surge_symbols
+    
+    def _load_filter_candles(self, downloader: ChartDownloader, symbols, triggered_filters, symbols_by_timeframe=None):
+        """
+        트리거된 필터들이 사용할 캔들을 시간봉별로 한 번에 조회
+        같은 시간봉을 여러 필터가 쓰면 가장 긴 lookback(필터 플러그인이 선언)으로 한 번만 조회
+        
+        캐시를 쓰면 캐시에 없는 심볼만 DB에서 읽음
+        
+        Args:
+            symbols_by_timeframe: 시간봉별로 조회할 심볼 {timeframe: [symbol, ...]} (없으면 모든 시간봉에서 symbols)
+        
+        Returns:
+            {timeframe: {symbol: CandleFrame}}
+        """
+        limits = {}
+        for filter_type, filter_config in triggered_filters.items():
+            plugin = get_filter_plugin(filter_type)
+            limit = plugin.lookback(plugin.params(filter_config))
+            for timeframe in filter_config.get('using_timeframe'):
+                limits[timeframe] = max(limits.get(timeframe, 0), limit)
+        
+        candle_sets = {}
+        for timeframe, limit in limits.items():
+            timeframe_symbols = symbols if symbols_by_timeframe is None else symbols_by_timeframe.get(timeframe, [])
+            if not timeframe_symbols:
+                candle_sets[timeframe] = {}
+                continue
+            # 캐시 용량보다 긴 조회는 DB에서 직접 읽음
+            if self.candle_cache is not None and limit < self.candle_cache.capacity:
+                candle_sets[timeframe] = self.candle_cache.get_many(downloader.db, timeframe_symbols, timeframe, limit)
+                continue
+            if self.candle_store is not None and self.candle_cache is None:
+                candle_sets[timeframe] = self.candle_store.get_many(timeframe_symbols, timeframe, limit, db=downloader.db)
+                continue
+            candle_sets[timeframe] = downloader.db.get_candle_frames_bulk(timeframe_symbols, timeframe, limit=limit)
+            self.logger.info(f"📊 {timeframe} 캔들 일괄 조회: {len(timeframe_symbols)}개 심볼 x 최대 {limit}개")
+        
+        if self.candle_cache is not None:
+            stats = self.candle_cache.stats()
+            self.logger.info(f"📊 캔들 캐시: hit {stats['hits']}, miss {stats['misses']} "
+                             f"(hit율 {stats['hit_ratio'] * 100:.1f}%), {stats['entries']}개, {stats['memory_mb']}MB")
+        return candle_sets
+    
+    def warm_up(self):
+        """
+        서버 시작 시 메모리 맵 저장소 열기 + 캔들 캐시 채우기 + 지표 상태 만들기
+        """
+        db = create_candle_database(self.db_config, self.config.get('storage'))
+        try:
+            db.load_watermarks()
+            if self.candle_store is not None:
+                self.open_candle_store(db)
+            if self.candle_cache is not None:
+                self.warm_cache(db)
+        finally:
+            db.close()
+        
+        if self.indicators is not None and self.candle_store is not None:
+            started = time.time()
+            built = self.indicators.rebuild_from_store(self.candle_store)
+            self.logger.info(f"✅ 지표 상태 {built}개 다시 만들기 ({time.time() - started:.2f}초)")
+    
+    def open_candle_store(self, db):
+        """
+        메모리 맵 파일을 열고 (데이터를 읽지 않음) DB에만 있는 최신 구간만 추가
+        """
+        started = time.time()
+        index = self.candle_store.open_all()
+        opened_sec = time.time() - started
+        
+        added = self.candle_store.catch_up(db)
+        stats = self.candle_store.stats()
+        self.logger.info(f"✅ 캔들 파일 {len(index)}개 열기 {opened_sec * 1000:.1f}ms, "
+                         f"빠진 구간 {added}개 추가 (총 {stats['rows']}개, {stats['disk_mb']}MB)")
+    
+    def warm_cache(self, db):
+        """
+        캔들 캐시 미리 채우기
+        메모리 맵 저장소가 있으면 파일에서, 없으면 DB에서 필터가 쓰는 시간봉마다 쿼리 1번
+        """
+        timeframes = {tf for filter_config in self.config.get('filter', []) for tf in filter_config.get('using_timeframe', [])}
+        
+        started = time.time()
+        if self.candle_store is not None:
+            self.candle_store.load_into(self.candle_cache, timeframes)
+        else:
+            symbols = sorted({symbol for symbol, timeframe in db.watermarks.pairs() if timeframe in timeframes})
+            self.candle_cache.warm(db, symbols, sorted(timeframes))
+        stats = self.candle_cache.stats()
+        self.logger.info(f"✅ 캔들 캐시 준비 완료: {stats['entries']}개 (심볼, 시간봉), "
+                         f"{stats['memory_mb']}MB, {time.time() - started:.2f}초")
+    
+    def run_retention(self, should_yield=None):
+        """
+        오래된 데이터 정리 (스캔과 별도의 낮은 우선순위 잡)
+        시간봉별로 최신 keep_candles개 분량 이전의 캔들을 chunk 단위로 삭제
+        
+        Args:
+            should_yield: True를 반환하는 동안 chunk 사이에서 대기 (예: 스캔 실행 중)
+        
+        Returns:
+            RetentionReport
         """
         self.logger.info(f"\n🗑️ 오래된 데이터 정리 중...")
         keep_count = self.config.get('scanner', {}).get('keep_candles', 10000)
-        deleted = downloader.db.cleanup_all_old_data(keep_count=keep_count)
-        if deleted > 0:
-            self.logger.info(f"✅ {deleted}개 오래된 캔들 삭제 완료")
-        else:
-            self.logger.info(f"✅ 정리할 데이터 없음")
+        retention_config = self.config.get('retention', {})
+        
+        db = create_candle_database(self.db_config, self.config.get('storage'))
+        try:
+            engine = RetentionEngine(
+                db,
+                keep_count=keep_count,
+                chunk_size=retention_config.get('chunk_size', 5000),
+                chunk_pause=retention_config.get('chunk_pause', 0.05),
+                partition_days_ahead=retention_config.get('partition_days_ahead', 3),
+                should_yield=should_yield
+            )
+            report = engine.run()
+        finally:
+            db.close()
+        self.last_retention_report = report.to_dict()
+        self.logger.info(f"✅ {report.summary()}")
+        return report
     
     def _save_results(self, surge_data):
         """
@@ -0,0 +1,220 @@
+"""
+SQLite 캔들 저장소 (MySQL 서버 없이 사용하는 내장 DB)
+
+CandleDatabase와 같은 메서드를 제공하므로 다운로더/스캐너/필터를 그대로 사용 가능
+- WAL 모드: 쓰는 중에도 다른 스레드가 읽을 수 있음
+- 연결은 스레드마다 1개씩 (threading.local)
+- open_time/close_time은 밀리초 정수로 저장하고 읽을 때 datetime으로 변환 (MySQL과 같은 형식으로 반환)
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from core import profiler
+from core.database import CandleDatabase
+from core.resampler import ms_to_datetime, datetime_to_ms
+from core.watermark import get_watermark_index
+
+
+# 밀리초 정수 시간 컬럼 타입 (PARSE_DECLTYPES로 읽을 때 datetime으로 변환)
+MS_TIME_TYPE = "MSTIME"
+
+CREATE_CANDLES_TABLE = f"""
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    open_time {MS_TIME_TYPE} NOT NULL,
+    open_price REAL NOT NULL,
+    high_price REAL NOT NULL,
+    low_price REAL NOT NULL,
+    close_price REAL NOT NULL,
+    volume REAL NOT NULL,
+    close_time {MS_TIME_TYPE} NOT NULL,
+    quote_volume REAL,
+    PRIMARY KEY (symbol, timeframe, open_time)
+)
+"""
+
+CREATE_TIMEFRAME_INDEX = "CREATE INDEX IF NOT EXISTS idx_timeframe_open_time ON candles(timeframe, open_time)"
+
+SQLITE_INSERT_ROW_PLACEHOLDER = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+SQLITE_INSERT_CANDLES_QUERY = """
+INSERT INTO candles
+(symbol, timeframe, open_time, open_price, high_price, low_price, close_price,
+ volume, close_time, quote_volume)
+VALUES {values}
+ON CONFLICT(symbol, timeframe, open_time) DO UPDATE SET
+    open_price = excluded.open_price,
+    high_price = excluded.high_price,
+    low_price = excluded.low_price,
+    close_price = excluded.close_price,
+    volume = excluded.volume,
+    close_time = excluded.close_time,
+    quote_volume = excluded.quote_volume
+"""
+
+# SQLite 기본 빌드는 DELETE ... LIMIT을 지원하지 않아서 rowid로 범위를 잡음
+SQLITE_DELETE_BEFORE_QUERY = """
+DELETE FROM candles
+WHERE rowid IN (
+    SELECT rowid FROM candles
+    WHERE timeframe = ? AND open_time < ?
+    LIMIT ?
+)
+"""
+
+sqlite3.register_converter(MS_TIME_TYPE, lambda value: ms_to_datetime(int(value)))
+
+
+class SQLiteCandleDatabase(CandleDatabase):
+    """
+    SQLite 파일에 캔들 데이터를 저장하고 조회하는 클래스
+
+    조회 쿼리는 CandleDatabase의 것을 그대로 쓰고 (%s → ?만 변환)
+    문법이 다른 upsert/삭제/파티션 관련 메서드만 다시 구현
+    """
+
+    insert_row_placeholder = SQLITE_INSERT_ROW_PLACEHOLDER
+    insert_query_template = SQLITE_INSERT_CANDLES_QUERY
+
+    def __init__(self, path='data/candles.db', batch_size=1000, busy_timeout=30.0):
+        """
+        DB 파일 열기 (없으면 테이블까지 생성)
+
+        Args:
+            path: SQLite 파일 경로 (기본값: data/candles.db)
+            batch_size: save_candles에서 INSERT 1번에 넣을 최대 행 개수 (기본값: 1000)
+            busy_timeout: 다른 연결이 쓰는 중일 때 기다릴 최대 시간 (초)
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.busy_timeout = busy_timeout
+        self._insert_queries = {}
+        self._queries = {}
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.checkout() as (connection, cursor):
+            cursor.execute(CREATE_CANDLES_TABLE)
+            cursor.execute(CREATE_TIMEFRAME_INDEX)
+            connection.commit()
+
+        self.watermarks = get_watermark_index(('sqlite', os.path.abspath(path)))
+        self.save_listeners = []
+
+    def _connect(self):
+        """
+        현재 스레드용 연결 반환 (없으면 생성)
+        쿼리는 만든 스레드에서만 하지만, close가 다른 스레드(다운로드/스트림 스레드)의 연결도 닫을 수 있도록 check_same_thread=False
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                         detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def checkout(self):
+        """
+        현재 스레드의 연결로 (connection, cursor) 사용 (CandleDatabase.checkout과 같은 사용법)
+        """
+        started = time.perf_counter()
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            yield connection, cursor
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            profiler.count('db_queries')
+            profiler.observe('db_query', time.perf_counter() - started)
+
+    def _sql(self, query):
+        """MySQL 형식 placeholder(%s)를 SQLite 형식(?)으로 변환 (캐시)"""
+        converted = self._queries.get(query)
+        if converted is None:
+            converted = query.replace('%s', '?')
+            self._queries[query] = converted
+        return converted
+
+    def _fetchall(self, query, params=None):
+        with self.checkout() as (connection, cursor):
+            cursor.execute(self._sql(query), self._params(params))
+            return cursor.fetchall()
+
+    def _fetchone(self, query, params=None):
+        with self.checkout() as (connection, cursor):
+            cursor.execute(self._sql(query), self._params(params))
+            return cursor.fetchone()
+
+    def _execute(self, query, params=None):
+        with self.checkout() as (connection, cursor):
+            cursor.execute(self._sql(query), self._params(params))
+            connection.commit()
+            return cursor.rowcount
+
+    @staticmethod
+    def _params(params):
+        """datetime 파라미터를 저장 형식(밀리초 정수)으로 변환"""
+        if not params:
+            return ()
+        return [datetime_to_ms(value) if isinstance(value, datetime) else value for value in params]
+
+    @staticmethod
+    def _klines_to_rows(symbol, timeframe, klines):
+        """
+        바이낸스 캔들 데이터를 INSERT 파라미터로 변환 (시간은 밀리초 정수 그대로)
+        """
+        return [
+            (symbol, timeframe, int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]),
+             float(k[5]), int(k[6]), float(k[7]))
+            for k in klines
+        ]
+
+    def delete_candles_before(self, timeframe, cutoff, limit=5000):
+        return self._execute(SQLITE_DELETE_BEFORE_QUERY, (timeframe, cutoff, limit))
+
+    def get_partitions(self):
+        """SQLite는 파티션이 없음"""
+        return []
+
+    def drop_partitions(self, names):
+        """SQLite는 파티션이 없음 (get_partitions가 []라서 지울 파티션도 없음, 아무것도 하지 않음)"""
+        return None
+
+    def split_max_partition(self, max_partition, bounds):
+        """
+        SQLite는 파티션이 없음 (아무것도 하지 않음)
+
+        Returns:
+            [] (만든 파티션 없음)
+        """
+        return []
+
+    def truncate(self):
+        """모든 캔들 데이터 삭제"""
+        self._execute("DELETE FROM candles")
+        self.watermarks.reset()
+
+    def close(self):
+        """이 객체가 연 모든 연결 종료 (다른 스레드에서 만든 연결 포함, 남아 있으면 WAL checkpoint가 막힘)"""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,47 @@
+"""
+캔들 저장소 선택
+
+config.json의 storage 설정으로 MySQL / SQLite 저장소 중 하나를 생성
+    "storage": {"backend": "sqlite", "path": "data/candles.db"}
+    "storage": {"backend": "mysql", "schema": "compact"}  (압축 스키마, core/compact_database.py)
+설정이 없으면 기존처럼 MySQL (db_config 사용)
+"""
+from core.database import CandleDatabase
+from core.sqlite_database import SQLiteCandleDatabase
+from core.compact_database import CompactCandleDatabase
+
+
+STORAGE_BACKENDS = ('mysql', 'sqlite')
+MYSQL_SCHEMAS = ('candles', 'compact')
+DEFAULT_SQLITE_PATH = 'data/candles.db'
+
+
+def create_candle_database(db_config=None, storage_config=None):
+    """
+    설정에 맞는 캔들 저장소 생성
+
+    Args:
+        db_config: MySQL 접속 정보 (host, user, password, database, pool_size 등)
+        storage_config: config.json의 storage 설정 (backend, schema, path, batch_size)
+
+    Returns:
+        CandleDatabase, CompactCandleDatabase 또는 SQLiteCandleDatabase
+    """
+    storage_config = storage_config or {}
+    backend = storage_config.get('backend', 'mysql')
+
+    if backend == 'mysql':
+        schema = storage_config.get('schema', 'candles')
+        if schema == 'compact':
+            return CompactCandleDatabase(**(db_config or {}))
+        if schema == 'candles':
+            return CandleDatabase(**(db_config or {}))
+        raise ValueError(f"지원하지 않는 MySQL 스키마: {schema} (사용 가능: {', '.join(MYSQL_SCHEMAS)})")
+
+    if backend == 'sqlite':
+        return SQLiteCandleDatabase(
+            path=storage_config.get('path', DEFAULT_SQLITE_PATH),
+            batch_size=storage_config.get('batch_size', 1000)
+        )
+
+    raise ValueError(f"지원하지 않는 저장소: {backend} (사용 가능: {', '.join(STORAGE_BACKENDS)})")
@@ -0,0 +1,270 @@
+"""
+바이낸스 선물 WebSocket 캔들 스트림 수집
+
+<symbol>@kline_<timeframe> combined stream을 구독해서
+마감된 캔들(x=true)만 모아 두었다가 일정 주기(micro-batch)로 DB에 저장
+연결이 끊기면 자동으로 재연결하고, 끊긴 동안 빠진 캔들은 REST로 채움
+(처음 연결할 때도 서버가 꺼져 있던 동안 빠진 캔들을 먼저 채움 → 채우기가 끝난 뒤에 connected)
+"""
+import asyncio
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+
+# 바이낸스 선물 WebSocket 주소
+FUTURES_STREAM_URL = 'wss://fstream.binance.com'
+
+
+def kline_stream_name(symbol, timeframe):
+    """구독할 스트림 이름 (예: 'btcusdt@kline_5m')"""
+    return f"{symbol.lower()}@kline_{timeframe}"
+
+
+def kline_event_to_row(kline):
+    """
+    스트림의 kline 이벤트를 REST futures_klines와 같은 형식으로 변환
+
+    Returns:
+        [open_time, open, high, low, close, volume, close_time, quote_volume]
+    """
+    return [kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'], kline['T'], kline['q']]
+
+
+class KlineStreamIngestor:
+    """
+    WebSocket 캔들 수집기
+
+    - 별도 스레드에서 asyncio 이벤트 루프 실행
+    - 심볼 x 시간봉 스트림을 streams_per_connection개씩 나눠서 연결
+    - 마감된 캔들은 flush_interval초마다 또는 flush_size개가 모이면 DB에 저장
+    - 저장 후 on_candles(symbol, timeframe, klines) 호출 (스캐너 알림용)
+    - 재연결 시 gap_fill([(symbol, timeframe), ...]) 호출 (REST로 빠진 캔들 채우기)
+    """
+
+    def __init__(self, db, symbols, timeframes, on_candles=None, gap_fill=None,
+                 base_url=FUTURES_STREAM_URL, streams_per_connection=200,
+                 flush_interval=1.0, flush_size=500, reconnect_delay=1.0, max_reconnect_delay=60.0):
+        """
+        Args:
+            db: save_candles(symbol, timeframe, klines)를 가진 DB 객체 (CandleDatabase)
+            symbols: 구독할 심볼 리스트
+            timeframes: 구독할 시간봉 리스트
+            on_candles: 캔들 저장 후 호출할 콜백 (없으면 생략)
+            gap_fill: 재연결 시 호출할 콜백 (없으면 생략)
+            base_url: WebSocket 서버 주소
+            streams_per_connection: 연결 1개당 구독할 스트림 수
+            flush_interval: DB 저장 주기 (초)
+            flush_size: 이만큼 쌓이면 주기와 상관없이 저장
+            reconnect_delay: 첫 재연결 대기 시간 (초), 실패할 때마다 2배씩 증가
+            max_reconnect_delay: 재연결 대기 시간 최댓값 (초)
+        """
+        self.db = db
+        self.on_candles = on_candles
+        self.gap_fill = gap_fill
+        self.base_url = base_url.rstrip('/')
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        # 스트림 이름 → (심볼, 시간봉)
+        self.stream_pairs = {}
+        for timeframe in timeframes:
+            for symbol in symbols:
+                self.stream_pairs[kline_stream_name(symbol, timeframe)] = (symbol, timeframe)
+
+        stream_names = list(self.stream_pairs.keys())
+        self.stream_chunks = [
+            stream_names[i:i + streams_per_connection]
+            for i in range(0, len(stream_names), streams_per_connection)
+        ]
+
+        # 저장 대기 중인 마감 캔들 {(symbol, timeframe): {open_time: row}}
+        self._pending = {}
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+
+        # DB 작업(저장, gap fill)은 이 스레드 하나에서만 실행 (DB 연결 공유 방지)
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kline-stream-db')
+
+        self._loop = None
+        self._main_task = None
+        self._thread = None
+        self._connected = set()
+
+        # 통계
+        self.messages = 0
+        self.closed_candles = 0
+        self.saved_candles = 0
+        self.reconnects = 0
+
+        self.logger = logging.getLogger('KlineStreamIngestor')
+
+    @property
+    def connected(self):
+        """모든 연결이 살아있는지 여부"""
+        return len(self._connected) == len(self.stream_chunks)
+
+    def start(self):
+        """백그라운드 스레드에서 수집 시작"""
+        self._thread = threading.Thread(target=self._run_loop, name='kline-stream', daemon=True)
+        self._thread.start()
+        self.logger.info(f"📡 캔들 스트림 시작: {len(self.stream_pairs)}개 스트림, {len(self.stream_chunks)}개 연결")
+
+    def stop(self, timeout=5.0):
+        """수집 중지 (남은 캔들은 저장)"""
+        if self._loop is not None and self._main_task is not None:
+            self._loop.call_soon_threadsafe(self._main_task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._db_executor.submit(self.flush).result()
+        self._db_executor.shutdown()
+        self.logger.info(f"📡 캔들 스트림 종료 (저장: {self.saved_candles}개, 재연결: {self.reconnects}회)")
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._main_task = self._loop.create_task(self.run())
+        try:
+            self._loop.run_until_complete(self._main_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def run(self):
+        """모든 연결 + 주기적 저장 태스크 실행"""
+        tasks = [asyncio.create_task(self._run_connection(index, chunk))
+                 for index, chunk in enumerate(self.stream_chunks)]
+        tasks.append(asyncio.create_task(self._flush_loop()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_connection(self, index, streams):
+        """연결 1개 유지 (끊기면 지수 백오프로 재연결)"""
+        url = f"{self.base_url}/stream?streams={'/'.join(streams)}"
+        delay = self.reconnect_delay
+        first_connect = True
+
+        while True:
+            try:
+                async with connect(url, max_size=None) as websocket:
+                    delay = self.reconnect_delay
+
+                    # 처음 연결(재시작 전 꺼져 있던 동안)과 재연결 모두 빠진 캔들부터 채움
+                    if first_connect:
+                        self.logger.info(f"📡 스트림 연결 {index} 시작, 빠진 캔들 채우는 중...")
+                    else:
+                        self.reconnects += 1
+                        self.logger.info(f"🔄 스트림 연결 {index} 재연결, 빠진 캔들 채우는 중...")
+                    await self._run_gap_fill(streams)
+                    first_connect = False
+                    # 채우기가 끝난 뒤에야 스캔이 이 시간봉의 REST 업데이트를 생략함
+                    self._connected.add(index)
+
+                    async for message in websocket:
+                        if self._handle_message(message):
+                            await self._flush_async()
+
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"⚠️ 스트림 연결 {index} 끊김: {e}")
+            except Exception as e:
+                self.logger.error(f"❌ 스트림 연결 {index} 오류: {e}")
+            finally:
+                self._connected.discard(index)
+
+            # 재연결 대기 (지수 백오프)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _handle_message(self, message):
+        """
+        스트림 메시지 1개 처리 (마감된 캔들만 저장 대기열에 추가)
+
+        Returns:
+            True: flush_size에 도달해서 바로 저장이 필요함
+        """
+        self.messages += 1
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return False
+
+        data = payload.get('data', payload)
+        if data.get('e') != 'kline':
+            return False
+
+        kline = data['k']
+        if not kline.get('x'):
+            return False  # 아직 마감되지 않은 캔들
+
+        pair = self.stream_pairs.get(payload.get('stream'))
+        if pair is None:
+            pair = (kline['s'], kline['i'])
+
+        with self._pending_lock:
+            rows = self._pending.setdefault(pair, {})
+            if kline['t'] not in rows:
+                self._pending_count += 1
+            rows[kline['t']] = kline_event_to_row(kline)
+            self.closed_candles += 1
+            return self._pending_count >= self.flush_size
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush_async()
+
+    async def _flush_async(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._db_executor, self.flush)
+
+    async def _run_gap_fill(self, streams):
+        if self.gap_fill is None:
+            return
+        pairs = [self.stream_pairs[name] for name in streams]
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._db_executor, self.gap_fill, pairs)
+        except Exception as e:
+            self.logger.error(f"❌ 빠진 캔들 채우기 실패: {e}")
+
+    def flush(self):
+        """
+        저장 대기 중인 캔들을 (심볼, 시간봉)별로 한 번에 저장
+
+        Returns:
+            저장된 캔들 개수
+        """
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._pending_count = 0
+
+        saved = 0
+        for (symbol, timeframe), rows in pending.items():
+            klines = [rows[open_time] for open_time in sorted(rows)]
+            try:
+                saved += self.db.save_candles(symbol, timeframe, klines)
+            except Exception as e:
+                self.logger.error(f"❌ {symbol} ({timeframe}) 스트림 캔들 저장 실패: {e}")
+                continue
+
+            if self.on_candles is not None:
+                try:
+                    self.on_candles(symbol, timeframe, klines)
+                except Exception as e:
+                    self.logger.warning(f"⚠️ {symbol} ({timeframe}) 캔들 알림 실패: {e}")
+
+        self.saved_candles += saved
+        return saved
@@ -0,0 +1,121 @@
+"""
+(심볼, 시간봉)별 워터마크 인덱스
+
+DB에 저장된 가장 최신 캔들 시간(open_time)과 캔들 개수를 메모리에 보관
+처음 한 번만 GROUP BY 쿼리로 불러오고, 이후에는 save_candles/삭제 시 직접 갱신
+다운로드 전에 심볼마다 COUNT(*)/MAX 쿼리를 날리지 않아도 됨
+
+가장 오래된 캔들 시간도 같이 보관해서, 그보다 오래된 캔들 저장(과거 구간 추가 다운로드)도 개수에 더함
+(오래된 캔들 삭제 후에는 가장 오래된 시간을 모르므로, 그때 과거 캔들이 저장되면 인덱스를 다시 불러옴)
+"""
+import threading
+
+
+class WatermarkIndex:
+    """
+    {(symbol, timeframe): [latest_open_time(ms), row_count, earliest_open_time(ms) 또는 None(모름)]}
+
+    같은 DB를 쓰는 CandleDatabase 객체들이 하나의 인덱스를 공유 (get_watermark_index)
+    이 프로세스 밖에서 DB를 직접 수정했다면 reset()으로 비워서 다시 불러오게 해야 함
+    """
+
+    def __init__(self):
+        self._marks = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, rows):
+        """
+        GROUP BY 결과로 인덱스 초기화
+
+        Args:
+            rows: [(symbol, timeframe, latest_open_time_ms, row_count[, earliest_open_time_ms]), ...]
+        """
+        marks = {}
+        for symbol, timeframe, latest, count, *earliest in rows:
+            marks[(symbol, timeframe)] = [int(latest), int(count), int(earliest[0]) if earliest else None]
+        with self._lock:
+            self._marks = marks
+            self.loaded = True
+
+    def reset(self):
+        """인덱스 비우기 (다음 조회 때 다시 불러옴)"""
+        with self._lock:
+            self._marks = {}
+            self.loaded = False
+
+    def get(self, symbol, timeframe):
+        """
+        Returns:
+            (latest_open_time_ms, row_count), 데이터가 없으면 None
+        """
+        with self._lock:
+            mark = self._marks.get((symbol, timeframe))
+            return (mark[0], mark[1]) if mark else None
+
+    def record_saved(self, symbol, timeframe, open_times):
+        """
+        save_candles 후 호출 - 최신/가장 오래된 시간 갱신, 그 범위 밖의 캔들만 개수에 추가
+        (범위 안의 캔들은 이미 있는 행의 업데이트로 간주)
+
+        Args:
+            open_times: 저장한 캔들의 open_time(ms) 리스트
+        """
+        if not open_times:
+            return
+        with self._lock:
+            mark = self._marks.get((symbol, timeframe))
+            if mark is None:
+                self._marks[(symbol, timeframe)] = [max(open_times), len(set(open_times)), min(open_times)]
+                return
+            latest, _, earliest = mark
+            new_times = set(t for t in open_times if t > latest)
+            if new_times:
+                mark[0] = max(new_times)
+                mark[1] += len(new_times)
+            if earliest is None:
+                if any(t < latest for t in open_times):
+                    # 삭제 후라서 과거 캔들이 새 행인지 알 수 없음 → 다음 조회 때 DB에서 다시 불러옴
+                    self.loaded = False
+                return
+            old_times = set(t for t in open_times if t < earliest)
+            if old_times:
+                mark[2] = min(old_times)
+                mark[1] += len(old_times)
+
+    def record_deleted(self, symbol, timeframe, deleted_count):
+        """오래된 캔들 삭제 후 개수 갱신 (최신 시간은 그대로)"""
+        if deleted_count <= 0:
+            return
+        with self._lock:
+            mark = self._marks.get((symbol, timeframe))
+            if mark is None:
+                return
+            mark[1] = max(0, mark[1] - deleted_count)
+            mark[2] = None  # 남은 가장 오래된 캔들 시간은 모름
+            if mark[1] == 0:
+                del self._marks[(symbol, timeframe)]
+
+    def pairs(self):
+        """인덱스에 있는 모든 (symbol, timeframe)"""
+        with self._lock:
+            return list(self._marks.keys())
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_watermark_index(key):
+    """
+    DB별 공유 워터마크 인덱스 반환 (없으면 생성)
+
+    Args:
+        key: DB 식별자 (예: (host, database))
+    """
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = WatermarkIndex()
+            _indexes[key] = index
+        return index
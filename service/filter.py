@@ -7,7 +7,9 @@
 
 import sys,os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../')
+from core.candle_frame import CandleFrame
 from core.downloader import ChartDownloader
+from core.resampler import ms_to_datetime
 
 
 class Filter:
@@ -136,7 +138,8 @@ class Filter:
         4. (옵션) 3개 중 N개가 '꽉 찬 양봉' (꼬리가 거의 없는 강한 양봉)
         
         Args:
-            candles: 캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
+            candles: CandleFrame (open_time은 밀리초)
+                     또는 캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
             symbol: 확인할 심볼 - 로깅용
             volume_range_multiplier: 거래량 임계값 배수 (기본값: 1.0 = 평균 이상)
             period: 평균 계산 기간 (기본값: 14)
@@ -184,16 +187,10 @@ class Filter:
                 print(f"⚠️ {symbol}: 데이터가 부족합니다. (필요: {period + 3}개, 현재: {len(candles)}개)")
                 return False
             
-            # 시간대 내의 캔들만 필터링
-            time_range_candles = []
-            for candle in candles:
-                candle_time = candle[0]
-                # datetime 객체가 아니면 변환
-                if not isinstance(candle_time, datetime):
-                    candle_time = datetime.fromtimestamp(int(candle_time) / 1000)
-                
-                if start_time_utc <= candle_time <= end_time_utc:
-                    time_range_candles.append(candle)
+            # 시간대 내의 캔들만 선택 (시간순 CandleFrame에서 이진 탐색)
+            candles = CandleFrame.of(candles)
+            start_idx_in_all, end_idx_in_all = candles.index_range(start_time_utc, end_time_utc)
+            time_range_candles = candles[start_idx_in_all:end_idx_in_all]
             
             if len(time_range_candles) == 0:
                 print(f"⚠️ {symbol}: 지정된 시간대({start_time} ~ {end_time})에 데이터가 없습니다.")
@@ -206,10 +203,7 @@ class Filter:
                 print(f"⚠️ {symbol}: 시간대 내 캔들이 부족합니다. (최소 3개 필요, 현재: {len(time_range_candles)}개)")
                 return False
             
-            # 전체 candles에서 시간대 캔들의 시작 인덱스 찾기
-            first_time_candle = time_range_candles[0]
-            start_idx_in_all = candles.index(first_time_candle)
-            
+            # 전체 candles에서 시간대 캔들의 시작 인덱스
             recent_candles = time_range_candles
             base_idx_offset = start_idx_in_all
         else:
@@ -371,7 +365,7 @@ class Filter:
                 if isinstance(candle1[0], datetime):
                     pattern_time_utc = candle1[0]
                 else:
-                    pattern_time_utc = datetime.fromtimestamp(int(candle1[0]) / 1000)
+                    pattern_time_utc = ms_to_datetime(int(candle1[0]))
                 
                 # UTC → KST 변환 (+9시간)
                 from datetime import timedelta
@@ -423,7 +417,8 @@ class Filter:
         2. 최근 window개 캔들 내에서 이런 패턴이 3회 이상 발생
         
         Args:
-            candles: 캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
+            candles: CandleFrame (open_time은 밀리초)
+                     또는 캔들 데이터 리스트 [(open_time, open, high, low, close, volume, quote_volume), ...]
             symbol: 확인할 심볼 - 로깅용
             downloader: ChartDownloader 인스턴스 (데이터 부족 시 추가 다운로드용)
             timeframe: 시간봉 (데이터 다운로드 시 필요)
@@ -448,7 +443,7 @@ class Filter:
                 # 추가 데이터 다운로드
                 downloader.download_and_save(symbol, timeframe, initial_limit=required_candles + 50)
                 # 다시 데이터 가져오기
-                candles = downloader.db.get_candles(symbol, timeframe, limit=required_candles)
+                candles = downloader.db.get_candle_frame(symbol, timeframe, limit=required_candles)
                 
                 if len(candles) < required_candles:
                     print(f"⚠️ {symbol}: 다운로드 후에도 데이터 부족 (현재: {len(candles)})")
@@ -498,7 +493,7 @@ class Filter:
                 if isinstance(candle[0], datetime):
                     pattern_time_utc = candle[0]
                 else:
-                    pattern_time_utc = datetime.fromtimestamp(int(candle[0]) / 1000)
+                    pattern_time_utc = ms_to_datetime(int(candle[0]))
                 
                 # UTC → KST 변환 (+9시간)
                 pattern_time_kst = pattern_time_utc + timedelta(hours=9)
@@ -531,4 +526,39 @@ class Filter:
             
             return first_spike_time
         
-        return False
\ No newline at end of file
+        return False
+    
+    def _high_volume_spike_state_filter(self, state, symbol, volume_range_multiplier, spike_threshold, window=None):
+        """
+        거래량 급등 패턴 찾기 - IndicatorState 사용 (_high_volume_spike_filter와 같은 조건)
+        
+        캔들마다 이전 period개 평균 거래량이 이미 계산되어 있으므로 window개만 비교
+        
+        Args:
+            state: core.indicators.IndicatorState (ready 상태여야 함)
+            symbol: 확인할 심볼 - 로깅용
+            volume_range_multiplier: 거래량 배수
+            spike_threshold: window 내 최소 급등 횟수
+            window: 검사할 캔들 윈도우 (없으면 state.window)
+        
+        Returns:
+            pattern_time: 패턴 발견 시 최초 발견 시간 문자열 (KST), 없으면 False
+        """
+        from datetime import timedelta
+        
+        spike_count = 0
+        first_spike_time = None
+        for open_time, is_bullish, volume, avg_volume in state.recent(window):
+            if avg_volume is None or not is_bullish:
+                continue
+            if volume >= avg_volume * volume_range_multiplier:
+                spike_count += 1
+                if first_spike_time is None:
+                    first_spike_time = (ms_to_datetime(open_time) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')
+        
+        if spike_count >= spike_threshold:
+            if first_spike_time:
+                print(f"📈 {symbol}: 거래량 급등 패턴 발견! (window 내 {spike_count}회 급등, 최초: {first_spike_time} KST)")
+            return first_spike_time
+        
+        return False
@@ -0,0 +1,205 @@
+"""
+필터 플러그인 레지스트리
+
+필터마다 이름(config의 types), 설정 스키마, 필요한 캔들 개수(lookback)를 선언하고
+SurgeScanner는 레지스트리만 보고 필터를 실행함 (새 필터를 추가해도 스캐너 수정 없음)
+
+새 필터 추가:
+    1. FilterPlugin을 상속하고 name, schema, run()을 구현한 뒤 @register_filter
+    2. service/ 밖의 모듈이면 config.json의 filter_plugins에 모듈 경로 추가
+       예: "filter_plugins": ["service.my_filter"]
+"""
+import importlib
+from collections import namedtuple
+
+from service.vectorized_filter import VectorizedFilter
+
+
+# 필터 실행에 필요한 공용 객체
+# filter_obj: Filter 또는 VectorizedFilter, downloader: ChartDownloader, indicators: IndicatorStore 또는 None
+FilterContext = namedtuple('FilterContext', ['filter_obj', 'downloader', 'indicators', 'logger'])
+
+# 스키마에서 필수 키 표시
+REQUIRED = object()
+
+# 모든 필터 공통 설정
+COMMON_SCHEMA = {
+    'types': (str, REQUIRED),
+    'using_timeframe': (list, REQUIRED),
+    'interval': (str, REQUIRED),
+    'enable': (bool, True),
+}
+
+FILTER_REGISTRY = {}
+
+
+def register_filter(plugin_class):
+    """필터 플러그인 등록 (클래스 데코레이터)"""
+    if not plugin_class.name:
+        raise ValueError(f"필터 이름(name)이 없습니다: {plugin_class.__name__}")
+    FILTER_REGISTRY[plugin_class.name] = plugin_class()
+    return plugin_class
+
+
+def get_filter_plugin(name):
+    """
+    Returns:
+        등록된 FilterPlugin, 없으면 None
+    """
+    return FILTER_REGISTRY.get(name)
+
+
+def load_filter_plugins(module_names):
+    """config의 filter_plugins 모듈 import (import할 때 @register_filter로 등록됨)"""
+    for module_name in module_names or []:
+        importlib.import_module(module_name)
+
+
+class FilterPlugin:
+    """
+    필터 플러그인 기본 클래스
+
+    name: config의 types 값
+    schema: {키: (타입, 기본값 또는 REQUIRED)} (COMMON_SCHEMA와 합쳐서 검증)
+    """
+    name = None
+    schema = {}
+
+    def validate(self, config):
+        """
+        설정 검증
+
+        Returns:
+            오류 메시지 리스트 (없으면 빈 리스트)
+        """
+        errors = []
+        for key, (value_type, default) in {**COMMON_SCHEMA, **self.schema}.items():
+            if key not in config:
+                if default is REQUIRED:
+                    errors.append(f"필수 키 '{key}'가 없습니다.")
+                continue
+            # bool은 int의 하위 타입이므로 숫자 키에 true/false가 들어오는 것은 막음
+            value = config[key]
+            if not isinstance(value, value_type) or (isinstance(value, bool) and value_type is not bool):
+                errors.append(f"'{key}'의 타입이 올바르지 않습니다. (현재: {value!r})")
+        return errors
+
+    def params(self, config):
+        """기본값을 채운 설정"""
+        params = {key: default for key, (_, default) in self.schema.items() if default is not REQUIRED}
+        params.update(config)
+        return params
+
+    def lookback(self, params):
+        """심볼당 필요한 캔들 개수 (최신 캔들 포함)"""
+        return params['window'] + params['period'] + 1
+
+    def track_indicators(self, indicators, params):
+        """IndicatorStore에 필요한 지표 등록 (지표를 쓰는 필터만 구현)"""
+        pass
+
+    def run(self, context, candle_set, symbols, timeframe, params):
+        """
+        한 시간봉의 심볼들에 필터 적용
+
+        Args:
+            context: FilterContext
+            candle_set: {symbol: CandleFrame} (오래된 순, 모든 필터가 같은 버퍼를 공유하므로 수정 금지)
+            symbols: 검사할 심볼 리스트
+            timeframe: 시간봉
+            params: 기본값을 채운 필터 설정
+
+        Returns:
+            {symbol: pattern_time} (패턴이 발견된 심볼만)
+        """
+        raise NotImplementedError
+
+    def _run_per_symbol(self, context, symbols, check):
+        """심볼마다 check(symbol) 실행 (오류는 심볼 단위로 기록하고 계속)"""
+        results = {}
+        for symbol in symbols:
+            try:
+                pattern_time = check(symbol)
+            except Exception as e:
+                context.logger.warning(f"⚠️ {symbol} 확인 중 오류: {e}")
+                continue
+            if pattern_time:
+                results[symbol] = pattern_time
+        return results
+
+
+@register_filter
+class ThreeStepSurgePlugin(FilterPlugin):
+    """3개 연속 양봉 + 거래량 급증 + ATR 변동폭"""
+    name = '3step_surge'
+    schema = {
+        'period': (int, REQUIRED),
+        'window': (int, REQUIRED),
+        'volume_range_multiplier': ((int, float), REQUIRED),
+        'range_multiplier': ((int, float), REQUIRED),
+        'strong_candle_count': (int, 0),
+        'upper_wick_ratio': ((int, float), 0.2),
+        'lower_wick_ratio': ((int, float), 0.1),
+    }
+
+    def run(self, context, candle_set, symbols, timeframe, params):
+        args = (params['volume_range_multiplier'], params['period'], params['window'], params['range_multiplier'])
+        kwargs = {
+            'strong_candle_count': params['strong_candle_count'],
+            'upper_wick_ratio': params['upper_wick_ratio'],
+            'lower_wick_ratio': params['lower_wick_ratio'],
+        }
+        if isinstance(context.filter_obj, VectorizedFilter):
+            return context.filter_obj.batch_three_step_surge_filter(candle_set, symbols, *args, **kwargs)
+
+        lookback = self.lookback(params)
+        return self._run_per_symbol(context, symbols, lambda symbol: context.filter_obj._three_step_surge_filter(
+            candle_set.get(symbol, [])[-lookback:], symbol, *args, **kwargs))
+
+
+@register_filter
+class HighVolumeSpikePlugin(FilterPlugin):
+    """window 내 거래량 급등 양봉이 spike_threshold번 이상"""
+    name = 'high_volume_spike'
+    schema = {
+        'period': (int, REQUIRED),
+        'window': (int, REQUIRED),
+        'volume_range_multiplier': ((int, float), REQUIRED),
+        'spike_threshold': (int, REQUIRED),
+    }
+
+    def track_indicators(self, indicators, params):
+        for timeframe in params['using_timeframe']:
+            indicators.track(timeframe, params['period'], params['window'])
+
+    def run(self, context, candle_set, symbols, timeframe, params):
+        period = params['period']
+        window = params['window']
+        volume_range_multiplier = params['volume_range_multiplier']
+        spike_threshold = params['spike_threshold']
+        filter_obj = context.filter_obj
+
+        # 지표 상태가 준비된 심볼은 상태로 (window개만 비교), 나머지는 캔들로
+        results = {}
+        remaining = symbols
+        if context.indicators is not None:
+            remaining = []
+            for symbol in symbols:
+                state = context.indicators.ready_state(symbol, timeframe, period, candle_set.get(symbol, []))
+                if state is None:
+                    remaining.append(symbol)
+                    continue
+                pattern_time = filter_obj._high_volume_spike_state_filter(state, symbol, volume_range_multiplier, spike_threshold, window)
+                if pattern_time:
+                    results[symbol] = pattern_time
+
+        if isinstance(filter_obj, VectorizedFilter):
+            results.update(filter_obj.batch_high_volume_spike_filter(
+                candle_set, remaining, context.downloader, timeframe, period, window, volume_range_multiplier, spike_threshold))
+            return results
+
+        lookback = self.lookback(params)
+        results.update(self._run_per_symbol(context, remaining, lambda symbol: filter_obj._high_volume_spike_filter(
+            candle_set.get(symbol, [])[-lookback:], symbol, downloader=context.downloader, timeframe=timeframe,
+            period=period, window=window, volume_range_multiplier=volume_range_multiplier, spike_threshold=spike_threshold)))
+        return results
@@ -0,0 +1,212 @@
+"""
+프로세스 풀 병렬 필터
+
+필터 계산은 순수 파이썬 CPU 작업이라 FastAPI 프로세스 안에서 API 요청과 GIL을 나눠 씀
+→ 심볼을 작업 프로세스 수만큼 나눠서 (shard) 별도 프로세스에서 필터 실행
+
+- 캔들은 시간봉마다 (심볼 수, 캔들 수, 7) float64 배열 1개로 공유 메모리에 씀 (스캔당 1번)
+  작업 프로세스는 이름으로 붙어서 (attach) 복사 없이 CandleFrame으로 읽음 → 캔들은 pickle하지 않음
+- 작업에 보내는 것은 (필터 이름, 설정, 시간봉, 공유 메모리 이름, [(행, 심볼, 캔들 수)])뿐
+- 결과 {symbol: pattern_time}은 합쳐서 기존과 같은 surge_data 구조로 만듦 (SurgeScanner._run_filters)
+- 캔들이 lookback보다 적은 심볼은 추가 다운로드가 필요할 수 있어서 (downloader) 현재 프로세스에서 실행
+- 작업 프로세스에는 지표 상태(IndicatorStore)가 없으므로 캔들로 계산 (결과는 같음)
+
+config.json의 filter_pool.enable이 true일 때 사용 (workers: 작업 프로세스 수)
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.candle_frame import CANDLE_COLUMNS, CandleFrame
+from service.filter import Filter
+from service.filter_registry import FilterContext, get_filter_plugin, load_filter_plugins
+from service.vectorized_filter import VectorizedFilter
+
+
+# 작업 프로세스 안에서 재사용하는 필터 객체 (엔진 이름 → Filter/VectorizedFilter)
+_worker_filters = {}
+
+
+def _init_worker(plugin_modules):
+    """작업 프로세스 시작 시 config의 filter_plugins 모듈 등록"""
+    load_filter_plugins(plugin_modules)
+
+
+def _run_shard(filter_type, params, timeframe, engine, block_name, shape, rows):
+    """
+    작업 프로세스에서 심볼 일부(shard)에 필터 실행
+
+    Args:
+        filter_type: 필터 플러그인 이름
+        params: 기본값을 채운 필터 설정
+        timeframe: 시간봉
+        engine: 'python' 또는 'vectorized'
+        block_name: 공유 메모리 이름
+        shape: (심볼 수, 캔들 수, 7)
+        rows: [(행 번호, 심볼, 캔들 수), ...]
+
+    Returns:
+        {symbol: pattern_time}
+    """
+    filter_obj = _worker_filters.get(engine)
+    if filter_obj is None:
+        filter_obj = VectorizedFilter() if engine == 'vectorized' else Filter()
+        _worker_filters[engine] = filter_obj
+
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        length = shape[1]
+        # 캔들은 오른쪽 끝에 맞춰져 있음 (stack_candles와 같은 배치)
+        candle_set = {symbol: CandleFrame(data[row, length - count:], assume_sorted=True) for row, symbol, count in rows}
+        context = FilterContext(filter_obj, None, None, logging.getLogger('filter_worker'))
+        results = get_filter_plugin(filter_type).run(context, candle_set, [symbol for _, symbol, _ in rows], timeframe, params)
+        # 공유 메모리를 닫기 전에 view 정리
+        del candle_set, data
+        return results
+    finally:
+        block.close()
+
+
+class SharedCandleSets:
+    """
+    한 번의 필터 단계에서 쓰는 {timeframe: {symbol: 캔들}}을 공유 메모리에 올린 것
+
+    with 블록이 끝나면 공유 메모리 해제
+    """
+
+    def __init__(self, candle_sets):
+        """
+        Args:
+            candle_sets: {timeframe: {symbol: CandleFrame 또는 캔들 리스트}}
+        """
+        self.candle_sets = candle_sets
+        self.blocks = {}  # timeframe → (SharedMemory, shape, {symbol: (행, 캔들 수)})
+        try:
+            for timeframe, candle_set in candle_sets.items():
+                self.blocks[timeframe] = self._share(candle_set)
+        except Exception:
+            self.close()
+            raise
+
+    @staticmethod
+    def _share(candle_set):
+        frames = {symbol: CandleFrame.of(candles) for symbol, candles in candle_set.items()}
+        length = max([len(frame) for frame in frames.values()] + [1])
+        shape = (max(len(frames), 1), length, len(CANDLE_COLUMNS))
+        block = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        data = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        index = {}
+        for row, (symbol, frame) in enumerate(frames.items()):
+            count = len(frame)
+            data[row, length - count:] = frame.data
+            index[symbol] = (row, count)
+        del data
+        return block, shape, index
+
+    def close(self):
+        for block, _, _ in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FilterPool:
+    """
+    필터 플러그인을 프로세스 풀에서 심볼 단위로 나눠 실행
+    """
+
+    def __init__(self, workers=4, engine='python', plugin_modules=None):
+        """
+        Args:
+            workers: 작업 프로세스 수
+            engine: config의 scanner.filter_engine ('python' 또는 'vectorized')
+            plugin_modules: config의 filter_plugins (작업 프로세스에서도 import)
+        """
+        self.workers = max(1, int(workers))
+        self.engine = engine
+        self.plugin_modules = list(plugin_modules or [])
+        self._executor = None
+
+        # 통계
+        self.shards = 0
+        self.local_symbols = 0
+
+    def _get_executor(self):
+        # 스레드가 있는 서버 프로세스를 fork하지 않도록 spawn (프로세스는 처음 한 번만 만들고 재사용)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_worker, initargs=(self.plugin_modules,))
+        return self._executor
+
+    def share(self, candle_sets):
+        """candle_sets를 공유 메모리에 올리기 (with 문으로 사용)"""
+        return SharedCandleSets(candle_sets)
+
+    def run(self, context, plugin, shared, timeframe, symbols, params):
+        """
+        plugin.run과 같은 결과를 작업 프로세스에서 계산
+
+        Args:
+            context: 현재 프로세스의 FilterContext (캔들이 부족한 심볼용)
+            plugin: FilterPlugin
+            shared: SharedCandleSets
+            timeframe: 시간봉
+            symbols: 검사할 심볼 리스트
+            params: 기본값을 채운 필터 설정
+
+        Returns:
+            {symbol: pattern_time}
+        """
+        block, shape, index = shared.blocks[timeframe]
+        lookback = plugin.lookback(params)
+
+        rows = []
+        local = []
+        for symbol in symbols:
+            row, count = index.get(symbol, (None, 0))
+            if count >= lookback:
+                rows.append((row, symbol, count))
+            else:
+                local.append(symbol)
+
+        # 작업 프로세스 수만큼 연속 구간으로 나눔 (배치 필터는 shard가 클수록 효율적)
+        futures = []
+        if rows:
+            executor = self._get_executor()
+            shard_size = -(-len(rows) // self.workers)
+            for start in range(0, len(rows), shard_size):
+                futures.append(executor.submit(_run_shard, plugin.name, params, timeframe, self.engine,
+                                               block.name, shape, rows[start:start + shard_size]))
+            self.shards += len(futures)
+
+        results = {}
+        if local:
+            self.local_symbols += len(local)
+            results.update(plugin.run(context, shared.candle_sets[timeframe], local, timeframe, params))
+        for future in futures:
+            results.update(future.result())
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'engine': self.engine,
+            'shards': self.shards,
+            'local_symbols': self.local_symbols,
+        }
@@ -0,0 +1,399 @@
+"""
+NumPy 벡터화 필터
+
+Filter와 같은 결과(가장 먼저 발견된 패턴 시작 시간)를 배열 연산으로 계산
+- 양봉/강한 양봉(꼬리 비율)/거래량 평균/True Range를 window 전체에 대해 한 번에 계산
+- 거래량 평균은 기존과 같은 순서로 더해서 (왼쪽부터 차례로) 부동소수점 결과까지 동일
+- ATR 점진적 업데이트는 기존 루프처럼 앞 조건(양봉, 강한 양봉, 거래량)을 통과한 위치에서만 일어나므로
+  후보 위치만 순서대로 계산 (보통 0~몇 개)
+- 배치 모드: 한 시간봉의 모든 심볼을 (심볼, 캔들, 컬럼) 3차원 배열로 쌓아서 한 번에 계산
+  (캔들이 부족한 심볼은 앞쪽을 NaN으로 채우고 제외)
+
+config.json의 scanner.filter_engine이 "vectorized"일 때 Filter 대신 사용
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from core.candle_cache import CACHE_COLUMNS
+from core.candle_frame import CandleFrame
+from core.resampler import ms_to_datetime
+from core.downloader import ChartDownloader
+from service.filter import Filter
+
+
+# (n, 7) 배열의 컬럼 위치
+OPEN_TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def to_candle_array(candles):
+    """
+    CandleFrame / 캔들 리스트 / 캐시 배열 view → (n, 7) float64 배열 (open_time은 밀리초)
+
+    CandleFrame이나 배열이면 복사하지 않음
+    """
+    return CandleFrame.of(candles).data
+
+
+def true_ranges(data):
+    """
+    인덱스 j의 True Range (j >= 1), 0번은 0
+
+    max(고가 - 저가, |고가 - 이전 종가|, |저가 - 이전 종가|)
+    """
+    high = data[:, HIGH]
+    low = data[:, LOW]
+    tr = np.zeros(len(data))
+    if len(data) > 1:
+        prev_close = data[:-1, CLOSE]
+        tr[1:] = np.maximum(np.maximum(high[1:] - low[1:], np.abs(high[1:] - prev_close)),
+                            np.abs(low[1:] - prev_close))
+    return tr
+
+
+def sequential_mean(values, starts, period):
+    """
+    values[s - period:s] 평균을 starts 전체에 대해 계산
+
+    sum()처럼 왼쪽부터 차례로 더해서 기존 필터와 부동소수점 결과가 같음
+    (period번 반복하는 배열 덧셈)
+    """
+    total = np.zeros(len(starts))
+    for k in range(period):
+        total = total + values[starts - period + k]
+    return total / period
+
+
+def strong_candle_mask(data, upper_wick_ratio, lower_wick_ratio):
+    """
+    캔들별 '꽉 찬 양봉' 여부 (윗꼬리/아래꼬리 비율이 허용치 이하, 변동폭 0은 제외)
+    """
+    open_price = data[:, OPEN]
+    high = data[:, HIGH]
+    low = data[:, LOW]
+    close = data[:, CLOSE]
+    total_range = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        upper_wick = (high - close) / total_range
+        lower_wick = (open_price - low) / total_range
+    return (total_range != 0) & (upper_wick <= upper_wick_ratio) & (lower_wick <= lower_wick_ratio)
+
+
+def find_three_step_surge(data, base, end, volume_range_multiplier, period, range_multiplier,
+                          strong_candle_count=0, upper_wick_ratio=0.2, lower_wick_ratio=0.1):
+    """
+    data[base:end] 안에서 3연속 양봉 + 거래량 + ATR 변동폭 조건을 만족하는 첫 위치
+
+    싼 조건(양봉)부터 구간 전체에 대해 계산하고 후보가 없으면 바로 반환
+    (대부분의 심볼은 여기서 끝남)
+
+    Args:
+        data: (n, 7) float64 배열 (오래된 순)
+        base: 검사 구간 시작 인덱스
+        end: 검사 구간 끝 인덱스 (미포함)
+        나머지: Filter._three_step_surge_filter와 동일
+
+    Returns:
+        (첫 번째 캔들 인덱스, 그때의 ATR), 없거나 ATR을 계산할 수 없으면 (None, None)
+    """
+    # 초기 ATR: data[:first_check_idx + 1]의 최근 period개 True Range 평균 (개수가 부족하면 계산 불가)
+    first_check_idx = max(base, period + 1)
+    atr_candles = min(first_check_idx + 1, len(data))
+    if atr_candles < period + 1:
+        return None, None
+
+    # 평균 계산에 필요한 이전 period개가 없는 위치는 제외
+    first = max(base, period)
+    last = end - 2  # 첫 번째 캔들 인덱스 범위 [first, last)
+    if last <= first:
+        return None, None
+
+    # 1. 3개 모두 양봉
+    bullish = data[first:last + 2, CLOSE] > data[first:last + 2, OPEN]
+    mask = bullish[:-2] & bullish[1:-1] & bullish[2:]
+
+    # 1-1. 강한 양봉 개수
+    if strong_candle_count > 0 and mask.any():
+        strong = strong_candle_mask(data[first:last + 2], upper_wick_ratio, lower_wick_ratio).astype(np.int64)
+        mask &= (strong[:-2] + strong[1:-1] + strong[2:]) >= strong_candle_count
+
+    starts = np.flatnonzero(mask) + first
+    if len(starts) == 0:
+        return None, None
+
+    # 2. 3개 중 하나라도 (이전 period개 평균 거래량 x 배수) 이상
+    volume = data[:, VOLUME]
+    threshold = sequential_mean(volume, starts, period) * volume_range_multiplier
+    starts = starts[(volume[starts] >= threshold) | (volume[starts + 1] >= threshold) | (volume[starts + 2] >= threshold)]
+    if len(starts) == 0:
+        return None, None
+
+    # 3. ATR 변동폭 - 후보 위치에서만 ATR이 업데이트되므로 순서대로 확인
+    tr = true_ranges(data).tolist()
+    atr = sum(tr[atr_candles - period:atr_candles]) / period
+    candle_range = (data[:, HIGH] - data[:, LOW]).tolist()
+    for index in starts.tolist():
+        if index > base and index >= period + 1:
+            atr = (atr * period - tr[index - period] + tr[index]) / period
+        if atr == 0:
+            continue
+        limit = atr * range_multiplier
+        if candle_range[index] >= limit or candle_range[index + 1] >= limit or candle_range[index + 2] >= limit:
+            return index, atr
+
+    return None, None
+
+
+def stack_candles(candle_sets, symbols, length):
+    """
+    심볼별 캔들을 (심볼 수, length, 7) 배열로 쌓기 (최신 캔들이 오른쪽 끝에 맞춰짐)
+
+    Args:
+        candle_sets: {symbol: 캔들 리스트 또는 (n, 7) 배열}
+        symbols: 쌓을 심볼 순서
+        length: 심볼당 캔들 수 (부족하면 앞쪽을 NaN으로 채움)
+
+    Returns:
+        (data, counts): counts는 심볼별 실제 캔들 수
+    """
+    data = np.full((len(symbols), length, len(CACHE_COLUMNS)), np.nan)
+    counts = np.zeros(len(symbols), dtype=np.int64)
+    for row, symbol in enumerate(symbols):
+        candles = candle_sets.get(symbol)
+        if candles is None or len(candles) == 0:
+            continue
+        array = to_candle_array(candles)[-length:]
+        counts[row] = len(array)
+        data[row, length - len(array):] = array
+    return data, counts
+
+
+def batch_three_step_surge(data, counts, volume_range_multiplier, period, window, range_multiplier,
+                           strong_candle_count=0, upper_wick_ratio=0.2, lower_wick_ratio=0.1):
+    """
+    stack_candles로 쌓은 모든 심볼에 대해 3step_surge (window 모드)를 한 번에 계산
+
+    심볼마다 find_three_step_surge(candles, len - window, len, ...)와 같은 결과
+
+    Returns:
+        (matches, atrs): 심볼별 첫 번째 캔들의 data 인덱스 (없으면 -1), 그때의 ATR
+    """
+    symbol_count, length = data.shape[:2]
+    matches = np.full(symbol_count, -1, dtype=np.int64)
+    atrs = np.zeros(symbol_count)
+    if symbol_count == 0 or window < 3 or length < window + period:
+        return matches, atrs
+
+    pads = length - counts
+    # 원래 캔들 리스트 기준 인덱스: 검사 시작 base = n - window, 초기 ATR은 candles[:max(base, period + 1) + 1]
+    atr_candles = np.minimum(np.maximum(counts - window, period + 1) + 1, counts)
+    valid = (counts >= window + period) & (atr_candles >= period + 1)
+
+    open_price = data[:, :, OPEN]
+    high = data[:, :, HIGH]
+    low = data[:, :, LOW]
+    close = data[:, :, CLOSE]
+    volume = data[:, :, VOLUME]
+    first = length - window  # 모든 심볼의 검사 시작 위치 (오른쪽 정렬이라 같음)
+    last = length - 2
+    columns = np.arange(first, last)
+
+    # 1. 3개 모두 양봉
+    bullish = close[:, first:] > open_price[:, first:]
+    mask = bullish[:, :-2] & bullish[:, 1:-1] & bullish[:, 2:]
+    mask &= valid[:, None] & ((columns[None, :] - pads[:, None]) >= period)
+
+    # 1-1. 강한 양봉 개수
+    if strong_candle_count > 0:
+        strong = strong_candle_mask(data[:, first:].reshape(-1, data.shape[2]), upper_wick_ratio, lower_wick_ratio)
+        strong = strong.reshape(symbol_count, window).astype(np.int64)
+        mask &= (strong[:, :-2] + strong[:, 1:-1] + strong[:, 2:]) >= strong_candle_count
+    if not mask.any():
+        return matches, atrs
+
+    # 2. 이전 period개 평균 거래량 (왼쪽부터 차례로 더함)
+    total = np.zeros((symbol_count, last - first))
+    for k in range(period):
+        total = total + volume[:, first - period + k:last - period + k]
+    threshold = total / period * volume_range_multiplier
+    mask &= (volume[:, first:last] >= threshold) | (volume[:, first + 1:last + 1] >= threshold) | \
+            (volume[:, first + 2:last + 2] >= threshold)
+    if not mask.any():
+        return matches, atrs
+
+    # 3. ATR: 심볼별 초기값 후 후보 위치에서만 점진적 업데이트 (열 순서대로, 심볼 방향은 벡터)
+    tr = np.zeros((symbol_count, length))
+    with np.errstate(invalid='ignore'):
+        prev_close = close[:, :-1]
+        tr[:, 1:] = np.maximum(np.maximum(high[:, 1:] - low[:, 1:], np.abs(high[:, 1:] - prev_close)),
+                               np.abs(low[:, 1:] - prev_close))
+    rows = np.arange(symbol_count)
+    atr_start = np.clip(pads + atr_candles - period, 0, length - 1)
+    atr = np.zeros(symbol_count)
+    for k in range(period):
+        atr = atr + tr[rows, np.minimum(atr_start + k, length - 1)]
+    atr = atr / period
+
+    candle_range = high - low
+    for offset, column in enumerate(columns.tolist()):
+        active = mask[:, offset] & (matches < 0)
+        if not active.any():
+            continue
+        if column > first:
+            update = active & ((column - pads) >= period + 1)
+            atr = np.where(update, (atr * period - tr[:, column - period] + tr[:, column]) / period, atr)
+        limit = atr * range_multiplier
+        with np.errstate(invalid='ignore'):
+            hit = active & (atr != 0) & ((candle_range[:, column] >= limit) | (candle_range[:, column + 1] >= limit) |
+                                         (candle_range[:, column + 2] >= limit))
+        matches[hit] = column
+        atrs[hit] = atr[hit]
+    return matches, atrs
+
+
+def batch_high_volume_spike(data, counts, period, window, volume_range_multiplier, spike_threshold):
+    """
+    stack_candles로 쌓은 모든 심볼에 대해 high_volume_spike를 한 번에 계산
+    (window 안에서 이전 period개 평균 대비 volume_range_multiplier배 이상인 양봉이 spike_threshold번 이상)
+
+    Returns:
+        (matches, spike_counts): 심볼별 첫 급등 캔들의 data 인덱스 (없으면 -1), 급등 횟수
+        캔들이 window + period개보다 적은 심볼은 계산하지 않음 (counts로 확인해서 따로 처리)
+    """
+    symbol_count, length = data.shape[:2]
+    matches = np.full(symbol_count, -1, dtype=np.int64)
+    if symbol_count == 0 or window < 1 or length < window + period:
+        return matches, np.zeros(symbol_count, dtype=np.int64)
+
+    pads = length - counts
+    valid = counts >= window + period
+    first = length - window
+    volume = data[:, :, VOLUME]
+
+    total = np.zeros((symbol_count, window))
+    for k in range(period):
+        total = total + volume[:, first - period + k:length - period + k]
+    with np.errstate(invalid='ignore'):
+        spikes = (data[:, first:, CLOSE] > data[:, first:, OPEN]) & (volume[:, first:] >= total / period * volume_range_multiplier)
+    spikes &= valid[:, None] & ((np.arange(first, length)[None, :] - pads[:, None]) >= period)
+
+    spike_counts = spikes.sum(axis=1)
+    hit = (spike_counts >= spike_threshold) & (spike_counts > 0)
+    matches[hit] = np.argmax(spikes[hit], axis=1) + first
+    return matches, spike_counts
+
+
+def pattern_time_at(data, row, index):
+    """data[row, index] 캔들 시작 시간 (UTC → KST) 문자열"""
+    return (ms_to_datetime(int(data[row, index, OPEN_TIME])) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')
+
+
+class VectorizedFilter(Filter):
+    """
+    Filter의 NumPy 벡터화 버전 (결과 동일)
+    """
+
+    def _three_step_surge_filter(self, candles, symbol, volume_range_multiplier, period, window, range_multiplier, strong_candle_count=0, upper_wick_ratio=0.2, lower_wick_ratio=0.1, start_time=None, end_time=None, timezone='KST'):
+        """
+        3개 연속 양봉 + 거래량 급증 + ATR 변동폭 (+ 강한 양봉) 패턴 찾기
+
+        Args:
+            Filter._three_step_surge_filter와 동일
+
+        Returns:
+            pattern_time: 패턴 발견 시 시작 시간 문자열 (KST), 없으면 False
+        """
+        frame = CandleFrame.of(candles)
+        data = frame.data
+        use_timerange = start_time is not None and end_time is not None
+
+        if use_timerange:
+            if isinstance(start_time, str):
+                start_time = datetime.strptime(start_time, '%Y-%m-%d %H:%M:%S')
+            if isinstance(end_time, str):
+                end_time = datetime.strptime(end_time, '%Y-%m-%d %H:%M:%S')
+            # KST → UTC 변환 (DB는 UTC로 저장됨)
+            offset = timedelta(hours=9) if timezone.upper() == 'KST' else timedelta(0)
+
+            if len(data) < period + 3:
+                print(f"⚠️ {symbol}: 데이터가 부족합니다. (필요: {period + 3}개, 현재: {len(data)}개)")
+                return False
+
+            base, end = frame.index_range(start_time - offset, end_time - offset)
+            if end - base < 3:
+                print(f"⚠️ {symbol}: 시간대 내 캔들이 부족합니다. (최소 3개 필요, 현재: {max(end - base, 0)}개)")
+                return False
+        else:
+            if len(data) < window + period:
+                return False
+            base = len(data) - window
+            end = len(data)
+
+        index, atr = find_three_step_surge(
+            data, base, end, volume_range_multiplier, period, range_multiplier,
+            strong_candle_count=strong_candle_count,
+            upper_wick_ratio=upper_wick_ratio,
+            lower_wick_ratio=lower_wick_ratio
+        )
+        if index is None:
+            if use_timerange:
+                print(f"⚠️ {symbol}: 지정된 시간대 내에서 패턴을 찾지 못했습니다.")
+            return False
+
+        # 첫 번째 캔들의 시작 시간 (UTC → KST 변환)
+        pattern_time = pattern_time_at(data[None], 0, index)
+        print(f"🔥🔥🔥 {symbol}: 3연속 양봉+거래량 급증 패턴 발견! [시작: {pattern_time} KST]")
+        print(f"   위치: 최근 캔들에서 {end - index - 3}개 전, ATR({period}): {atr:.4f}")
+        return pattern_time
+
+    def batch_three_step_surge_filter(self, candle_sets, symbols, volume_range_multiplier, period, window, range_multiplier, strong_candle_count=0, upper_wick_ratio=0.2, lower_wick_ratio=0.1):
+        """
+        한 시간봉의 모든 심볼에 3step_surge 적용 (심볼마다 _three_step_surge_filter와 같은 결과)
+
+        Args:
+            candle_sets: {symbol: 캔들 리스트 또는 (n, 7) 배열} (오래된 순)
+            symbols: 검사할 심볼 리스트
+            나머지: _three_step_surge_filter와 동일
+
+        Returns:
+            {symbol: pattern_time} (패턴이 발견된 심볼만)
+        """
+        data, counts = stack_candles(candle_sets, symbols, window + period + 1)
+        matches, atrs = batch_three_step_surge(
+            data, counts, volume_range_multiplier, period, window, range_multiplier,
+            strong_candle_count=strong_candle_count,
+            upper_wick_ratio=upper_wick_ratio,
+            lower_wick_ratio=lower_wick_ratio
+        )
+
+        results = {}
+        for row in np.flatnonzero(matches >= 0).tolist():
+            symbol = symbols[row]
+            results[symbol] = pattern_time_at(data, row, matches[row])
+            print(f"🔥🔥🔥 {symbol}: 3연속 양봉+거래량 급증 패턴 발견! [시작: {results[symbol]} KST] ATR({period}): {atrs[row]:.4f}")
+        return results
+
+    def batch_high_volume_spike_filter(self, candle_sets, symbols, downloader:ChartDownloader, timeframe, period, window, volume_range_multiplier, spike_threshold):
+        """
+        한 시간봉의 모든 심볼에 high_volume_spike 적용 (심볼마다 _high_volume_spike_filter와 같은 결과)
+
+        캔들이 부족한 심볼은 기존처럼 _high_volume_spike_filter로 추가 다운로드 후 확인
+
+        Returns:
+            {symbol: 최초 급등 시간} (패턴이 발견된 심볼만)
+        """
+        length = window + period + 1
+        data, counts = stack_candles(candle_sets, symbols, length)
+        matches, spike_counts = batch_high_volume_spike(data, counts, period, window, volume_range_multiplier, spike_threshold)
+
+        results = {}
+        for row, symbol in enumerate(symbols):
+            if counts[row] < window + period:
+                candles = candle_sets.get(symbol, [])[-length:]
+                pattern_time = self._high_volume_spike_filter(candles, symbol, downloader=downloader, timeframe=timeframe, period=period, window=window, volume_range_multiplier=volume_range_multiplier, spike_threshold=spike_threshold)
+                if pattern_time:
+                    results[symbol] = pattern_time
+            elif matches[row] >= 0:
+                results[symbol] = pattern_time_at(data, row, matches[row])
+                print(f"📈 {symbol}: 거래량 급등 패턴 발견! (window 내 {spike_counts[row]}회 급등, 최초: {results[symbol]} KST)")
+        return results
@@ -0,0 +1,103 @@
+"""
+NumPy 링 버퍼 캔들 캐시 테스트
+"""
+import numpy as np
+
+from core.candle_cache import CandleCache, CandleRing
+from core.candle_frame import CandleFrame
+from core.resampler import ms_to_datetime
+from service.filter import Filter
+
+
+MINUTE = 60 * 1000
+
+
+def make_klines(start, count, spikes=()):
+    """start분부터 count개의 1분봉 (spikes 위치는 거래량 10배 양봉)"""
+    klines = []
+    for i in range(start, start + count):
+        volume = 1000.0 if i in spikes else 100.0 + i % 7
+        open_price = 100.0 + i % 5
+        close_price = open_price + (1.0 if i % 2 == 0 or i in spikes else -1.0)
+        klines.append([i * MINUTE, open_price, max(open_price, close_price) + 0.5, min(open_price, close_price) - 0.5,
+                       close_price, volume, (i + 1) * MINUTE - 1, volume * close_price])
+    return klines
+
+
+def to_rows(klines):
+    """DB 행 형식 (open_time datetime, o, h, l, c, v, quote_volume)"""
+    return [(ms_to_datetime(k[0]), k[1], k[2], k[3], k[4], k[5], k[7]) for k in klines]
+
+
+class FakeDatabase:
+    def __init__(self, klines):
+        self.rows = to_rows(klines)
+        self.bulk_calls = 0
+
+    def get_candle_frames_bulk(self, symbols, timeframe, limit=100):
+        self.bulk_calls += 1
+        return {symbol: CandleFrame.from_rows(self.rows[-limit:]) for symbol in symbols}
+
+
+def test_ring_wraps_and_returns_zero_copy_views():
+    ring = CandleRing(capacity=8)
+    ring.append(CandleCache.klines_to_array(make_klines(0, 20)))
+
+    view = ring.view(5)
+    assert list(view[:, 0]) == [i * MINUTE for i in range(15, 20)]
+    assert np.shares_memory(view, ring.data)
+    assert len(ring.view()) == 8
+
+
+def test_ring_upserts_existing_candle_and_detects_gap():
+    ring = CandleRing(capacity=8)
+    ring.append(CandleCache.klines_to_array(make_klines(0, 10)))
+
+    updated = make_klines(9, 1)
+    updated[0][4] = 999.0
+    assert ring.append(CandleCache.klines_to_array(updated))
+    assert ring.view(1)[0, 4] == 999.0
+    assert ring.size == 8
+
+    # 보관 중인 구간 사이에 없던 캔들 → 다시 채워야 함
+    missing = make_klines(5, 1)
+    missing[0][0] += 30 * 1000
+    assert not ring.append(CandleCache.klines_to_array(missing))
+
+
+def test_get_many_counts_hits_and_misses_and_applies_saves():
+    db = FakeDatabase(make_klines(0, 100))
+    cache = CandleCache(capacity=64)
+
+    first = cache.get_many(db, ['BTCUSDT', 'ETHUSDT'], '1m', 10)
+    assert cache.misses == 2 and db.bulk_calls == 1
+    assert first['BTCUSDT'][-1, 0] == 99 * MINUTE
+
+    cache.update('BTCUSDT', '1m', make_klines(100, 2))
+    second = cache.get_many(db, ['BTCUSDT', 'ETHUSDT'], '1m', 10)
+    assert cache.hits == 2 and db.bulk_calls == 1
+    assert second['BTCUSDT'][-1, 0] == 101 * MINUTE
+    assert second['ETHUSDT'][-1, 0] == 99 * MINUTE
+    assert cache.stats()['memory_mb'] >= 0
+
+    # 넘겨준 캔들은 이후 진행 중 캔들 upsert의 영향을 받지 않음
+    updated = make_klines(101, 1)
+    updated[0][4] = 999.0
+    cache.update('BTCUSDT', '1m', updated)
+    assert second['BTCUSDT'][-1, 4] != 999.0
+    assert cache.get('BTCUSDT', '1m', 1)[-1, 4] == 999.0
+
+
+def test_filters_give_same_result_on_cache_views():
+    klines = make_klines(0, 60, spikes=(40, 48, 54))
+    rows = to_rows(klines)
+    db = FakeDatabase(klines)
+    view = CandleCache(capacity=128).get_many(db, ['BTCUSDT'], '1m', 45)['BTCUSDT']
+    filter_obj = Filter()
+
+    expected = filter_obj._high_volume_spike_filter(rows[-45:], 'BTCUSDT', None, '1m', 14, 30, 3.0, 3)
+    assert expected
+    assert filter_obj._high_volume_spike_filter(view, 'BTCUSDT', None, '1m', 14, 30, 3.0, 3) == expected
+
+    expected = filter_obj._three_step_surge_filter(rows[-45:], 'BTCUSDT', 1.0, 14, 30, 0.5)
+    assert filter_obj._three_step_surge_filter(view, 'BTCUSDT', 1.0, 14, 30, 0.5) == expected
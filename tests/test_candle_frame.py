@@ -0,0 +1,79 @@
+"""
+CandleFrame (컬럼형 캔들) 테스트
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from core.candle_frame import CandleFrame
+from core.resampler import datetime_to_ms, ms_to_datetime
+from core.storage import create_candle_database
+from service.filter import Filter
+from tests.test_sqlite_database import make_klines
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+MINUTE = 60 * 1000
+
+
+def test_from_rows_converts_once_and_sorts_ascending():
+    rows = [(ms_to_datetime(i * MINUTE), Decimal('1.5'), Decimal('2'), Decimal('1'), Decimal('1.75'), Decimal(i), None)
+            for i in range(5)]
+    frame = CandleFrame.from_rows(rows[::-1])
+
+    assert list(frame.open_time) == [i * MINUTE for i in range(5)]
+    assert frame.open_time.dtype == np.int64
+    assert frame.close.flags['C_CONTIGUOUS'] and frame.volume.flags['C_CONTIGUOUS']
+    assert list(frame.volume) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert frame.quote_volume[0] == 0.0
+    assert frame.latest_open_time == 4 * MINUTE
+    assert frame.to_rows()[0] == (ms_to_datetime(0), 1.5, 2.0, 1.0, 1.75, 0.0, 0.0)
+
+
+def test_slices_share_memory_and_between_uses_inclusive_bounds():
+    frame = CandleFrame.from_klines(make_random_klines(0, count=50))
+
+    tail = frame[-10:]
+    assert isinstance(tail, CandleFrame) and len(tail) == 10
+    assert np.shares_memory(tail.data, frame.data)
+    assert frame[-1, 0] == 49 * MINUTE and frame[3][0] == 3 * MINUTE
+
+    selected = frame.between(ms_to_datetime(10 * MINUTE), ms_to_datetime(20 * MINUTE))
+    assert list(selected.open_time) == [i * MINUTE for i in range(10, 21)]
+    assert frame.index_range(10 * MINUTE + 1, 11 * MINUTE - 1) == (11, 11)
+    assert len(frame.between(100 * MINUTE, 200 * MINUTE)) == 0
+
+
+def test_time_range_filter_same_result_for_rows_and_frame():
+    filter_obj = Filter()
+    found = 0
+    for seed in range(20):
+        rows = to_rows(make_random_klines(seed, count=120))
+        # 시간대는 KST 입력 (UTC + 9시간)
+        start = ms_to_datetime(30 * MINUTE) + timedelta(hours=9)
+        end = ms_to_datetime(110 * MINUTE) + timedelta(hours=9)
+        args = (f"SYM{seed}", 1.5, 14, 30, 1.0)
+        expected = filter_obj._three_step_surge_filter(rows, *args, start_time=start, end_time=end)
+        assert filter_obj._three_step_surge_filter(CandleFrame.from_rows(rows), *args, start_time=start, end_time=end) == expected
+        found += bool(expected)
+    assert found > 0
+
+
+def test_database_returns_frames(tmp_path):
+    db = create_candle_database(storage_config={'backend': 'sqlite', 'path': str(tmp_path / 'candles.db')})
+    start_ms = datetime_to_ms(datetime.utcnow()) // MINUTE * MINUTE - 20 * MINUTE
+    db.save_candles('BTCUSDT', '1m', make_klines(start_ms, 20))
+
+    frame = db.get_candle_frame('BTCUSDT', '1m', limit=5)
+    assert list(frame.open_time) == [start_ms + i * MINUTE for i in range(15, 20)]
+    assert frame.to_rows() == [tuple(float(v) if i else v for i, v in enumerate(row))
+                               for row in db.get_candles('BTCUSDT', '1m', limit=5)]
+
+    frames = db.get_candle_frames_bulk(['BTCUSDT', 'ETHUSDT'], '1m', limit=5)
+    assert len(frames['ETHUSDT']) == 0
+    assert np.array_equal(frames['BTCUSDT'], frame)
+
+    between = db.get_candle_frame_between('BTCUSDT', '1m', ms_to_datetime(start_ms), ms_to_datetime(start_ms + 2 * MINUTE))
+    assert len(between) == 3
+    db.close()
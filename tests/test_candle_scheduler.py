@@ -0,0 +1,69 @@
+"""
+캔들 마감 기준 스케줄 테스트
+"""
+import json
+from datetime import datetime, timezone
+
+from core.candle_scheduler import build_filter_schedules, next_close_time
+from tests.test_filter_registry import FakeDatabase, make_scanner
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+def test_next_close_time_aligns_to_utc_candle_close_plus_delay():
+    now = datetime(2024, 1, 1, 10, 7, 30, tzinfo=timezone.utc)
+    assert next_close_time('5m', now=now, delay_seconds=3) == datetime(2024, 1, 1, 10, 10, 3, tzinfo=timezone.utc)
+    assert next_close_time('1h', now=now) == datetime(2024, 1, 1, 11, 0, tzinfo=timezone.utc)
+    # 마감 직후 delay 안이면 이번 마감 + delay
+    just_closed = datetime(2024, 1, 1, 10, 10, 1, tzinfo=timezone.utc)
+    assert next_close_time('5m', now=just_closed, delay_seconds=3) == datetime(2024, 1, 1, 10, 10, 3, tzinfo=timezone.utc)
+
+
+def test_build_filter_schedules_skips_disabled_filters():
+    now = datetime(2024, 1, 1, 10, 7, 30, tzinfo=timezone.utc)
+    schedules = build_filter_schedules([
+        {'types': '3step_surge', 'interval': '5m'},
+        {'types': 'high_volume_spike', 'interval': '15m', 'enable': False},
+        {'types': 'custom', 'interval': '1h'},
+    ], delay_seconds=3, now=now)
+    assert [(s.filter_type, s.interval_seconds) for s in schedules] == [('3step_surge', 300), ('custom', 3600)]
+    assert schedules[1].first_run == datetime(2024, 1, 1, 11, 0, 3, tzinfo=timezone.utc)
+
+
+def test_scan_filter_refreshes_only_its_timeframes_and_keeps_other_results(tmp_path):
+    filters = [
+        {'types': '3step_surge', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 1.5, 'range_multiplier': 1.0},
+        {'types': 'high_volume_spike', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 2.0, 'spike_threshold': 2},
+    ]
+    scanner = make_scanner(tmp_path, filters)
+    symbols = [f"SYM{seed}USDT" for seed in range(12)]
+    db = FakeDatabase({symbol: to_rows(make_random_klines(seed, count=60)) for seed, symbol in enumerate(symbols)})
+    updated = []
+
+    class FakeDownloader:
+        def __init__(self):
+            self.db = db
+
+        def get_all_usdt_symbols(self, limit=None):
+            return symbols
+
+        def get_market_cap(self, symbol):
+            return None
+
+        def close(self):
+            pass
+
+    scanner._create_downloader = FakeDownloader
+    scanner._update_data = lambda downloader, symbols, timeframes, on_symbol_done=None: updated.append(list(timeframes))
+
+    scanner.scan_filter('high_volume_spike')
+    scanner.scan_filter('3step_surge')
+    assert updated == [['1m'], ['1m']]
+    assert set(scanner.filter_results) == {'3step_surge', 'high_volume_spike'}
+
+    with open(scanner.result_file, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    saved_filters = {item['filter'] for group in saved['surge_coins'] for item in group['symbols']}
+    expected = {name for name, results in scanner.filter_results.items() if results}
+    assert saved_filters == expected
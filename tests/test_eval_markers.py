@@ -0,0 +1,110 @@
+"""
+incremental 스캔 (마지막 평가 캔들 표시) 테스트
+"""
+from core.eval_markers import EvaluationMarkers, current_open_time, stale_pairs
+from service.filter_registry import FilterContext
+from tests.test_filter_registry import FakeDatabase, FakeDownloader, make_scanner
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+MINUTE = 60_000
+
+
+class WatermarkDatabase(FakeDatabase):
+    def __init__(self, candle_sets, latest):
+        super().__init__(candle_sets)
+        self.latest = latest
+        self.requested = []
+
+    def get_watermark(self, symbol, timeframe):
+        return (self.latest[symbol], 100) if symbol in self.latest else None
+
+    def get_candle_frames_bulk(self, symbols, timeframe, limit=100):
+        self.requested.append(list(symbols))
+        return super().get_candle_frames_bulk(symbols, timeframe, limit=limit)
+
+
+def test_stale_pairs_only_includes_pairs_behind_the_current_candle():
+    now_ms = 10 * 60 * MINUTE + 7 * MINUTE
+    assert current_open_time('5m', now_ms) == 10 * 60 * MINUTE + 5 * MINUTE
+    db = WatermarkDatabase({}, {'BTCUSDT': 10 * 60 * MINUTE + 5 * MINUTE, 'ETHUSDT': 10 * 60 * MINUTE})
+    pairs = stale_pairs(db, ['BTCUSDT', 'ETHUSDT', 'NEWUSDT'], ['5m', '1h'], now_ms=now_ms)
+    # 1h는 10:00 캔들이 진행 중 → 둘 다 최신
+    assert pairs == [('ETHUSDT', '5m'), ('NEWUSDT', '5m'), ('NEWUSDT', '1h')]
+
+
+def test_markers_carry_results_until_watermark_moves():
+    db = WatermarkDatabase({}, {'BTCUSDT': 1000, 'ETHUSDT': 1000})
+    markers = EvaluationMarkers()
+    stale, carried = markers.split(db, ['BTCUSDT', 'ETHUSDT'], '5m', 'f')
+    assert stale == ['BTCUSDT', 'ETHUSDT'] and carried == {}
+    markers.record(db, stale, '5m', 'f', {'BTCUSDT': '2024-01-01 00:00:00'})
+
+    db.latest['ETHUSDT'] = 2000
+    stale, carried = markers.split(db, ['BTCUSDT', 'ETHUSDT'], '5m', 'f')
+    assert stale == ['ETHUSDT'] and carried == {'BTCUSDT': '2024-01-01 00:00:00'}
+    # 다른 필터는 따로 표시
+    assert markers.peek(db, ['BTCUSDT'], '5m', 'g') == ['BTCUSDT']
+    assert markers.stats()['carried'] == 1
+
+
+def test_incremental_scan_reevaluates_only_symbols_with_new_candles(tmp_path):
+    filters = [
+        {'types': '3step_surge', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 1.5, 'range_multiplier': 1.0},
+        {'types': 'high_volume_spike', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 2.0, 'spike_threshold': 2},
+    ]
+    scanner = make_scanner(tmp_path, filters)
+    symbols = [f"SYM{seed}USDT" for seed in range(12)]
+    db = WatermarkDatabase({symbol: to_rows(make_random_klines(seed, count=60)) for seed, symbol in enumerate(symbols)},
+                           {symbol: 1000 for symbol in symbols})
+    triggered = {config['types']: config for config in filters}
+    context = FilterContext(scanner._create_filter(), FakeDownloader(db), None, scanner.logger)
+
+    def run():
+        return scanner._filter_symbols(context, symbols, triggered)
+
+    full = run()
+    assert full
+
+    scanner.eval_markers = EvaluationMarkers()
+    assert run() == full
+    db.requested.clear()
+    # 새 캔들이 없으면 캔들 조회 없이 같은 결과
+    assert run() == full
+    assert db.requested == []
+
+    db.latest['SYM3USDT'] = 2000
+    assert run() == full
+    assert db.requested == [['SYM3USDT']]
+    assert scanner.eval_markers.stats()['evaluated'] == len(symbols) * 2 + 2
+
+
+def test_watermark_moving_during_candle_load_is_evaluated_next_run(tmp_path):
+    filters = [
+        {'types': '3step_surge', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 1.5, 'range_multiplier': 1.0},
+    ]
+    scanner = make_scanner(tmp_path, filters)
+    scanner.eval_markers = EvaluationMarkers()
+    symbols = [f"SYM{seed}USDT" for seed in range(4)]
+    db = WatermarkDatabase({symbol: to_rows(make_random_klines(seed, count=60)) for seed, symbol in enumerate(symbols)},
+                           {symbol: 1000 for symbol in symbols})
+    triggered = {config['types']: config for config in filters}
+    context = FilterContext(scanner._create_filter(), FakeDownloader(db), None, scanner.logger)
+    scanner._filter_symbols(context, symbols, triggered)
+
+    # SYM3만 새 캔들 → 조회하는 동안 SYM1에도 새 캔들이 저장됨
+    db.latest['SYM3USDT'] = 2000
+    load = db.get_candle_frames_bulk
+
+    def load_and_save(symbols, timeframe, limit=100):
+        db.latest['SYM1USDT'] = 2000
+        return load(symbols, timeframe, limit=limit)
+
+    db.get_candle_frames_bulk = load_and_save
+    scanner._filter_symbols(context, symbols, triggered)
+    assert db.requested[-1] == ['SYM3USDT']
+    # 조회하지 않은 SYM1은 평가/기록하지 않고 다음 실행에서 평가
+    assert scanner.eval_markers.peek(db, symbols, '1m', '3step_surge') == ['SYM1USDT']
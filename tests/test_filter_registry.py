@@ -0,0 +1,104 @@
+"""
+필터 플러그인 레지스트리 테스트
+"""
+import json
+import logging
+
+from core.candle_frame import CandleFrame
+from core.scanner import SurgeScanner
+from service.filter import Filter
+from service.filter_registry import (FILTER_REGISTRY, REQUIRED, FilterContext, FilterPlugin, get_filter_plugin,
+                                     register_filter)
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+@register_filter
+class LastBullishPlugin(FilterPlugin):
+    """테스트용: 마지막 캔들이 양봉이면 발견"""
+    name = 'test_last_bullish'
+    schema = {
+        'lookback_candles': (int, REQUIRED),
+    }
+
+    def lookback(self, params):
+        return params['lookback_candles']
+
+    def run(self, context, candle_set, symbols, timeframe, params):
+        results = {}
+        for symbol in symbols:
+            candles = candle_set.get(symbol, [])
+            if len(candles) and candles[-1][4] > candles[-1][1]:
+                results[symbol] = f"{timeframe}:{len(candles)}"
+        return results
+
+
+class FakeDatabase:
+    def __init__(self, candle_sets):
+        self.candle_sets = candle_sets
+        self.bulk_calls = []
+
+    def get_candle_frames_bulk(self, symbols, timeframe, limit=100):
+        self.bulk_calls.append((timeframe, limit))
+        return {symbol: CandleFrame.from_rows(self.candle_sets[symbol][-limit:]) for symbol in symbols}
+
+
+class FakeDownloader:
+    def __init__(self, db):
+        self.db = db
+
+
+def make_scanner(tmp_path, filters):
+    config = {
+        'scanner': {'symbol_limit': None, 'batch_size': 10, 'keep_candles': 1000},
+        'tot_timeframes': ['1m', '5m'],
+        'filter': filters,
+    }
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps(config), encoding='utf-8')
+    return SurgeScanner({}, result_file=str(tmp_path / 'results.json'), history_file=str(tmp_path / 'history.json'),
+                        config_file=str(config_file))
+
+
+def test_builtin_plugins_validate_schema():
+    plugin = get_filter_plugin('3step_surge')
+    config = {'types': '3step_surge', 'using_timeframe': ['5m'], 'interval': '5m', 'period': 14, 'window': 30,
+              'volume_range_multiplier': 1.5, 'range_multiplier': 2}
+    assert plugin.validate(config) == []
+    assert plugin.params(config)['strong_candle_count'] == 0
+    assert plugin.lookback(plugin.params(config)) == 45
+
+    errors = plugin.validate({**config, 'period': '14', 'window': True, 'range_multiplier': None})
+    assert len(errors) == 3
+    assert get_filter_plugin('high_volume_spike').validate({'types': 'high_volume_spike'})
+    assert 'test_last_bullish' in FILTER_REGISTRY
+
+
+def test_scanner_loads_candles_once_and_runs_registered_plugins(tmp_path):
+    filters = [
+        {'types': 'test_last_bullish', 'using_timeframe': ['1m'], 'interval': '1m', 'lookback_candles': 60},
+        {'types': 'high_volume_spike', 'using_timeframe': ['1m'], 'interval': '5m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 2.0, 'spike_threshold': 2},
+    ]
+    scanner = make_scanner(tmp_path, filters)
+    symbols = [f"SYM{seed}USDT" for seed in range(20)]
+    db = FakeDatabase({symbol: to_rows(make_random_klines(seed, count=80)) for seed, symbol in enumerate(symbols)})
+    triggered = {filter_config['types']: filter_config for filter_config in filters}
+
+    # 같은 시간봉은 가장 긴 lookback으로 한 번만 조회
+    candle_sets = scanner._load_filter_candles(FakeDownloader(db), symbols, triggered)
+    assert db.bulk_calls == [('1m', 60)]
+
+    context = FilterContext(Filter(), None, None, logging.getLogger('test'))
+    surge_symbols = scanner._run_filters(context, symbols, triggered, candle_sets)
+
+    expected = []
+    legacy = Filter()
+    for symbol in symbols:
+        candles = candle_sets['1m'][symbol]
+        if candles[-1][4] > candles[-1][1]:
+            expected.append((symbol, 'test_last_bullish', '1m:60'))
+        spike_time = legacy._high_volume_spike_filter(candles[-45:], symbol, None, '1m', 14, 30, 2.0, 2)
+        if spike_time:
+            expected.append((symbol, 'high_volume_spike', spike_time))
+    assert [(item['symbol'], item['filter'], item['time']) for item in surge_symbols] == expected
+    assert expected
@@ -0,0 +1,84 @@
+"""
+지표 상태 (거래량 이동평균, ATR) 테스트
+"""
+import pytest
+
+from core.candle_cache import CandleCache
+from core.indicators import IndicatorState, IndicatorStore, to_indicator_rows
+from core.mmap_store import MmapCandleStore
+from service.filter import Filter
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+def test_incremental_sma_and_atr_match_full_recompute():
+    klines = make_random_klines(3, count=120)
+    state = IndicatorState(period=14, window=30)
+    for kline in klines:
+        # 진행 중 캔들이 여러 번 갱신되는 경우
+        partial = list(kline)
+        partial[5] = kline[5] / 2
+        assert state.update(to_indicator_rows([partial]))
+        assert state.update(to_indicator_rows([kline]))
+
+    rows = to_rows(klines)
+    expected_sma = sum(float(row[5]) for row in rows[-15:-1]) / 14
+    assert state.volume_sma == pytest.approx(expected_sma, rel=1e-12)
+    assert state.atr == pytest.approx(Filter()._calcualte_average_true_range(rows, period=14), rel=1e-12)
+    assert state.last_close == klines[-2][4]
+    assert state.ready
+
+
+def test_spike_filter_from_state_matches_candle_filter():
+    legacy = Filter()
+    found = 0
+    for seed in range(30):
+        klines = make_random_klines(seed, count=60)
+        rows = to_rows(klines)
+
+        store = IndicatorStore()
+        store.track('1m', 14, 30)
+        # 앞부분으로 만든 뒤 나머지는 저장 이벤트로 갱신
+        store.build('TESTUSDT', '1m', 14, rows[:40])
+        store.update('TESTUSDT', '1m', klines[39:])
+        state = store.get('TESTUSDT', '1m', 14)
+
+        for threshold in (1, 2, 3):
+            expected = legacy._high_volume_spike_filter(rows[-45:], 'TESTUSDT', None, '1m', 14, 30, 2.0, threshold)
+            assert legacy._high_volume_spike_state_filter(state, 'TESTUSDT', 2.0, threshold) == expected
+            found += bool(expected)
+    assert found > 0
+
+
+def test_out_of_order_candles_drop_state():
+    klines = make_random_klines(0, count=50)
+    store = IndicatorStore()
+    store.track('1m', 14, 30)
+    store.build('TESTUSDT', '1m', 14, to_rows(klines))
+
+    # 없는 상태는 무시, 이전 캔들이 들어오면 다시 만들도록 삭제
+    store.update('OTHERUSDT', '1m', klines[-1:])
+    store.update('TESTUSDT', '1m', klines[10:11])
+    assert store.get('TESTUSDT', '1m', 14) is None
+    assert store.stats()['invalidations'] == 1
+
+
+def test_rebuild_from_mmap_store(tmp_path):
+    klines = make_random_klines(5, count=80)
+    candle_store = MmapCandleStore(directory=str(tmp_path), capacity=128)
+    candle_store.append('TESTUSDT', '1m', klines)
+    candle_store.append('TESTUSDT', '5m', klines)
+
+    # 재시작: 파일만 다시 열어서 상태 만들기
+    reopened = MmapCandleStore(directory=str(tmp_path), capacity=128)
+    reopened.open_all()
+    store = IndicatorStore()
+    store.track('1m', 14, 30)
+    assert store.rebuild_from_store(reopened) == 1
+
+    rebuilt = store.get('TESTUSDT', '1m', 14)
+    expected = IndicatorState(14, 30)
+    expected.update(to_indicator_rows(CandleCache.klines_to_array(klines)))
+    # running sum을 시작한 위치가 달라서 평균은 마지막 자리 반올림까지 같지는 않음
+    assert [entry[:3] for entry in rebuilt.recent()] == [entry[:3] for entry in expected.recent()]
+    assert [entry[3] for entry in rebuilt.recent()] == pytest.approx([entry[3] for entry in expected.recent()])
+    assert rebuilt.atr == pytest.approx(expected.atr)
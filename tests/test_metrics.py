@@ -0,0 +1,68 @@
+"""
+Prometheus 메트릭 테스트
+"""
+import threading
+
+from core import metrics, profiler
+from core.metrics import Counter, Gauge, Histogram
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = []
+    requests = Counter('test_requests_total', '요청 수', ['filter'], registry=registry)
+    used = Gauge('test_used_weight', '사용 weight', registry=registry)
+    latency = Histogram('test_latency_seconds', '시간', buckets=(0.1, 1.0), registry=registry)
+
+    requests.labels('3step_surge').inc(2)
+    requests.labels('say "hi"').inc()
+    used.labels().set(120)
+    for seconds in (0.05, 0.5, 3.0):
+        latency.labels().observe(seconds)
+
+    lines = metrics.render(registry).splitlines()
+    assert '# TYPE test_requests_total counter' in lines
+    assert 'test_requests_total{filter="3step_surge"} 2' in lines
+    assert 'test_requests_total{filter="say \\"hi\\""} 1' in lines
+    assert 'test_used_weight 120' in lines
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum 3.55' in lines
+    assert 'test_latency_seconds_count 3' in lines
+
+
+def test_profiler_measurements_feed_metrics_without_a_profile():
+    before = metrics.FILTER_MATCHES.labels('metrics_test').value
+    profiler.count('filter_matches:metrics_test', 3)
+    profiler.count('binance_requests')
+    profiler.observe('db_query', 0.002)
+    with profiler.phase('metrics_test_phase'):
+        pass
+    assert metrics.FILTER_MATCHES.labels('metrics_test').value == before + 3
+    text = metrics.render()
+    assert 'coinalarm_scan_phase_seconds_count{phase="metrics_test_phase"} 1' in text
+    # 빈 단계도 ms 단위 구간에 들어감
+    assert 'coinalarm_scan_phase_seconds_bucket{phase="metrics_test_phase",le="0.001"} 1' in text
+    assert 'coinalarm_db_query_seconds_count' in text
+
+
+def test_render_while_other_threads_update():
+    registry = []
+    latency = Histogram('test_concurrent_seconds', '시간', ['worker'], registry=registry)
+    stop = threading.Event()
+
+    def work(worker):
+        while not stop.is_set():
+            latency.labels(worker).observe(0.01)
+
+    threads = [threading.Thread(target=work, args=(str(i),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(50):
+            assert metrics.render(registry).startswith('# HELP test_concurrent_seconds')
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert sum(value.count for value in latency._values.values()) > 0
@@ -0,0 +1,93 @@
+"""
+메모리 맵 캔들 저장소 테스트
+"""
+import numpy as np
+
+from core.candle_cache import CandleCache
+from core.candle_frame import CandleFrame
+from core.mmap_store import MmapCandleStore
+
+
+MINUTE = 60 * 1000
+
+
+def make_klines(start, count):
+    return [[i * MINUTE, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0 + i, (i + 1) * MINUTE - 1, 1000.0 + i]
+            for i in range(start, start + count)]
+
+
+def test_reopen_keeps_candles_and_updates_last(tmp_path):
+    store = MmapCandleStore(directory=str(tmp_path), capacity=16)
+    store.append('BTCUSDT', '1m', make_klines(0, 10))
+    updated = make_klines(9, 1)
+    updated[0][4] = 555.0
+    store.append('BTCUSDT', '1m', updated)
+    store.flush()
+
+    # 재시작
+    reopened = MmapCandleStore(directory=str(tmp_path), capacity=16)
+    assert reopened.open_all() == {('BTCUSDT', '1m'): (9 * MINUTE, 10)}
+    view = reopened.get('BTCUSDT', '1m', 3)
+    assert list(view[:, 0]) == [7 * MINUTE, 8 * MINUTE, 9 * MINUTE]
+    assert view[-1, 4] == 555.0
+
+
+def test_full_file_keeps_latest_half(tmp_path):
+    store = MmapCandleStore(directory=str(tmp_path), capacity=8)
+    store.append('ETHUSDT', '5m', make_klines(0, 11))
+
+    view = store.get('ETHUSDT', '5m', None)
+    assert list(view[:, 0]) == [i * MINUTE for i in range(4, 11)]
+
+
+def test_load_into_cache(tmp_path):
+    store = MmapCandleStore(directory=str(tmp_path), capacity=32)
+    store.append('BTCUSDT', '1m', make_klines(0, 20))
+    cache = CandleCache(capacity=16)
+
+    assert store.load_into(cache, {'1m'}) == 1
+    assert np.array_equal(cache.get('BTCUSDT', '1m', 5), store.get('BTCUSDT', '1m', 5))
+
+
+class FakeDatabase:
+    """get_candle_frame / get_candle_frames_bulk / get_watermark만 있는 DB"""
+
+    def __init__(self, klines):
+        self.rows = CandleCache.klines_to_array(klines)
+
+    def get_candle_frame(self, symbol, timeframe, limit=100):
+        return CandleFrame(self.rows[-limit:], assume_sorted=True)
+
+    def get_candle_frames_bulk(self, symbols, timeframe, limit=100):
+        return {symbol: self.get_candle_frame(symbol, timeframe, limit) for symbol in symbols}
+
+    def get_watermark(self, symbol, timeframe):
+        return int(self.rows[-1, 0]), len(self.rows)
+
+
+def test_new_file_is_seeded_from_db(tmp_path):
+    store = MmapCandleStore(directory=str(tmp_path), capacity=64)
+    store.append('BTCUSDT', '1m', make_klines(38, 2), db=FakeDatabase(make_klines(0, 40)))
+
+    assert list(store.get('BTCUSDT', '1m', 30)[:, 0]) == [i * MINUTE for i in range(10, 40)]
+
+
+def test_get_many_falls_back_to_db_for_short_files(tmp_path):
+    store = MmapCandleStore(directory=str(tmp_path), capacity=64)
+    store.append('BTCUSDT', '1m', make_klines(38, 2))
+    db = FakeDatabase(make_klines(0, 40))
+
+    frames = store.get_many(['BTCUSDT', 'ETHUSDT'], '1m', 30, db=db)
+    assert len(frames['BTCUSDT']) == 30
+    assert len(frames['ETHUSDT']) == 30
+    assert len(store.get_many(['BTCUSDT'], '1m', 30)['BTCUSDT']) == 2
+
+
+def test_failed_seed_read_does_not_fail_the_save(tmp_path):
+    class BrokenDatabase:
+        def get_candle_frame(self, symbol, timeframe, limit=100):
+            raise RuntimeError('closed')
+
+    store = MmapCandleStore(directory=str(tmp_path), capacity=64)
+    assert store.append('BTCUSDT', '1m', make_klines(38, 2), db=BrokenDatabase()) == 2
+    assert len(store.get('BTCUSDT', '1m', 30)) == 2
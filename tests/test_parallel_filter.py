@@ -0,0 +1,63 @@
+"""
+프로세스 풀 병렬 필터 테스트 (현재 프로세스에서 실행한 결과와 같은지)
+"""
+import logging
+
+import numpy as np
+
+from core.candle_frame import CandleFrame
+from service.filter import Filter
+from service.filter_registry import FilterContext, get_filter_plugin, load_filter_plugins
+from service.parallel_filter import FilterPool
+from tests.test_vectorized_filter import make_random_klines
+
+
+def make_candle_set(symbol_count, count):
+    candle_set = {f"SYM{seed}USDT": CandleFrame.from_klines(make_random_klines(seed, count=count))
+                  for seed in range(symbol_count)}
+    # 캔들이 부족한 심볼 (현재 프로세스에서 실행)
+    candle_set['SHORTUSDT'] = CandleFrame.from_klines(make_random_klines(99, count=20))
+    return candle_set
+
+
+def test_pool_matches_in_process_run():
+    candle_set = make_candle_set(24, count=45)
+    symbols = list(candle_set)
+    context = FilterContext(Filter(), None, None, logging.getLogger('test'))
+    configs = [
+        {'types': '3step_surge', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 1.5, 'range_multiplier': 1.0},
+        {'types': 'high_volume_spike', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 2.0, 'spike_threshold': 2},
+        {'types': 'test_last_bullish', 'using_timeframe': ['1m'], 'interval': '1m', 'lookback_candles': 45},
+    ]
+
+    # 테스트용 플러그인 모듈은 작업 프로세스에서도 import
+    plugin_modules = ['tests.test_filter_registry']
+    load_filter_plugins(plugin_modules)
+    pool = FilterPool(workers=2, plugin_modules=plugin_modules)
+    try:
+        with pool.share({'1m': candle_set}) as shared:
+            for config in configs:
+                plugin = get_filter_plugin(config['types'])
+                params = plugin.params(config)
+                expected = plugin.run(context, candle_set, symbols, '1m', params)
+                assert pool.run(context, plugin, shared, '1m', symbols, params) == expected
+                assert expected
+        assert pool.stats()['shards'] == 6
+        assert pool.stats()['local_symbols'] == 3
+        # with 블록이 끝나면 공유 메모리 해제
+        assert shared.blocks == {}
+    finally:
+        pool.close()
+
+
+def test_shared_block_is_right_aligned():
+    candle_set = make_candle_set(2, count=30)
+    with FilterPool(workers=1).share({'5m': candle_set}) as shared:
+        block, shape, index = shared.blocks['5m']
+        data = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        row, count = index['SHORTUSDT']
+        assert shape == (3, 30, 7) and count == 20
+        assert np.array_equal(data[row, 10:], candle_set['SHORTUSDT'].data)
+        del data
@@ -0,0 +1,53 @@
+"""
+24시간 시세 사전 필터 테스트
+"""
+from core.prefilter import TickerPrefilter
+from core.rate_limiter import TICKER_24H_WEIGHT, kline_request_weight
+
+
+SYMBOLS = [f"SYM{i}USDT" for i in range(10)]
+
+
+def tickers(volumes):
+    return {symbol: {'quote_volume': volume, 'price_change_percent': 0.0, 'last_price': 1.0}
+            for symbol, volume in volumes.items()}
+
+
+def test_first_scan_without_history_scans_everything():
+    prefilter = TickerPrefilter(cutoff=0.02, sample_size=2)
+    selected, audit = prefilter.select(SYMBOLS, tickers({symbol: 1000.0 for symbol in SYMBOLS}), timeframes=['5m'])
+    assert selected == SYMBOLS and not audit
+    assert prefilter.finish([])['weight_saved'] == -TICKER_24H_WEIGHT
+
+
+def test_selects_candidates_kept_symbols_and_rotating_sample():
+    prefilter = TickerPrefilter(cutoff=0.02, sample_size=2)
+    prefilter.select(SYMBOLS, tickers({symbol: 1000.0 for symbol in SYMBOLS}))
+    prefilter.finish([])
+
+    volumes = {symbol: 1000.0 for symbol in SYMBOLS}
+    volumes['SYM7USDT'] = 1100.0  # +10%
+    selected, audit = prefilter.select(SYMBOLS, tickers(volumes), keep={'SYM9USDT'}, timeframes=['5m', '1h'])
+    assert not audit
+    assert selected == ['SYM0USDT', 'SYM1USDT', 'SYM7USDT', 'SYM9USDT']
+    report = prefilter.finish([])
+    assert report['skipped_pairs'] == 12
+    assert report['weight_saved'] == 12 * kline_request_weight(500) - TICKER_24H_WEIGHT
+
+    # 다음 샘플은 이어서
+    selected, _ = prefilter.select(SYMBOLS, tickers(volumes))
+    assert selected == ['SYM2USDT', 'SYM3USDT']
+
+
+def test_audit_scan_measures_recall_against_full_scan():
+    prefilter = TickerPrefilter(cutoff=0.02, sample_size=0, audit_every=2)
+    prefilter.select(SYMBOLS, tickers({symbol: 1000.0 for symbol in SYMBOLS}))
+    prefilter.finish([])
+
+    volumes = {symbol: 1000.0 for symbol in SYMBOLS}
+    volumes['SYM1USDT'] = 2000.0
+    selected, audit = prefilter.select(SYMBOLS, tickers(volumes))
+    assert audit and selected == SYMBOLS
+    report = prefilter.finish(['SYM1USDT', 'SYM5USDT'])
+    assert report['missed'] == ['SYM5USDT'] and report['recall'] == 0.5
+    assert prefilter.stats()['recall'] == 0.5
@@ -0,0 +1,94 @@
+"""
+스캔 프로파일링 테스트
+"""
+import json
+import time
+
+from core import profiler
+from core.profiler import Histogram
+from core.scheduler_state import scheduler_info
+from tests.test_filter_registry import FakeDatabase, make_scanner
+from tests.test_vectorized_filter import make_random_klines, to_rows
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram()
+    for seconds in [0.0005, 0.003, 0.003, 0.02, 3.0]:
+        histogram.observe(seconds)
+    result = histogram.to_dict()
+    assert result['count'] == 5
+    assert result['buckets'] == {'<=1ms': 1, '<=5ms': 2, '<=25ms': 1, '<=5000ms': 1}
+    assert result['p50_ms'] == 5.0
+    assert result['max_ms'] == 3000.0
+
+
+def test_measurements_are_ignored_outside_a_profile():
+    assert profiler.current() is None
+    with profiler.phase('x'):
+        profiler.observe('fetch', 0.1, 'BTCUSDT', '5m')
+        profiler.count('db_queries')
+
+
+def test_run_profiled_writes_phases_counters_and_slowest_pairs(tmp_path):
+    profile_file = tmp_path / 'scan_profile.json'
+
+    def work():
+        with profiler.phase('update_data'):
+            profiler.observe('fetch', 0.2, 'BTCUSDT', '5m')
+            profiler.observe('save', 0.01, 'BTCUSDT', '5m')
+            profiler.observe('fetch', 0.05, 'ETHUSDT', '5m')
+            profiler.count('binance_requests', 2)
+        with profiler.phase('filter'):
+            sum(range(1000))
+
+    profile = profiler.run_profiled(work, str(profile_file), slowest=1, use_cprofile=True)
+    assert profiler.current() is None
+    saved = json.loads(profile_file.read_text(encoding='utf-8'))
+    assert set(saved['phases']) == {'update_data', 'filter'}
+    assert saved['counters'] == {'binance_requests': 2}
+    assert saved['histograms']['fetch']['count'] == 2
+    assert saved['slowest_pairs'] == [{'symbol': 'BTCUSDT', 'timeframe': '5m', 'fetch_ms': 200.0, 'save_ms': 10.0,
+                                       'total_ms': 210.0}]
+    assert saved['cprofile'] and (tmp_path / 'scan_profile.prof').exists()
+    assert profile.wall_sec >= 0
+
+
+def test_scan_writes_profile_next_to_results(tmp_path):
+    filters = [
+        {'types': 'high_volume_spike', 'using_timeframe': ['1m'], 'interval': '1m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 2.0, 'spike_threshold': 2},
+    ]
+    scanner = make_scanner(tmp_path, filters)
+    scanner.config['profiling'] = {'enable': True}
+    symbols = [f"SYM{seed}USDT" for seed in range(5)]
+    db = FakeDatabase({symbol: to_rows(make_random_klines(seed, count=60)) for seed, symbol in enumerate(symbols)})
+
+    class FakeDownloader:
+        def __init__(self):
+            self.db = db
+
+        def get_all_usdt_symbols(self, limit=None):
+            return symbols
+
+        def get_market_cap(self, symbol):
+            return None
+
+        def close(self):
+            pass
+
+    scanner._create_downloader = FakeDownloader
+    scanner._update_data = lambda downloader, symbols, timeframes, on_symbol_done=None: time.sleep(0.01)
+    scheduler_info.pop('high_volume_spike', None)
+    scanner.scan()
+
+    saved = json.loads((tmp_path / 'scan_profile.json').read_text(encoding='utf-8'))
+    assert {'symbols', 'update_data', 'filter', 'load_candles', 'save_results'} <= set(saved['phases'])
+    assert saved['phases']['update_data'] >= 0.01
+    assert saved['counters']['filter_evaluations:high_volume_spike'] == len(symbols)
+    assert scanner.last_profile['wall_sec'] == saved['wall_sec']
+
+    # 캔들 마감 기준 필터 1개 실행도 같은 방식으로 프로파일링
+    scanner.scan_filter('high_volume_spike')
+    saved = json.loads((tmp_path / 'scan_profile_high_volume_spike.json').read_text(encoding='utf-8'))
+    assert {'symbols', 'update_data', 'filter', 'save_results'} <= set(saved['phases'])
+    assert scanner.last_profile['wall_sec'] == saved['wall_sec']
@@ -0,0 +1,146 @@
+"""
+WeightRateLimiter / KlineFetcher 테스트
+
+로컬 HTTP 서버가 바이낸스 선물 API 흉내를 내면서
+X-MBX-USED-WEIGHT-1M 헤더와 429/418 응답을 돌려줌
+"""
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from core.fetcher import KlineFetcher, FetchJob
+from core.rate_limiter import WeightRateLimiter, kline_request_weight
+
+
+KLINE = [1700000000000, "1.0", "2.0", "0.5", "1.5", "10.0", 1700000059999, "15.0"]
+
+
+class StubBinanceServer:
+    """/fapi/v1/klines 요청에 미리 정한 응답을 순서대로 돌려주는 서버"""
+
+    def __init__(self):
+        self.responses = []  # (status, body, headers) 큐, 비면 정상 응답
+        self.used_weight = 10
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    stub.request_count += 1
+                    if stub.responses:
+                        status, body, headers = stub.responses.pop(0)
+                    else:
+                        status, body, headers = 200, [KLINE], {}
+                    headers.setdefault('X-MBX-USED-WEIGHT-1M', str(stub.used_weight))
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_port}/fapi'
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubBinanceServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_kline_request_weight():
+    assert kline_request_weight(99) == 1
+    assert kline_request_weight(350) == 2
+    assert kline_request_weight(500) == 5
+    assert kline_request_weight(1000) == 5
+    assert kline_request_weight(1500) == 10
+
+
+def test_acquire_waits_when_bucket_empty():
+    limiter = WeightRateLimiter(weight_per_minute=600, safety_ratio=1.0)  # 초당 10 weight
+    limiter.tokens = 0
+    started = time.monotonic()
+    limiter.acquire(5)
+    assert time.monotonic() - started >= 0.4
+
+
+def test_used_weight_header_is_tracked(stub_server):
+    limiter = WeightRateLimiter(weight_per_minute=2400, safety_ratio=0.9)
+    fetcher = KlineFetcher(max_workers=2, rate_limiter=limiter, base_url=stub_server.base_url)
+
+    stub_server.used_weight = 2000
+    klines = fetcher.fetch(FetchJob('BTCUSDT', '1m', 100, None))
+
+    assert klines == [KLINE]
+    assert limiter.used_weight == 2000
+    # 남은 예산(2160 - 2000)보다 토큰이 많으면 안 됨
+    assert limiter.tokens <= 2160 - 2000
+
+
+def test_budget_exhausted_pauses_until_next_minute():
+    limiter = WeightRateLimiter(weight_per_minute=2400, safety_ratio=0.9)
+    limiter.update_used_weight(2300)
+
+    now = time.time()
+    assert limiter.paused_until > now
+    assert limiter.paused_until == (int(now) // 60 + 1) * 60
+
+
+def test_ban_pauses_all_workers_and_retries(stub_server):
+    limiter = WeightRateLimiter(weight_per_minute=2400)
+    fetcher = KlineFetcher(max_workers=4, rate_limiter=limiter, base_url=stub_server.base_url)
+
+    banned_until = int((time.time() + 1.0) * 1000)
+    stub_server.responses.append((
+        418,
+        {'code': -1003, 'msg': f'Way too many requests; IP banned until {banned_until}.'},
+        {}
+    ))
+
+    started = time.time()
+    results = list(fetcher.fetch_many([FetchJob(f'S{i}USDT', '1m', 100, None) for i in range(4)]))
+    finished = time.time()
+
+    assert all(error is None for _, _, error in results)
+    assert limiter.ban_count == 1
+    assert limiter.paused_until == pytest.approx(banned_until / 1000)
+    # ban 해제 이후에야 나머지 요청이 처리됨
+    assert finished >= banned_until / 1000
+    assert finished - started >= 0.5
+
+
+def test_retry_after_header(stub_server):
+    limiter = WeightRateLimiter(weight_per_minute=2400)
+    fetcher = KlineFetcher(max_workers=1, rate_limiter=limiter, base_url=stub_server.base_url)
+
+    stub_server.responses.append((429, {'code': -1003, 'msg': 'Too many requests.'}, {'Retry-After': '1'}))
+
+    started = time.time()
+    assert fetcher.fetch(FetchJob('BTCUSDT', '1m', 100, None)) == [KLINE]
+    assert time.time() - started >= 0.9
+    assert stub_server.request_count == 2
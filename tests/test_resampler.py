@@ -0,0 +1,80 @@
+"""
+1분봉 → 상위 시간봉 리샘플링 테스트
+"""
+from core.candle_frame import CandleFrame
+from core.resampler import CandleResampler, resample_klines, timeframe_to_ms, ms_to_datetime, datetime_to_ms
+
+
+MINUTE = 60 * 1000
+
+
+def make_1m(start_minute, count):
+    """가격/거래량이 분마다 1씩 오르는 1분봉 생성"""
+    klines = []
+    for i in range(start_minute, start_minute + count):
+        open_time = i * MINUTE
+        klines.append([open_time, str(100 + i), str(101 + i), str(99 + i), str(100.5 + i),
+                       str(i + 1), open_time + MINUTE - 1, str(10 * (i + 1))])
+    return klines
+
+
+class FakeDatabase:
+    """1분봉을 메모리에 보관하는 DB"""
+
+    def __init__(self, klines_1m):
+        self.rows = {
+            kline[0]: (ms_to_datetime(kline[0]), float(kline[1]), float(kline[2]), float(kline[3]),
+                       float(kline[4]), float(kline[5]), float(kline[7]))
+            for kline in klines_1m
+        }
+        self.saved = {}
+
+    def get_candle_frame_between(self, symbol, timeframe, start_time, end_time):
+        start_ms, end_ms = datetime_to_ms(start_time), datetime_to_ms(end_time)
+        return CandleFrame.from_rows([self.rows[t] for t in sorted(self.rows) if start_ms <= t <= end_ms])
+
+    def save_candles(self, symbol, timeframe, klines):
+        for kline in klines:
+            self.saved.setdefault(timeframe, {})[kline[0]] = kline
+        return len(klines)
+
+
+def test_timeframe_to_ms():
+    assert timeframe_to_ms('1m') == MINUTE
+    assert timeframe_to_ms('15m') == 15 * MINUTE
+    assert timeframe_to_ms('1h') == 60 * MINUTE
+    assert timeframe_to_ms('1d') == 1440 * MINUTE
+
+
+def test_resample_ohlcv():
+    candles = resample_klines(make_1m(0, 10), '5m')
+
+    assert len(candles) == 2
+    first = candles[0]
+    assert first[0] == 0
+    assert first[1] == 100.0            # 첫 캔들 시가
+    assert first[2] == 105.0            # 최고가
+    assert first[3] == 99.0             # 최저가
+    assert first[4] == 104.5            # 마지막 캔들 종가
+    assert first[5] == 1 + 2 + 3 + 4 + 5
+    assert first[6] == 5 * MINUTE - 1
+    assert first[7] == 10 * (1 + 2 + 3 + 4 + 5)
+
+
+def test_incomplete_leading_bucket_is_skipped():
+    candles = resample_klines(make_1m(3, 7), '5m')  # 3분부터 시작 → 0~5분 구간은 불완전
+    assert [c[0] for c in candles] == [5 * MINUTE]
+
+
+def test_incremental_update_only_touches_new_buckets():
+    history = make_1m(0, 60)
+    db = FakeDatabase(history)
+    resampler = CandleResampler(db)
+
+    saved = resampler.update('BTCUSDT', history[-3:], ['1m', '5m', '15m'])
+
+    # 57~59분 → 5m은 55분 구간, 15m은 45분 구간만 다시 계산
+    assert saved == {'5m': 1, '15m': 1}
+    assert list(db.saved['5m']) == [55 * MINUTE]
+    assert list(db.saved['15m']) == [45 * MINUTE]
+    assert db.saved['15m'][45 * MINUTE][5] == sum(range(46, 61))
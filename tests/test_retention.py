@@ -0,0 +1,80 @@
+"""
+시간봉별 cutoff 데이터 정리 테스트
+"""
+from datetime import datetime, timedelta
+
+from core.retention import RetentionEngine, retention_cutoffs, datetime_to_to_days, to_days_to_datetime
+from core.resampler import datetime_to_ms, ms_to_datetime
+from core.watermark import WatermarkIndex
+
+
+MINUTE = 60 * 1000
+
+
+class FakeDatabase:
+    """{timeframe: [open_time datetime, ...]}를 메모리에 보관하는 DB"""
+
+    def __init__(self, candles, partitions=None):
+        self.candles = candles
+        self.partitions = partitions or []
+        self.dropped = []
+        self.split = []
+        self.watermarks = WatermarkIndex()
+        self.watermarks.load([('BTCUSDT', '1m', 0, 1)])
+
+    def get_timeframes(self):
+        return list(self.candles)
+
+    def delete_candles_before(self, timeframe, cutoff, limit=5000):
+        expired = [t for t in self.candles[timeframe] if t < cutoff][:limit]
+        for t in expired:
+            self.candles[timeframe].remove(t)
+        return len(expired)
+
+    def get_partitions(self):
+        return self.partitions
+
+    def drop_partitions(self, names):
+        self.dropped.extend(names)
+
+    def split_max_partition(self, max_partition, bounds):
+        self.split.extend(bounds)
+        return [f"p{bound}" for bound in bounds]
+
+
+def test_cutoff_keeps_latest_n_buckets():
+    now_ms = 100 * MINUTE + 30 * 1000
+    cutoffs = retention_cutoffs(['1m', '5m', '1w'], keep_count=10, now_ms=now_ms)
+
+    assert cutoffs['1m'] == 91 * MINUTE    # 91~100분 10개 유지
+    assert cutoffs['5m'] == 55 * MINUTE    # 55~100분 구간 10개 유지
+    assert '1w' not in cutoffs
+
+
+def test_engine_deletes_in_chunks_and_reports():
+    now = datetime(2026, 1, 1, 0, 0)
+    candles = {'1m': [now - timedelta(minutes=i) for i in range(25)]}
+    db = FakeDatabase(candles)
+
+    report = RetentionEngine(db, keep_count=10, chunk_size=4, chunk_pause=0).run(now=now)
+
+    assert len(db.candles['1m']) == 10
+    assert report.deleted == {'1m': 15}
+    assert report.statements == 2 + 4       # 시간봉/파티션 조회 + DELETE 4번 (4+4+4+3)
+    assert not db.watermarks.loaded
+
+
+def test_engine_drops_expired_partitions():
+    now = datetime(2026, 1, 10, 12, 0)
+    day = lambda d: datetime_to_to_days(datetime(2026, 1, d))
+    partitions = [('p20260101', day(2), 100), ('p20260102', day(3), 100), ('p20260109', day(10), 100),
+                  ('pmax', None, 0)]
+    db = FakeDatabase({'1h': []}, partitions)
+
+    report = RetentionEngine(db, keep_count=24 * 3, partition_days_ahead=2, chunk_pause=0).run(now=now)
+
+    # 1h x 72개 → 1월 7일 13시 이전 만료, 1월 1~2일 파티션만 통째로 삭제
+    assert db.dropped == ['p20260101', 'p20260102']
+    assert report.dropped_rows == 200
+    assert db.split == [day(11), day(12), day(13)]
+    assert to_days_to_datetime(day(2)) == datetime(2026, 1, 2)
@@ -0,0 +1,73 @@
+"""
+SQLite 저장소 테스트 (MySQL과 같은 인터페이스)
+"""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.storage import create_candle_database
+from core.resampler import datetime_to_ms
+
+
+MINUTE = 60 * 1000
+
+
+def make_klines(start_ms, count, price=100.0):
+    return [[start_ms + i * MINUTE, str(price + i), str(price + i + 1), str(price + i - 1), str(price + i),
+             str(10 + i), start_ms + (i + 1) * MINUTE - 1, str(1000 + i)] for i in range(count)]
+
+
+def open_db(tmp_path):
+    return create_candle_database(storage_config={'backend': 'sqlite', 'path': str(tmp_path / 'candles.db')})
+
+
+def test_save_and_read_back(tmp_path):
+    db = open_db(tmp_path)
+    now_ms = datetime_to_ms(datetime.utcnow()) // MINUTE * MINUTE
+    start_ms = now_ms - 50 * MINUTE
+
+    assert db.save_candles('BTCUSDT', '1m', make_klines(start_ms, 50)) == 50
+    # 같은 open_time은 업데이트 (upsert)
+    db.save_candles('BTCUSDT', '1m', make_klines(start_ms + 49 * MINUTE, 1, price=500.0))
+
+    candles = db.get_candles('BTCUSDT', '1m', limit=3)
+    assert [datetime_to_ms(c[0]) for c in candles] == [start_ms + i * MINUTE for i in (47, 48, 49)]
+    assert candles[-1][4] == 500.0
+    assert db.get_latest_candle_time('BTCUSDT', '1m') == candles[-1][0]
+    assert db.get_watermark('BTCUSDT', '1m') == (start_ms + 49 * MINUTE, 50)
+
+    bulk = db.get_candles_bulk(['BTCUSDT', 'ETHUSDT'], '1m', limit=5)
+    assert bulk['ETHUSDT'] == []
+    assert bulk['BTCUSDT'] == db.get_candles('BTCUSDT', '1m', limit=5)
+
+    # 업데이트가 밀린 심볼 (최근 limit*2 기간에 캔들이 없음)도 최신 limit개
+    db.save_candles('OLDUSDT', '1m', make_klines(start_ms - 3 * 24 * 60 * MINUTE, 20))
+    bulk = db.get_candles_bulk(['BTCUSDT', 'OLDUSDT'], '1m', limit=5)
+    assert bulk['OLDUSDT'] == db.get_candles('OLDUSDT', '1m', limit=5)
+    assert len(bulk['OLDUSDT']) == 5
+    db.close()
+
+
+def test_delete_candles_before(tmp_path):
+    db = open_db(tmp_path)
+    start = datetime(2026, 1, 1)
+    db.save_candles('BTCUSDT', '1m', make_klines(datetime_to_ms(start), 30))
+
+    assert db.delete_candles_before('1m', start + timedelta(minutes=20), limit=15) == 15
+    assert db.delete_candles_before('1m', start + timedelta(minutes=20), limit=15) == 5
+    assert db.get_data_count('BTCUSDT', '1m') == 10
+    db.close()
+
+
+def test_close_closes_connections_opened_by_other_threads(tmp_path):
+    db = open_db(tmp_path)
+    connections = []
+    worker = threading.Thread(target=lambda: connections.append(db._connect()))
+    worker.start()
+    worker.join()
+
+    db.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
@@ -0,0 +1,199 @@
+"""
+KlineStreamIngestor 테스트
+
+로컬 WebSocket 서버가 바이낸스 combined stream 흉내를 냄
+첫 연결에서는 캔들을 보낸 뒤 연결을 끊고, 재연결 후 다음 캔들을 보냄
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from websockets.asyncio.server import serve
+
+from core.stream import KlineStreamIngestor, kline_stream_name
+
+
+def kline_message(symbol, timeframe, open_time, closed):
+    return json.dumps({
+        'stream': kline_stream_name(symbol, timeframe),
+        'data': {
+            'e': 'kline',
+            's': symbol,
+            'k': {
+                't': open_time, 'T': open_time + 59999, 's': symbol, 'i': timeframe,
+                'o': '1.0', 'h': '2.0', 'l': '0.5', 'c': '1.5', 'v': '10.0', 'q': '15.0',
+                'x': closed,
+            },
+        },
+    })
+
+
+class StubStreamServer:
+    """연결 순서별로 정해진 메시지를 보내는 WebSocket 서버"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions  # [(메시지 리스트, 보낸 후 연결 종료 여부), ...]
+        self.paths = []
+        self.port = None
+        self._ready = threading.Event()
+        self._stop = None
+        self._loop = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    async def _handler(self, websocket):
+        index = len(self.paths)
+        self.paths.append(websocket.request.path)
+        messages, close_after = self.sessions[min(index, len(self.sessions) - 1)]
+        for message in messages:
+            await websocket.send(message)
+        if close_after:
+            await websocket.close()
+        else:
+            await websocket.wait_closed()
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        async with serve(self._handler, '127.0.0.1', 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._main())
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(5)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.saved = []
+
+    def save_candles(self, symbol, timeframe, klines):
+        self.saved.append((symbol, timeframe, list(klines)))
+        return len(klines)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def stub_stream():
+    servers = []
+
+    def make(sessions):
+        server = StubStreamServer(sessions)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.stop()
+
+
+def test_closed_candles_saved_in_batches(stub_stream):
+    server = stub_stream([([
+        kline_message('BTCUSDT', '1m', 60000, closed=False),
+        kline_message('BTCUSDT', '1m', 60000, closed=True),
+        kline_message('ETHUSDT', '1m', 60000, closed=True),
+        kline_message('BTCUSDT', '1m', 120000, closed=True),
+    ], False)])
+
+    db = FakeDatabase()
+    notified = []
+    ingestor = KlineStreamIngestor(
+        db, ['BTCUSDT', 'ETHUSDT'], ['1m'],
+        on_candles=lambda symbol, timeframe, klines: notified.append((symbol, timeframe, len(klines))),
+        base_url=f'ws://127.0.0.1:{server.port}', flush_interval=0.1
+    )
+    ingestor.start()
+    try:
+        assert wait_until(lambda: ingestor.saved_candles == 3)
+    finally:
+        ingestor.stop()
+
+    assert server.paths[0] == '/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m'
+
+    saved = {(symbol, timeframe): klines for symbol, timeframe, klines in db.saved}
+    assert [row[0] for row in saved[('BTCUSDT', '1m')]] == [60000, 120000]
+    assert saved[('BTCUSDT', '1m')][0] == [60000, '1.0', '2.0', '0.5', '1.5', '10.0', 119999, '15.0']
+    assert len(saved[('ETHUSDT', '1m')]) == 1
+    assert sorted(notified) == [('BTCUSDT', '1m', 2), ('ETHUSDT', '1m', 1)]
+
+
+def test_reconnect_triggers_gap_fill(stub_stream):
+    server = stub_stream([
+        ([kline_message('BTCUSDT', '5m', 0, closed=True)], True),
+        ([kline_message('BTCUSDT', '5m', 300000, closed=True)], False),
+    ])
+
+    db = FakeDatabase()
+    gap_fills = []
+    ingestor = KlineStreamIngestor(
+        db, ['BTCUSDT'], ['5m'],
+        gap_fill=gap_fills.append,
+        base_url=f'ws://127.0.0.1:{server.port}',
+        flush_interval=0.05, reconnect_delay=0.05
+    )
+    ingestor.start()
+    try:
+        assert wait_until(lambda: ingestor.saved_candles == 2)
+        assert wait_until(lambda: ingestor.connected)
+    finally:
+        ingestor.stop()
+
+    assert ingestor.reconnects == 1
+    # 처음 연결 + 재연결
+    assert gap_fills == [[('BTCUSDT', '5m')], [('BTCUSDT', '5m')]]
+    assert len(server.paths) == 2
+
+
+def test_flush_size_triggers_immediate_save(stub_stream):
+    messages = [kline_message('BTCUSDT', '1m', i * 60000, closed=True) for i in range(5)]
+    server = stub_stream([(messages, False)])
+
+    db = FakeDatabase()
+    ingestor = KlineStreamIngestor(
+        db, ['BTCUSDT'], ['1m'],
+        base_url=f'ws://127.0.0.1:{server.port}',
+        flush_interval=60.0, flush_size=5
+    )
+    ingestor.start()
+    try:
+        assert wait_until(lambda: ingestor.saved_candles == 5)
+    finally:
+        ingestor.stop()
+
+    assert len(db.saved) == 1
+
+
+def test_rest_update_skipped_only_for_streamed_symbols(tmp_path):
+    from types import SimpleNamespace
+    from tests.test_filter_registry import make_scanner
+
+    scanner = make_scanner(tmp_path, [
+        {'types': '3step_surge', 'using_timeframe': ['5m'], 'interval': '5m', 'period': 14, 'window': 30,
+         'volume_range_multiplier': 1.5, 'range_multiplier': 1.0},
+    ])
+    scanner.stream = SimpleNamespace(connected=True, stream_pairs={
+        kline_stream_name('BTCUSDT', '5m'): ('BTCUSDT', '5m'),
+    })
+
+    assert scanner._get_rest_timeframes(['1m', '5m'], ['BTCUSDT']) == ['1m']
+    # 스트림 시작 후에 추가된 심볼은 REST로 받아야 함
+    assert scanner._get_rest_timeframes(['1m', '5m'], ['BTCUSDT', 'NEWUSDT']) == ['1m', '5m']
@@ -0,0 +1,161 @@
+"""
+벡터화 필터가 기존 Filter와 같은 결과를 내는지 비교
+"""
+import numpy as np
+import pytest
+
+from core.candle_cache import CandleCache
+from core.resampler import ms_to_datetime
+from service.filter import Filter
+from service.vectorized_filter import VectorizedFilter, to_candle_array
+
+
+MINUTE = 60 * 1000
+
+
+def make_random_klines(seed, count=80):
+    """양봉/음봉, 거래량 급증, 변동폭이 섞인 임의 1분봉"""
+    rng = np.random.default_rng(seed)
+    klines = []
+    price = 100.0
+    for i in range(count):
+        open_price = price
+        close_price = open_price + rng.choice([-1, 1], p=[0.35, 0.65]) * rng.uniform(0.01, 2.0)
+        high = max(open_price, close_price) + rng.choice([0.0, rng.uniform(0, 1.0)])
+        low = min(open_price, close_price) - rng.choice([0.0, rng.uniform(0, 1.0)])
+        volume = rng.uniform(50, 150) * (rng.choice([1, 5], p=[0.8, 0.2]))
+        klines.append([i * MINUTE, open_price, high, low, close_price, volume, (i + 1) * MINUTE - 1, volume * close_price])
+        price = close_price
+    return klines
+
+
+def to_rows(klines):
+    return [(ms_to_datetime(k[0]), k[1], k[2], k[3], k[4], k[5], k[7]) for k in klines]
+
+
+PARAMS = [
+    # (volume_range_multiplier, period, window, range_multiplier, strong_candle_count)
+    (1.0, 14, 30, 1.0, 0),
+    (2.0, 14, 30, 1.5, 0),
+    (1.5, 10, 40, 0.8, 1),
+    (1.0, 14, 30, 1.0, 2),
+    (3.0, 5, 20, 2.0, 3),
+    (1.0, 14, 60, 0.5, 0),
+]
+
+
+@pytest.mark.parametrize('params', PARAMS)
+def test_same_result_as_legacy_filter_on_random_data(params):
+    volume_range_multiplier, period, window, range_multiplier, strong_candle_count = params
+    legacy = Filter()
+    vectorized = VectorizedFilter()
+
+    found = 0
+    for seed in range(40):
+        rows = to_rows(make_random_klines(seed))
+        kwargs = dict(strong_candle_count=strong_candle_count, upper_wick_ratio=0.3, lower_wick_ratio=0.2)
+        expected = legacy._three_step_surge_filter(rows, 'TEST', volume_range_multiplier, period, window,
+                                                   range_multiplier, **kwargs)
+        assert vectorized._three_step_surge_filter(rows, 'TEST', volume_range_multiplier, period, window,
+                                                   range_multiplier, **kwargs) == expected
+        # 캐시 배열 view 입력도 같은 결과
+        array = CandleCache.rows_to_array(rows)
+        assert vectorized._three_step_surge_filter(array, 'TEST', volume_range_multiplier, period, window,
+                                                   range_multiplier, **kwargs) == expected
+        found += bool(expected)
+
+    # 비교가 의미 있도록 일부는 패턴이 있어야 함 (엄격한 설정은 예외)
+    if strong_candle_count < 3:
+        assert found > 0
+
+
+def test_short_history_and_zero_range_candles():
+    legacy = Filter()
+    vectorized = VectorizedFilter()
+
+    rows = to_rows(make_random_klines(1, count=40))
+    assert vectorized._three_step_surge_filter(rows[:20], 'TEST', 1.0, 14, 30, 1.0) is False
+    assert legacy._three_step_surge_filter(rows[:20], 'TEST', 1.0, 14, 30, 1.0) is False
+
+    # 변동폭 0인 캔들 (강한 양봉 계산에서 제외)
+    flat = [(row[0], 100.0, 100.0, 100.0, 100.0, row[5], row[6]) if i % 3 == 0 else row for i, row in enumerate(rows)]
+    for strong in (0, 1):
+        assert vectorized._three_step_surge_filter(flat, 'TEST', 1.0, 14, 20, 0.5, strong_candle_count=strong) == \
+            legacy._three_step_surge_filter(flat, 'TEST', 1.0, 14, 20, 0.5, strong_candle_count=strong)
+
+
+def test_time_range_mode_matches_legacy():
+    legacy = Filter()
+    vectorized = VectorizedFilter()
+
+    for seed in range(15):
+        rows = to_rows(make_random_klines(seed, count=120))
+        start = (ms_to_datetime(40 * MINUTE)).strftime('%Y-%m-%d %H:%M:%S')
+        end = (ms_to_datetime(100 * MINUTE)).strftime('%Y-%m-%d %H:%M:%S')
+        expected = legacy._three_step_surge_filter(rows, 'TEST', 1.0, 14, 30, 1.0, start_time=start, end_time=end,
+                                                   timezone='UTC')
+        assert vectorized._three_step_surge_filter(rows, 'TEST', 1.0, 14, 30, 1.0, start_time=start, end_time=end,
+                                                   timezone='UTC') == expected
+
+
+def test_to_candle_array_accepts_ms_rows_without_copying_arrays():
+    klines = make_random_klines(0, count=5)
+    ms_rows = [(k[0], k[1], k[2], k[3], k[4], k[5], k[7]) for k in klines]
+    array = to_candle_array(ms_rows)
+    assert array.shape == (5, 7)
+    assert np.array_equal(array, to_candle_array(to_rows(klines)))
+    assert to_candle_array(array) is array
+
+
+def make_universe(count, length):
+    """심볼마다 다른 임의 캔들 (일부는 캔들 수 부족)"""
+    candle_sets = {}
+    for seed in range(count):
+        rows = to_rows(make_random_klines(seed, count=length))
+        if seed % 7 == 0:
+            rows = rows[:length // 3]
+        candle_sets[f"SYM{seed}USDT"] = rows
+    return candle_sets
+
+
+@pytest.mark.parametrize('params', PARAMS)
+def test_batch_three_step_surge_matches_per_symbol(params):
+    volume_range_multiplier, period, window, range_multiplier, strong_candle_count = params
+    candle_sets = make_universe(60, window + period + 1)
+    symbols = list(candle_sets) + ['MISSINGUSDT']
+    kwargs = dict(strong_candle_count=strong_candle_count, upper_wick_ratio=0.3, lower_wick_ratio=0.2)
+
+    legacy = Filter()
+    expected = {}
+    for symbol in symbols:
+        pattern_time = legacy._three_step_surge_filter(candle_sets.get(symbol, []), symbol, volume_range_multiplier,
+                                                       period, window, range_multiplier, **kwargs)
+        if pattern_time:
+            expected[symbol] = pattern_time
+
+    results = VectorizedFilter().batch_three_step_surge_filter(candle_sets, symbols, volume_range_multiplier, period,
+                                                               window, range_multiplier, **kwargs)
+    assert results == expected
+
+
+@pytest.mark.parametrize('threshold', [0, 1, 2, 3])
+def test_batch_high_volume_spike_matches_per_symbol(threshold):
+    period, window = 14, 30
+    candle_sets = {symbol: CandleCache.rows_to_array(rows)
+                   for symbol, rows in make_universe(60, window + period + 1).items()}
+    symbols = list(candle_sets)
+
+    legacy = Filter()
+    expected = {}
+    for symbol in symbols:
+        pattern_time = legacy._high_volume_spike_filter(candle_sets[symbol], symbol, downloader=None, timeframe='1m',
+                                                        period=period, window=window, volume_range_multiplier=2.0,
+                                                        spike_threshold=threshold)
+        if pattern_time:
+            expected[symbol] = pattern_time
+
+    results = VectorizedFilter().batch_high_volume_spike_filter(candle_sets, symbols, None, '1m', period, window, 2.0,
+                                                                threshold)
+    assert results == expected
+    if threshold:
+        assert expected
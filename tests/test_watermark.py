@@ -0,0 +1,46 @@
+"""
+워터마크 인덱스 테스트
+"""
+from core.watermark import WatermarkIndex
+
+
+MINUTE = 60 * 1000
+
+
+def test_record_saved_counts_only_newer_candles():
+    index = WatermarkIndex()
+    index.load([('BTCUSDT', '1m', 10 * MINUTE, 11)])
+
+    # 10분봉은 기존 행 업데이트, 11~12분봉만 새 행
+    index.record_saved('BTCUSDT', '1m', [10 * MINUTE, 11 * MINUTE, 12 * MINUTE])
+    assert index.get('BTCUSDT', '1m') == (12 * MINUTE, 13)
+
+    index.record_saved('ETHUSDT', '1m', [0, MINUTE])
+    assert index.get('ETHUSDT', '1m') == (MINUTE, 2)
+
+
+def test_record_deleted_and_reset():
+    index = WatermarkIndex()
+    index.load([('BTCUSDT', '1h', 0, 5)])
+
+    index.record_deleted('BTCUSDT', '1h', 3)
+    assert index.get('BTCUSDT', '1h') == (0, 2)
+    index.record_deleted('BTCUSDT', '1h', 2)
+    assert index.get('BTCUSDT', '1h') is None
+
+    index.reset()
+    assert not index.loaded
+
+
+def test_record_saved_counts_backfill_older_than_tracked_range():
+    index = WatermarkIndex()
+    index.load([('BTCUSDT', '1m', 20 * MINUTE, 11, 10 * MINUTE)])
+
+    # 과거 구간 추가 다운로드 (8~9분봉은 새 행, 10분봉은 기존 행)
+    index.record_saved('BTCUSDT', '1m', [8 * MINUTE, 9 * MINUTE, 10 * MINUTE])
+    assert index.get('BTCUSDT', '1m') == (20 * MINUTE, 13)
+
+    # 삭제 후에는 가장 오래된 시간을 모르므로 과거 캔들이 오면 다시 불러오게 함
+    index.record_deleted('BTCUSDT', '1m', 3)
+    index.record_saved('BTCUSDT', '1m', [5 * MINUTE])
+    assert not index.loaded